@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from django.utils.html import format_html
+from . import throttling
+from .models import LoginLockout, User
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -22,3 +24,36 @@ class UserAdmin(BaseUserAdmin):
             'fields': ('role',)
         }),
     )
+
+@admin.register(LoginLockout)
+class LoginLockoutAdmin(admin.ModelAdmin):
+    """Bloqueos creados por accounts.throttling; se levantan con la acción"""
+    list_display = ('value', 'scope', 'failures', 'locked_until', 'status', 'updated_at')
+    list_filter = ('scope', 'locked_until')
+    search_fields = ('value',)
+    readonly_fields = ('scope', 'value', 'failures', 'locked_until', 'created_at', 'updated_at')
+    ordering = ('-locked_until',)
+    actions = ['clear_lockouts']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Deleting the row alone would leave the cached lock in place.
+        return False
+
+    def status(self, obj):
+        if obj.is_active:
+            return format_html('<span style="color: red;">Bloqueado</span>')
+        return format_html('<span style="color: green;">Vencido</span>')
+    status.short_description = 'Estado'
+
+    def clear_lockouts(self, request, queryset):
+        for lockout in queryset:
+            throttling.clear(lockout.scope, lockout.value)
+        count, _ = queryset.delete()
+        self.message_user(request, f'{count} bloqueos levantados.')
+    clear_lockouts.short_description = 'Levantar bloqueos seleccionados'
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Avg, Case, Count, Exists, F, Max, OuterRef, Q, Subquery, Sum, When
+from django.utils import timezone
+
+from caja.models import CashRegister, Transaction, TransactionArchive
+
+ZERO = Decimal('0.00')
+ANALYTICS_CACHE_TIMEOUT = 60
+
+# Periods offered by the analytics view, in days (None: all history).
+PERIODS = {'7': 7, '30': 30, '90': 90, 'todo': None}
+
+DISCREPANCY = Q(closing_report__physical_cash_count__isnull=False) & (
+    Q(closing_report__cash_difference__gt=Decimal('0.01')) | Q(closing_report__cash_difference__lt=Decimal('-0.01'))
+)
+
+
+def _sales(model, aggregate):
+    # Reversals and the rows they cancel are not sales. A reversal is always
+    # posted to its original's register, so the lookup stays on that register.
+    reversed_rows = model.objects.filter(
+        cash_register_id=OuterRef('cash_register_id'), reverses_id=OuterRef('pk')
+    )
+    return Subquery(
+        model.objects.filter(
+            cash_register=OuterRef('pk'), transaction_type='income', reverses_id__isnull=True
+        ).exclude(Exists(reversed_rows)).order_by().values('cash_register').annotate(value=aggregate).values('value')
+    )
+
+
+def register_sales(aggregate):
+    """Agregado de los ingresos no reversados de cada caja, del archivo si la caja fue archivada"""
+    return Case(
+        When(archived_at__isnull=True, then=_sales(Transaction, aggregate)),
+        default=_sales(TransactionArchive, aggregate),
+    )
+
+
+def cashier_performance(days=None):
+    """
+    Métricas por cajero: ventas, ticket promedio, discrepancias y turnos.
+
+    A single query grouped by CashRegister.opened_by: the closing report is
+    a one-to-one join, and each register's income is summed by a correlated
+    subquery over its own rows (cash_register index), so registers and
+    transactions are never multiplied against each other.
+    """
+    registers = CashRegister.objects.filter(opened_by__isnull=False)
+    if days:
+        registers = registers.filter(opened_at__gte=timezone.now() - timedelta(days=days))
+
+    rows = registers.values(
+        'opened_by', 'opened_by__username', 'opened_by__first_name', 'opened_by__last_name'
+    ).annotate(
+        shifts=Count('pk'),
+        closed_shifts=Count('closing_report'),
+        counted_shifts=Count('pk', filter=Q(closing_report__physical_cash_count__isnull=False)),
+        discrepancies=Count('pk', filter=DISCREPANCY),
+        cash_difference=Sum('closing_report__cash_difference'),
+        sales=Sum(register_sales(Sum('amount'))),
+        tickets=Sum(register_sales(Count('pk'))),
+        average_shift_minutes=Avg('closing_report__shift_duration_minutes'),
+        last_shift=Max('opened_at'),
+    ).order_by(F('sales').desc(nulls_last=True), 'opened_by__username')
+
+    performance = []
+    for row in rows:
+        sales = (row['sales'] or ZERO).quantize(ZERO)
+        tickets = row['tickets'] or 0
+        full_name = f"{row['opened_by__first_name']} {row['opened_by__last_name']}".strip()
+        performance.append({
+            'user_id': row['opened_by'],
+            'username': row['opened_by__username'],
+            'full_name': full_name,
+            'shifts': row['shifts'],
+            'closed_shifts': row['closed_shifts'],
+            'sales': sales,
+            'tickets': tickets,
+            'average_ticket': (sales / tickets).quantize(ZERO) if tickets else ZERO,
+            'counted_shifts': row['counted_shifts'],
+            'discrepancies': row['discrepancies'],
+            'discrepancy_rate': 100 * row['discrepancies'] / row['counted_shifts'] if row['counted_shifts'] else None,
+            'cash_difference': (row['cash_difference'] or ZERO).quantize(ZERO),
+            'average_shift_minutes': round(row['average_shift_minutes']) if row['average_shift_minutes'] is not None else None,
+            'last_shift': row['last_shift'],
+        })
+    return performance
+
+
+def cached_performance(period):
+    """cashier_performance para un periodo de PERIODS, cacheado ANALYTICS_CACHE_TIMEOUT segundos"""
+    cache_key = f'accounts:analytics:{period}'
+    performance = cache.get(cache_key)
+    if performance is None:
+        performance = cashier_performance(PERIODS[period])
+        cache.set(cache_key, performance, ANALYTICS_CACHE_TIMEOUT)
+    return performance
@@ -3,13 +3,15 @@ from django.contrib import messages
 from django.urls import reverse
 from django.utils.deprecation import MiddlewareMixin
 
+from .signals import cached_role
+
 class RoleBasedAccessMiddleware(MiddlewareMixin):
     def process_request(self, request):
-        if not request.user.is_authenticated:
+        user_role = cached_role(request)
+        if user_role is None:
             return None
-        
+
         path = request.path
-        user_role = request.user.role
         
         admin_only_paths = [
             '/admin/',
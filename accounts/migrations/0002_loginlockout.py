@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginLockout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('username', 'Usuario'), ('ip', 'Dirección IP')], max_length=10, verbose_name='Tipo')),
+                ('value', models.CharField(max_length=150, verbose_name='Usuario o IP')),
+                ('failures', models.PositiveIntegerField(default=0, verbose_name='Intentos en la ventana')),
+                ('locked_until', models.DateTimeField(verbose_name='Bloqueado hasta')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Bloqueo de Inicio de Sesión',
+                'verbose_name_plural': 'Bloqueos de Inicio de Sesión',
+                'ordering': ['-locked_until'],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'value'), name='accounts_lockout_scope_value_uniq')],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 class User(AbstractUser):
     ROLE_CHOICES = [
@@ -25,3 +26,32 @@ class User(AbstractUser):
     
     def is_regular_user(self):
         return self.role == 'user'
+
+class LoginLockout(models.Model):
+    """Bloqueo de inicio de sesión por exceso de intentos fallidos (ver accounts.throttling)"""
+    SCOPE_CHOICES = [
+        ('username', 'Usuario'),
+        ('ip', 'Dirección IP'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES, verbose_name='Tipo')
+    value = models.CharField(max_length=150, verbose_name='Usuario o IP')
+    failures = models.PositiveIntegerField(default=0, verbose_name='Intentos en la ventana')
+    locked_until = models.DateTimeField(verbose_name='Bloqueado hasta')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Bloqueo de Inicio de Sesión'
+        verbose_name_plural = 'Bloqueos de Inicio de Sesión'
+        ordering = ['-locked_until']
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'value'], name='accounts_lockout_scope_value_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_scope_display()} {self.value} hasta {self.locked_until:%d/%m/%Y %H:%M}"
+
+    @property
+    def is_active(self):
+        return self.locked_until > timezone.now()
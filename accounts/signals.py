@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import throttling
+from .models import User
+
+ROLE_CACHE_KEY = 'accounts:role:{}'
+
+def cached_role(request):
+    """Rol del usuario autenticado, leído de la caché compartida si la hay"""
+    if not settings.SHARED_CACHE:
+        return request.user.role if request.user.is_authenticated else None
+    # The session holds the user id, so a cache hit never loads the user row.
+    user_id = request.session.get('_auth_user_id')
+    if user_id is None:
+        return None
+    role = cache.get(ROLE_CACHE_KEY.format(user_id))
+    if role is None and request.user.is_authenticated:
+        role = request.user.role
+        cache.set(ROLE_CACHE_KEY.format(user_id), role, None)
+    return role
+
+@receiver(post_save, sender=User)
+def refresh_cached_role(sender, instance, **kwargs):
+    # Sessions opened before a role change must see the new role.
+    if settings.SHARED_CACHE:
+        cache.set(ROLE_CACHE_KEY.format(instance.pk), instance.role, None)
+
+@receiver(user_login_failed)
+def count_failed_login(sender, credentials, request=None, **kwargs):
+    username = credentials.get('username')
+    ip = throttling.client_ip(request) if request is not None else None
+    # Attempts rejected by the throttle backend must not extend the lock.
+    if throttling.locked_for(username, ip):
+        return
+    throttling.record_failure(username, ip)
+
+@receiver(user_logged_in)
+def reset_username_failures(sender, request, user, **kwargs):
+    throttling.clear('username', user.get_username().strip().lower())
@@ -1,3 +1,132 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from caja import ledger
+from caja.archive import archive_register
+from caja.models import CashRegister, Transaction
+from . import throttling
+from .analytics import cashier_performance
+from .models import LoginLockout, User
+
+
+class RoleMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cajero', password='secreto123', role='user')
+        self.client.force_login(self.user)
+
+    def assert_role_change_reaches_open_session(self):
+        url = reverse('accounts:admin_dashboard')
+        self.assertRedirects(self.client.get(url), reverse('main:dashboard'), fetch_redirect_response=False)
+
+        self.user.role = 'admin'
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_role_change_reaches_open_session(self):
+        self.assert_role_change_reaches_open_session()
+
+    @override_settings(SHARED_CACHE=True)
+    def test_role_change_reaches_open_session_with_shared_cache(self):
+        self.assert_role_change_reaches_open_session()
+
+
+@override_settings(
+    LOGIN_THROTTLE_USERNAME_LIMIT=3,
+    LOGIN_THROTTLE_IP_LIMIT=5,
+    LOGIN_LOCKOUT_SECONDS=600,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cajero', password='secreto123', role='user')
+
+    def login(self, username='cajero', password='incorrecta', ip='10.0.0.1'):
+        return self.client.post(
+            reverse('accounts:login'),
+            {'username': username, 'password': password},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_username_is_locked_at_the_limit(self):
+        for _ in range(2):
+            self.assertEqual(self.login().status_code, 200)
+        self.assertFalse(LoginLockout.objects.exists())
+
+        self.login()
+
+        lockout = LoginLockout.objects.get(scope='username', value='cajero')
+        self.assertEqual(lockout.failures, 3)
+        # Even the right password is refused, from any address.
+        self.assertEqual(self.login(password='secreto123', ip='10.0.0.2').status_code, 429)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_ip_is_locked_across_usernames(self):
+        for attempt in range(5):
+            self.login(username=f'usuario{attempt}')
+
+        self.assertTrue(LoginLockout.objects.filter(scope='ip', value='10.0.0.1').exists())
+        self.assertEqual(self.login(password='secreto123').status_code, 429)
+        self.assertEqual(self.login(password='secreto123', ip='10.0.0.2').status_code, 302)
+
+    def test_cleared_lock_lets_the_user_in(self):
+        for _ in range(3):
+            self.login()
+
+        throttling.clear('username', 'cajero')
+        LoginLockout.objects.all().delete()
+
+        self.assertEqual(self.login(password='secreto123').status_code, 302)
+
+    def test_lock_taken_by_another_worker_applies_without_shared_cache(self):
+        # Another worker's lock never reaches this process's cache.
+        LoginLockout.objects.create(
+            scope='username', value='cajero', failures=3,
+            locked_until=timezone.now() + timedelta(minutes=10),
+        )
+
+        self.assertEqual(self.login(password='secreto123').status_code, 429)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_shared_cache_holds_the_lock(self):
+        for _ in range(3):
+            self.login()
+
+        self.assertGreater(throttling.locked_for('cajero', None), 0)
+        self.assertEqual(self.login(password='secreto123').status_code, 429)
+
+
+class CashierPerformanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cajero', password='secreto123', role='user')
+        self.register = CashRegister.objects.create(
+            name='Caja 1', opening_balance=Decimal('100.00'), current_balance=Decimal('100.00'),
+            status='open', opened_by=self.user, opened_at=timezone.now(),
+        )
+
+    def entry(self, transaction_type, amount):
+        return Transaction.objects.create(
+            transaction_type=transaction_type, amount=Decimal(amount), description='Movimiento',
+            payment_method='cash', cash_register=self.register, user=self.user, transaction_date=timezone.now(),
+        )
+
+    def assert_sales(self, sales, tickets):
+        [row] = cashier_performance()
+        self.assertEqual((row['sales'], row['tickets']), (Decimal(sales), tickets))
+
+    def test_reversals_and_reversed_sales_are_not_counted(self):
+        for entry in (self.entry('income', '50.00'), self.entry('outcome', '20.00')):
+            ledger.reverse(entry, self.user)
+        self.entry('income', '30.00')
+        self.assert_sales('30.00', 1)
+
+        CashRegister.objects.filter(pk=self.register.pk).update(
+            status='closed', closed_at=timezone.now() - timedelta(days=400)
+        )
+        self.assertEqual(archive_register(self.register.pk), 5)
+        self.assert_sales('30.00', 1)
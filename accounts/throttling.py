@@ -0,0 +1,128 @@
+"""
+Límite de intentos de inicio de sesión por usuario y por IP.
+
+Every failed login costs a full PBKDF2 hash, so a guessing loop can keep
+all workers busy. Failures are counted in the cache with a sliding window
+(the current fixed window plus the previous one weighted by how much of it
+still overlaps), once per username and once per client IP. Over the limit
+the key is locked for LOGIN_LOCKOUT_SECONDS: the lock lives in the cache,
+where LoginThrottleBackend checks it before ModelBackend hashes anything,
+and in LoginLockout so administrators can see and clear it.
+
+Without a shared cache (SHARED_CACHE) each worker counts on its own, so up
+to one limit per worker can be spent before the first lock. Locks are then
+read from LoginLockout instead, so a lock taken in one worker, or cleared
+by an administrator, applies to all of them. Use redis to count globally.
+"""
+import hashlib
+import time
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import LoginLockout
+
+
+def client_ip(request):
+    """IP del cliente; con LOGIN_THROTTLE_PROXY_COUNT proxies delante se toma de X-Forwarded-For"""
+    proxies = settings.LOGIN_THROTTLE_PROXY_COUNT
+    if proxies:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= proxies:
+            # The last entries were appended by our own proxies; anything
+            # further left is client-controlled.
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _targets(username, ip):
+    if username:
+        yield 'username', username.strip().lower(), settings.LOGIN_THROTTLE_USERNAME_LIMIT
+    if ip:
+        yield 'ip', ip, settings.LOGIN_THROTTLE_IP_LIMIT
+
+
+def _key(kind, scope, value):
+    digest = hashlib.sha256(value.encode()).hexdigest()[:32]
+    return f'accounts:login:{kind}:{scope}:{digest}'
+
+
+def _hit(scope, value):
+    """Suma un fallo y devuelve la cuenta estimada en la ventana deslizante"""
+    window = settings.LOGIN_THROTTLE_WINDOW_SECONDS
+    index, elapsed = divmod(time.time(), window)
+    prefix = _key('count', scope, value)
+    current = f'{prefix}:{int(index)}'
+    cache.add(current, 0, window * 2)
+    try:
+        hits = cache.incr(current)
+    except ValueError:
+        # Expired between add() and incr().
+        cache.set(current, 1, window * 2)
+        hits = 1
+    previous = cache.get(f'{prefix}:{int(index) - 1}', 0)
+    return hits + previous * (1 - elapsed / window)
+
+
+def locked_for(username, ip):
+    """Segundos de bloqueo restantes para este usuario o IP (0 si no hay bloqueo)"""
+    targets = [(scope, value) for scope, value, _ in _targets(username, ip)]
+    if not targets:
+        return 0
+    if settings.SHARED_CACHE:
+        until = max(cache.get_many({_key('lock', scope, value) for scope, value in targets}).values(), default=0)
+    else:
+        locked_until = LoginLockout.objects.filter(
+            reduce(or_, (Q(scope=scope, value=value) for scope, value in targets))
+        ).aggregate(until=Max('locked_until'))['until']
+        until = locked_until.timestamp() if locked_until else 0
+    return max(int(until - time.time()), 0)
+
+
+def lock(scope, value, failures):
+    seconds = settings.LOGIN_LOCKOUT_SECONDS
+    cache.set(_key('lock', scope, value), time.time() + seconds, seconds)
+    LoginLockout.objects.update_or_create(
+        scope=scope,
+        value=value,
+        defaults={'failures': failures, 'locked_until': timezone.now() + timedelta(seconds=seconds)},
+    )
+
+
+def record_failure(username, ip):
+    for scope, value, limit in _targets(username, ip):
+        failures = _hit(scope, value)
+        if failures >= limit:
+            lock(scope, value, int(failures))
+
+
+def clear(scope, value):
+    """Quita el bloqueo y los contadores de un usuario o IP"""
+    window = settings.LOGIN_THROTTLE_WINDOW_SECONDS
+    index = int(time.time() // window)
+    prefix = _key('count', scope, value)
+    cache.delete_many([_key('lock', scope, value), f'{prefix}:{index}', f'{prefix}:{index - 1}'])
+
+
+class LoginThrottleBackend(ModelBackend):
+    """
+    Corta authenticate() antes de que ModelBackend calcule el hash si hay bloqueo.
+
+    Listed before ModelBackend and never authenticates anyone itself. It
+    inherits get_user() because force_login() and sessions may record the
+    first configured backend.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        ip = client_ip(request) if request is not None else None
+        if locked_for(username, ip):
+            raise PermissionDenied
+        return None
+
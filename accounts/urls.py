@@ -10,6 +10,7 @@ urlpatterns = [
 
     # Admin-only user management URLs
     path('admin/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin/analytics/', views.admin_analytics, name='admin_analytics'),
     path('admin/users/', views.AdminUserListView.as_view(), name='admin_user_list'),
     path('admin/users/create/', views.AdminUserCreateView.as_view(), name='admin_user_create'),
     path('admin/users/<int:pk>/edit/', views.AdminUserUpdateView.as_view(), name='admin_user_edit'),
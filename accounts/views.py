@@ -1,10 +1,17 @@
+from math import ceil
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, ListView, UpdateView
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Q
 from django.utils.decorators import method_decorator
+from main.pagination import EstimatedCountPaginator
+from softwareTienda.db_router import use_replica
+from . import throttling
+from .analytics import ANALYTICS_CACHE_TIMEOUT, PERIODS, cached_performance
 from .forms import CustomUserCreationForm, LoginForm, UserEditForm
 from .models import User
 from .decorators import admin_required
@@ -26,6 +33,12 @@ def login_view(request):
     form = LoginForm()
     
     if request.method == 'POST':
+        # Checked before the form so a locked-out flood never reaches the hasher.
+        wait = throttling.locked_for(request.POST.get('username', ''), throttling.client_ip(request))
+        if wait:
+            messages.error(request, f'Demasiados intentos fallidos. Intenta de nuevo en {ceil(wait / 60)} minutos.')
+            return render(request, 'accounts/login.html', {'form': form}, status=429)
+
         form = LoginForm(request.POST)
         if form.is_valid():
             username = form.cleaned_data['username']
@@ -55,6 +68,7 @@ class AdminUserListView(ListView):
     template_name = 'accounts/admin/user_list.html'
     context_object_name = 'users'
     paginate_by = 20
+    paginator_class = EstimatedCountPaginator
 
     def get_queryset(self):
         return User.objects.all().order_by('-created_at')
@@ -100,11 +114,32 @@ def admin_user_delete(request, pk):
 
 @admin_required
 def admin_dashboard(request):
-    user_stats = {
-        'total_users': User.objects.count(),
-        'admin_users': User.objects.filter(role='admin').count(),
-        'regular_users': User.objects.filter(role='user').count(),
-        'active_users': User.objects.filter(is_active=True).count(),
-        'recent_users': User.objects.order_by('-created_at')[:5]
-    }
+    user_stats = User.objects.aggregate(
+        total_users=Count('pk'),
+        admin_users=Count('pk', filter=Q(role='admin')),
+        regular_users=Count('pk', filter=Q(role='user')),
+        active_users=Count('pk', filter=Q(is_active=True)),
+    )
+    user_stats['recent_users'] = User.objects.order_by('-created_at')[:5]
     return render(request, 'accounts/admin/dashboard.html', {'stats': user_stats})
+
+@admin_required
+@use_replica
+def admin_analytics(request):
+    period = request.GET.get('periodo', '30')
+    if period not in PERIODS:
+        period = '30'
+    performance = cached_performance(period)
+    totals = {
+        'sales': sum(row['sales'] for row in performance),
+        'tickets': sum(row['tickets'] for row in performance),
+        'shifts': sum(row['shifts'] for row in performance),
+        'discrepancies': sum(row['discrepancies'] for row in performance),
+    }
+    return render(request, 'accounts/admin/analytics.html', {
+        'performance': performance,
+        'totals': totals,
+        'period': period,
+        'periods': PERIODS,
+        'cache_seconds': ANALYTICS_CACHE_TIMEOUT,
+    })
@@ -1,6 +1,28 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.cache import cache
 from django.utils.html import format_html
-from .models import Bank, Entity, CashRegister, Transaction, CashRegisterReport
+from main.pagination import EstimatedCountPaginator
+from softwareTienda.db_router import use_replica
+from .ledger import LedgerError, reverse
+from .models import (
+    Bank, Entity, CommissionRule, CashRegister, Transaction, TransactionArchive, CashRegisterReport,
+    BalanceCheckpoint, BankBalance, EntityBalance,
+)
+
+FILTER_CHOICES_CACHE_TIMEOUT = 300
+
+
+class CachedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Related filter whose choices are cached instead of queried on every changelist load"""
+
+    def field_choices(self, field, request, model_admin):
+        cache_key = f'admin:filter_choices:{field.model._meta.label_lower}.{field.name}'
+        choices = cache.get(cache_key)
+        if choices is None:
+            choices = [(pk, str(label)) for pk, label in super().field_choices(field, request, model_admin)]
+            cache.set(cache_key, choices, FILTER_CHOICES_CACHE_TIMEOUT)
+        return choices
+
 
 @admin.register(Bank)
 class BankAdmin(admin.ModelAdmin):
@@ -16,40 +38,159 @@ class EntityAdmin(admin.ModelAdmin):
     search_fields = ('name', 'code', 'description')
     ordering = ('name',)
 
+@admin.register(CommissionRule)
+class CommissionRuleAdmin(admin.ModelAdmin):
+    list_display = ('entity', 'bank', 'transaction_type', 'min_amount', 'fixed_fee', 'percentage', 'max_commission', 'is_active')
+    list_filter = ('is_active', 'transaction_type', 'entity', 'bank')
+    list_editable = ('is_active',)
+    ordering = ('entity', 'bank', 'transaction_type', 'min_amount')
+
 @admin.register(CashRegister)
 class CashRegisterAdmin(admin.ModelAdmin):
     list_display = ('name', 'status', 'current_balance', 'opened_by', 'opened_at')
-    list_filter = ('status', 'opened_at', 'closed_at')
+    list_filter = ('status', 'opened_at', 'closed_at', 'archived_at')
     search_fields = ('name', 'notes')
-    readonly_fields = ('current_balance', 'created_at', 'updated_at')
+    readonly_fields = ('current_balance', 'last_sequence', 'archived_at', 'created_at', 'updated_at')
     ordering = ('-opened_at',)
+    paginator = EstimatedCountPaginator
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('opened_by', 'closed_by')
 
+class ReplicaChangelistMixin:
+    """Listados históricos del admin leídos desde la réplica"""
+
+    def changelist_view(self, request, extra_context=None):
+        return use_replica(super().changelist_view)(request, extra_context)
+
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
-    list_display = ('description', 'transaction_type', 'category', 'amount', 'payment_method', 'entity', 'commission', 'user', 'transaction_date')
-    list_filter = ('transaction_type', 'category', 'payment_method', 'entity', 'bank', 'transaction_date', 'created_at')
+class TransactionAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
+    list_display = ('description', 'transaction_type', 'category', 'amount', 'payment_method', 'entity', 'commission', 'net_amount', 'user', 'transaction_date')
+    list_filter = (
+        'transaction_type', 'category', 'payment_method',
+        ('entity', CachedRelatedFieldListFilter),
+        ('bank', CachedRelatedFieldListFilter),
+    )
     search_fields = ('description', 'reference_number', 'notes')
-    readonly_fields = ('net_amount', 'created_at', 'updated_at')
+    readonly_fields = ('net_amount', 'sequence', 'balance_after', 'reverses', 'client_uuid', 'created_at', 'updated_at')
     ordering = ('-transaction_date',)
+    actions = ['reverse_transactions']
+
+    # Large-table mode: no unfiltered COUNT(*), index-backed date drilldown
+    # and lookup widgets instead of <select>s with every related row.
+    date_hierarchy = 'transaction_date'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    autocomplete_fields = ('user', 'bank', 'entity')
+    raw_id_fields = ('cash_register',)
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user', 'bank', 'entity', 'cash_register')
 
+    def get_readonly_fields(self, request, obj=None):
+        # The ledger is append-only: stored amounts are corrected by reversal.
+        if obj is not None:
+            return self.readonly_fields + ('transaction_type', 'amount', 'commission', 'commission_percentage', 'cash_register')
+        return self.readonly_fields
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def reverse_transactions(self, request, queryset):
+        reversed_count = 0
+        for transaction in queryset:
+            try:
+                reverse(transaction, request.user, reason=f'Reversa desde el admin por {request.user}')
+            except LedgerError as exc:
+                self.message_user(request, f'{transaction}: {exc}', level=messages.WARNING)
+            else:
+                reversed_count += 1
+        self.message_user(request, f'{reversed_count} transacciones reversadas.')
+    reverse_transactions.short_description = 'Reversar transacciones seleccionadas'
+
     def net_amount(self, obj):
         return f"${obj.net_amount:,.2f}"
     net_amount.short_description = 'Monto Neto'
+    net_amount.admin_order_field = 'net_amount'
+
+@admin.register(TransactionArchive)
+class TransactionArchiveAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
+    """Transacciones movidas por archive_transactions; solo lectura"""
+    list_display = ('description', 'transaction_type', 'category', 'amount', 'commission', 'net_amount', 'cash_register', 'transaction_date')
+    list_filter = ('transaction_type', 'category')
+    search_fields = ('description', 'reference_number')
+    date_hierarchy = 'transaction_date'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    raw_id_fields = ('cash_register', 'user', 'bank', 'entity')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('cash_register')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+class MaterializedBalanceAdmin(admin.ModelAdmin):
+    """Saldos mantenidos por caja.balances; solo lectura"""
+    list_display = ('day', 'income_total', 'outcome_total', 'commission_total', 'transaction_count', 'balance', 'updated_at')
+    date_hierarchy = 'day'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(BankBalance)
+class BankBalanceAdmin(MaterializedBalanceAdmin):
+    list_display = ('bank',) + MaterializedBalanceAdmin.list_display
+    list_filter = (('bank', CachedRelatedFieldListFilter),)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('bank')
+
+@admin.register(EntityBalance)
+class EntityBalanceAdmin(MaterializedBalanceAdmin):
+    list_display = ('entity',) + MaterializedBalanceAdmin.list_display
+    list_filter = (('entity', CachedRelatedFieldListFilter),)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('entity')
+
+@admin.register(BalanceCheckpoint)
+class BalanceCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('cash_register', 'sequence', 'income_total', 'outcome_total', 'transaction_count', 'balance', 'created_at')
+    raw_id_fields = ('cash_register',)
+    ordering = ('cash_register', '-sequence')
+    paginator = EstimatedCountPaginator
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 @admin.register(CashRegisterReport)
-class CashRegisterReportAdmin(admin.ModelAdmin):
-    list_display = ('cash_register', 'opening_balance', 'closing_balance', 'total_income', 'total_outcome', 'transaction_count', 'has_cash_discrepancy', 'created_at')
+class CashRegisterReportAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
+    list_display = ('cash_register', 'opening_balance', 'closing_balance', 'total_income', 'total_outcome', 'net_total', 'transaction_count', 'has_cash_discrepancy', 'created_at')
     list_filter = ('cash_register__status', 'created_at')
     search_fields = ('cash_register__name', 'notes')
     readonly_fields = ('expected_cash_balance', 'has_cash_discrepancy', 'created_at')
     ordering = ('-created_at',)
 
+    date_hierarchy = 'created_at'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    raw_id_fields = ('cash_register',)
+
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('cash_register', 'cash_register__opened_by')
 
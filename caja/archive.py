@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Max, Min
+from django.utils import timezone
+
+from . import partitions
+from .ledger import write_checkpoint
+from .models import CashRegister, IdempotencyKey, Transaction, TransactionArchive
+
+
+def transactions_for(register):
+    """Transacciones de una caja, leídas del archivo si la caja ya fue archivada"""
+    if register.archived_at:
+        return TransactionArchive.objects.filter(cash_register=register)
+    return register.transactions.all()
+
+
+def _referenced_elsewhere():
+    """Subconsultas de cajas cuyas transacciones apuntan otras tablas (p. ej. ventas de papelería)"""
+    for relation in Transaction._meta.related_objects:
+        # Reversals are checked separately; idempotency keys are deleted on archive.
+        if relation.related_model in (Transaction, IdempotencyKey):
+            continue
+        yield relation.related_model.objects.values(f'{relation.field.name}__cash_register')
+
+
+def archivable_registers(months):
+    """
+    Cajas cerradas hace más de ``months`` meses que aún no se archivaron.
+
+    Registers with entries reversed from another register stay in place:
+    the reversal's foreign key must keep pointing at a Transaction row. So
+    do registers whose entries are referenced from other apps' tables, such
+    as papelería sales, whose PROTECT foreign key would block the DELETE.
+    """
+    cutoff = timezone.now() - timedelta(days=30 * months)
+    reversed_elsewhere = Transaction.objects.filter(
+        reverses__isnull=False
+    ).exclude(
+        cash_register=F('reverses__cash_register')
+    ).values('reverses__cash_register')
+    registers = CashRegister.objects.filter(
+        status='closed',
+        closed_at__lt=cutoff,
+        archived_at__isnull=True,
+    ).exclude(pk__in=reversed_elsewhere)
+    for referenced in _referenced_elsewhere():
+        registers = registers.exclude(pk__in=referenced)
+    return registers.order_by('closed_at')
+
+
+def archive_register(register_id):
+    """
+    Mueve las transacciones de una caja cerrada a TransactionArchive.
+
+    Copies the rows with one INSERT ... SELECT and deletes them with one
+    DELETE inside a single transaction, after checkpointing the register so
+    its balance no longer needs the moved rows. Returns the number of rows
+    moved, or None when the register was archived or reopened meanwhile.
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in TransactionArchive._meta.concrete_fields)
+    source = quote(Transaction._meta.db_table)
+
+    with transaction.atomic():
+        register = CashRegister.objects.select_for_update().get(pk=register_id)
+        if register.archived_at or register.status != 'closed':
+            return None
+        write_checkpoint(register)
+
+        if partitions_enabled():
+            dates = register.transactions.aggregate(first=Min('transaction_date'), last=Max('transaction_date'))
+            if dates['first']:
+                partitions.ensure_partitions(
+                    TransactionArchive._meta.db_table,
+                    partitions.month_start(dates['first']),
+                    partitions.month_start(dates['last']),
+                )
+
+        IdempotencyKey.objects.filter(transaction__cash_register=register).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote(TransactionArchive._meta.db_table)} ({columns}) '
+                f'SELECT {columns} FROM {source} WHERE cash_register_id = %s',
+                [register.pk]
+            )
+            copied = cursor.rowcount
+            cursor.execute(f'DELETE FROM {source} WHERE cash_register_id = %s', [register.pk])
+            if cursor.rowcount != copied:
+                raise RuntimeError(f'Register {register.pk}: copied {copied} rows but deleted {cursor.rowcount}')
+
+        register.archived_at = timezone.now()
+        CashRegister.objects.filter(pk=register.pk).update(archived_at=register.archived_at)
+    return copied
+
+
+def partitions_enabled():
+    return connection.vendor == 'postgresql' and partitions.is_partitioned(TransactionArchive._meta.db_table)
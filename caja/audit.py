@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+from django.db.models import Count, Max, Q, Sum
+
+from .models import CashRegister, CashRegisterReport, Transaction, TransactionArchive
+
+ZERO = Decimal('0.00')
+
+
+def register_totals(register_ids):
+    """
+    Ingresos, egresos, número de transacciones y última secuencia por caja.
+
+    One grouped query over Transaction and one over TransactionArchive; a
+    register's rows live in exactly one of them.
+    """
+    totals = {}
+    for model in (Transaction, TransactionArchive):
+        rows = model.objects.filter(
+            cash_register_id__in=register_ids
+        ).values('cash_register_id').annotate(
+            income=Sum('amount', filter=Q(transaction_type='income')),
+            outcome=Sum('amount', filter=Q(transaction_type='outcome')),
+            commissions=Sum('commission'),
+            count=Count('id'),
+            last_sequence=Max('sequence'),
+        ).order_by()
+
+        for row in rows:
+            totals[row['cash_register_id']] = {
+                'income': (row['income'] or ZERO).quantize(ZERO),
+                'outcome': (row['outcome'] or ZERO).quantize(ZERO),
+                'commissions': (row['commissions'] or ZERO).quantize(ZERO),
+                'count': row['count'],
+                'last_sequence': row['last_sequence'] or 0,
+            }
+    return totals
+
+
+def empty_totals():
+    return {'income': ZERO, 'outcome': ZERO, 'commissions': ZERO, 'count': 0, 'last_sequence': 0}
+
+
+def audit_chunk(register_ids):
+    """
+    Compara saldos y reportes almacenados con los totales recalculados.
+
+    Four queries per chunk regardless of its size: registers, grouped
+    transaction and archive totals and closing reports. Returns one dict per mismatch.
+    """
+    registers = CashRegister.objects.filter(pk__in=register_ids).values(
+        'id', 'name', 'status', 'opening_balance', 'current_balance', 'last_sequence'
+    )
+    totals = register_totals(register_ids)
+    reports = {
+        report['cash_register_id']: report
+        for report in CashRegisterReport.objects.filter(cash_register_id__in=register_ids).values(
+            'cash_register_id', 'closing_balance', 'total_income', 'total_outcome',
+            'total_commissions', 'transaction_count'
+        )
+    }
+
+    discrepancies = []
+
+    def mismatch(register, check, stored, expected):
+        if stored != expected:
+            discrepancies.append({
+                'register_id': register['id'],
+                'register': register['name'],
+                'status': register['status'],
+                'check': check,
+                'stored': stored,
+                'expected': expected,
+                'difference': expected - stored,
+            })
+
+    for register in registers:
+        total = totals.get(register['id']) or empty_totals()
+        expected_balance = register['opening_balance'] + total['income'] - total['outcome']
+        mismatch(register, 'current_balance', register['current_balance'], expected_balance)
+        mismatch(register, 'last_sequence', register['last_sequence'], total['last_sequence'])
+
+        report = reports.get(register['id'])
+        if report:
+            mismatch(register, 'report.closing_balance', report['closing_balance'], expected_balance)
+            mismatch(register, 'report.total_income', report['total_income'], total['income'])
+            mismatch(register, 'report.total_outcome', report['total_outcome'], total['outcome'])
+            mismatch(register, 'report.total_commissions', report['total_commissions'], total['commissions'])
+            mismatch(register, 'report.transaction_count', report['transaction_count'], total['count'])
+
+    return discrepancies
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import BankBalance, EntityBalance, Transaction, TransactionArchive
+
+ZERO = Decimal('0.00')
+
+# (model, foreign key attname on Transaction and on the balance model)
+TARGETS = [
+    (BankBalance, 'bank_id'),
+    (EntityBalance, 'entity_id'),
+]
+
+
+def _deltas(entries):
+    """Suma los efectos de ``entries`` por (modelo, campo, id, día)"""
+    daily = settings.MATERIALIZED_DAILY_BALANCES
+    deltas = defaultdict(lambda: {'income': ZERO, 'outcome': ZERO, 'commission': ZERO, 'count': 0})
+    for entry in entries:
+        days = [None]
+        if daily:
+            days.append(timezone.localdate(entry.transaction_date))
+        for model, field in TARGETS:
+            target_id = getattr(entry, field)
+            if target_id is None:
+                continue
+            for day in days:
+                delta = deltas[(model, field, target_id, day)]
+                delta[entry.transaction_type] += entry.amount
+                delta['commission'] += entry.commission
+                delta['count'] += 1
+    return deltas
+
+
+def _increment(model, field, target_id, day, delta):
+    lookup = {field: target_id}
+    if day is None:
+        lookup['day__isnull'] = True
+    else:
+        lookup['day'] = day
+    changes = {
+        'income_total': F('income_total') + delta['income'],
+        'outcome_total': F('outcome_total') + delta['outcome'],
+        'commission_total': F('commission_total') + delta['commission'],
+        'transaction_count': F('transaction_count') + delta['count'],
+        'balance': F('balance') + delta['income'] - delta['outcome'],
+        'updated_at': timezone.now(),
+    }
+
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(
+                **{field: target_id},
+                day=day,
+                income_total=delta['income'],
+                outcome_total=delta['outcome'],
+                commission_total=delta['commission'],
+                transaction_count=delta['count'],
+                balance=delta['income'] - delta['outcome'],
+            )
+    except IntegrityError:
+        # Another transaction created the row first; it is there now.
+        model.objects.filter(**lookup).update(**changes)
+
+
+def apply(entries):
+    """
+    Suma las transacciones nuevas a los saldos de sus bancos y entidades.
+
+    Must be called inside the database transaction that inserts ``entries``:
+    each affected row gets one atomic UPDATE ... SET x = x + delta, so
+    concurrent writers never lose an increment and a rollback undoes both.
+    """
+    for (model, field, target_id, day), delta in _deltas(entries).items():
+        _increment(model, field, target_id, day, delta)
+
+
+def adjust_commissions(changes):
+    """
+    Aplica cambios de comisión de transacciones ya registradas.
+
+    ``changes`` yields (bank_id, entity_id, transaction_date, delta); only
+    commission_total moves, since commissions do not affect the balance.
+    """
+    daily = settings.MATERIALIZED_DAILY_BALANCES
+    deltas = defaultdict(lambda: {'income': ZERO, 'outcome': ZERO, 'commission': ZERO, 'count': 0})
+    for bank_id, entity_id, transaction_date, delta in changes:
+        days = [None]
+        if daily:
+            days.append(timezone.localdate(transaction_date))
+        for (model, field), target_id in zip(TARGETS, (bank_id, entity_id)):
+            if target_id is None:
+                continue
+            for day in days:
+                deltas[(model, field, target_id, day)]['commission'] += delta
+
+    for (model, field, target_id, day), delta in deltas.items():
+        _increment(model, field, target_id, day, delta)
+
+
+def rebuild():
+    """
+    Recalcula todos los saldos materializados desde las transacciones.
+
+    Replaces every row inside one database transaction using grouped
+    aggregates. Writes committed while it runs may be missed; run it when the
+    registers are idle.
+    """
+    daily = settings.MATERIALIZED_DAILY_BALANCES
+    created = 0
+    with transaction.atomic():
+        for model, field in TARGETS:
+            model.objects.all().delete()
+            groupings = [()]
+            if daily:
+                groupings.append(('day',))
+            for extra in groupings:
+                # Archived registers keep contributing to bank/entity totals.
+                merged = defaultdict(lambda: {'income': ZERO, 'outcome': ZERO, 'commission': ZERO, 'count': 0})
+                for source in (Transaction, TransactionArchive):
+                    rows = source.objects.filter(**{f'{field}__isnull': False})
+                    if extra:
+                        rows = rows.annotate(day=TruncDate('transaction_date'))
+                    rows = rows.values(field, *extra).annotate(
+                        income=Sum('amount', filter=Q(transaction_type='income')),
+                        outcome=Sum('amount', filter=Q(transaction_type='outcome')),
+                        commission=Sum('commission'),
+                        count=Count('id'),
+                    ).order_by()
+                    for row in rows.iterator():
+                        totals = merged[row[field], row.get('day')]
+                        totals['income'] += row['income'] or ZERO
+                        totals['outcome'] += row['outcome'] or ZERO
+                        totals['commission'] += row['commission'] or ZERO
+                        totals['count'] += row['count']
+
+                objects = [
+                    model(
+                        **{field: key},
+                        day=day,
+                        income_total=totals['income'],
+                        outcome_total=totals['outcome'],
+                        commission_total=totals['commission'],
+                        transaction_count=totals['count'],
+                        balance=totals['income'] - totals['outcome'],
+                    )
+                    for (key, day), totals in merged.items()
+                ]
+                model.objects.bulk_create(objects, batch_size=1000)
+                created += len(objects)
+    return created
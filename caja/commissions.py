@@ -0,0 +1,128 @@
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import CommissionRule
+
+VERSION_KEY = 'caja:commission_rules_version'
+
+CENT = Decimal('0.01')
+
+Tier = namedtuple('Tier', ['fixed_fee', 'percentage', 'max_commission'])
+
+Quote = namedtuple('Quote', ['commission', 'percentage'])
+
+
+def rules_version():
+    """Versión de las tarifas: la clave compartida o, sin caché compartida, el estado de la tabla"""
+    if not settings.SHARED_CACHE:
+        # bump_rules_version() only reaches the saving worker's own cache;
+        # the rule count and latest change are visible to every worker.
+        state = CommissionRule.objects.aggregate(count=Count('pk'), changed=Max('updated_at'))
+        return state['count'], state['changed']
+    return cache.get(VERSION_KEY, 0)
+
+
+def bump_rules_version():
+    """Marca las tarifas como modificadas para que cada proceso las recompile"""
+    if not cache.add(VERSION_KEY, 1, None):
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 1, None)
+
+
+def compile_rules():
+    """
+    Compila las reglas activas en tablas ordenadas por tarifa.
+
+    Returns {(entity_id, bank_id, transaction_type): (thresholds, tiers)}
+    with ``thresholds`` sorted ascending so a tier is found by bisection.
+    """
+    grouped = defaultdict(list)
+    rows = CommissionRule.objects.filter(is_active=True).order_by('min_amount').values_list(
+        'entity_id', 'bank_id', 'transaction_type', 'min_amount',
+        'fixed_fee', 'percentage', 'max_commission'
+    )
+    for entity_id, bank_id, transaction_type, min_amount, fixed_fee, percentage, max_commission in rows:
+        grouped[(entity_id, bank_id, transaction_type)].append(
+            (min_amount, Tier(fixed_fee, percentage, max_commission))
+        )
+    return {
+        key: ([threshold for threshold, _ in tiers], [tier for _, tier in tiers])
+        for key, tiers in grouped.items()
+    }
+
+
+class CommissionTable:
+    """
+    Tarifas compiladas en memoria del proceso.
+
+    The rules version is checked at most every ``check_interval`` seconds;
+    the table is recompiled with a single query only when it moved.
+    """
+
+    def __init__(self, check_interval=1.0):
+        self.check_interval = check_interval
+        self._version = None
+        self._table = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def table(self):
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            version = rules_version()
+            if version != self._version:
+                with self._lock:
+                    if version != self._version:
+                        self._table = compile_rules()
+                        self._version = version
+        return self._table
+
+    def quote(self, amount, transaction_type, entity_id=None, bank_id=None, table=None):
+        """Comisión de la tarifa más específica que aplica, o None si ninguna aplica"""
+        if table is None:
+            table = self.table()
+        if not table or amount is None:
+            return None
+
+        # Most specific tariff first: entity before bank before general,
+        # exact type before any.
+        for key in (
+            (entity_id, bank_id, transaction_type),
+            (entity_id, bank_id, ''),
+            (entity_id, None, transaction_type),
+            (entity_id, None, ''),
+            (None, bank_id, transaction_type),
+            (None, bank_id, ''),
+            (None, None, transaction_type),
+            (None, None, ''),
+        ):
+            compiled = table.get(key)
+            if compiled is None:
+                continue
+            thresholds, tiers = compiled
+            index = bisect_right(thresholds, amount) - 1
+            if index < 0:
+                # Below this tariff's first tier: a less specific one may apply.
+                continue
+            return self._price(amount, tiers[index])
+        return None
+
+    @staticmethod
+    def _price(amount, tier):
+        commission = tier.fixed_fee + amount * tier.percentage / 100
+        if tier.max_commission is not None:
+            commission = min(commission, tier.max_commission)
+        return Quote(commission.quantize(CENT, rounding=ROUND_HALF_UP), tier.percentage)
+
+
+commission_table = CommissionTable()
@@ -0,0 +1,90 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import models
+
+
+def compact_storage():
+    """True cuando las columnas compactas están activas (COMPACT_STORAGE)"""
+    return getattr(settings, 'COMPACT_STORAGE', False)
+
+
+class CompactDecimalField(models.DecimalField):
+    """
+    DecimalField que con COMPACT_STORAGE se guarda como entero escalado.
+
+    The column becomes BIGINT holding ``value * 10**decimal_places`` (cents
+    for money). Python code, forms and the admin keep seeing Decimal; the
+    conversion happens when values are sent to and read from the database,
+    including lookups, updates and aggregates over the column.
+    """
+
+    @property
+    def scale(self):
+        return 10 ** self.decimal_places
+
+    def get_internal_type(self):
+        return 'BigIntegerField' if compact_storage() else 'DecimalField'
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not compact_storage():
+            return super().get_db_prep_value(value, connection, prepared)
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None or hasattr(value, 'as_sql'):
+            return value
+        return int((value * self.scale).to_integral_value(rounding=ROUND_HALF_UP))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or not compact_storage():
+            return value
+        return (Decimal(value) / self.scale).quantize(Decimal(1).scaleb(-self.decimal_places))
+
+
+class CompactChoiceField(models.CharField):
+    """
+    CharField con opciones que con COMPACT_STORAGE se guarda como SMALLINT.
+
+    The stored code is the 1-based position of the value in ``choices``, so
+    new choices must be appended, never inserted or reordered.
+    """
+
+    def _codes(self):
+        codes = self.__dict__.get('_compact_codes')
+        if codes is None:
+            codes = {value: code for code, (value, _) in enumerate(self.flatchoices, start=1)}
+            self.__dict__['_compact_codes'] = codes
+            self.__dict__['_compact_values'] = {code: value for value, code in codes.items()}
+        return codes
+
+    def get_internal_type(self):
+        return 'SmallIntegerField' if compact_storage() else 'CharField'
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if not compact_storage() or value is None or hasattr(value, 'as_sql'):
+            return value
+        try:
+            return self._codes()[value]
+        except KeyError:
+            raise ValueError(f'{value!r} is not a valid choice for {self.name}')
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or not compact_storage():
+            return value
+        self._codes()
+        return self.__dict__['_compact_values'][value]
+
+
+class CompactGeneratedField(models.GeneratedField):
+    """
+    GeneratedField que se lee y se filtra a través de su output_field.
+
+    Plain GeneratedField resolves base-table columns with itself as output
+    field, so a CompactDecimalField output would skip its conversions:
+    values and lookups would be raw cents with COMPACT_STORAGE enabled.
+    """
+
+    def get_col(self, alias, output_field=None):
+        return super().get_col(alias, output_field or self.output_field)
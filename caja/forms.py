@@ -1,5 +1,6 @@
 from django import forms
 from django.utils import timezone
+from .commissions import commission_table
 from .models import Transaction, CashRegister, Bank, Entity
 
 class CashRegisterForm(forms.ModelForm):
@@ -24,7 +25,44 @@ class CashRegisterForm(forms.ModelForm):
             }),
         }
 
-class TransactionForm(forms.ModelForm):
+class TransactionRulesMixin:
+    """Validaciones de negocio compartidas por el formulario web y la sincronización"""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        payment_method = cleaned_data.get('payment_method')
+        bank = cleaned_data.get('bank')
+        entity = cleaned_data.get('entity')
+        amount = cleaned_data.get('amount')
+        commission = cleaned_data.get('commission')
+        commission_percentage = cleaned_data.get('commission_percentage')
+
+        # Validate bank requirement for certain payment methods
+        if payment_method in ['transfer', 'card'] and not bank:
+            raise forms.ValidationError(
+                'Debes seleccionar un banco para transferencias y pagos con tarjeta.'
+            )
+
+        # Entity/bank tariffs take precedence over the typed commission
+        quote = commission_table.quote(
+            amount,
+            cleaned_data.get('transaction_type'),
+            entity_id=getattr(entity, 'pk', entity),
+            bank_id=getattr(bank, 'pk', bank),
+        )
+        if quote is not None:
+            cleaned_data['commission'] = quote.commission
+            cleaned_data['commission_percentage'] = quote.percentage
+
+        # Calculate commission if percentage is provided
+        elif commission_percentage and amount:
+            calculated_commission = amount * (commission_percentage / 100)
+            if commission and abs(commission - calculated_commission) > 0.01:
+                cleaned_data['commission'] = calculated_commission
+
+        return cleaned_data
+
+class TransactionForm(TransactionRulesMixin, forms.ModelForm):
     class Meta:
         model = Transaction
         fields = [
@@ -106,28 +144,34 @@ class TransactionForm(forms.ModelForm):
         if 'initial' in kwargs and 'transaction_type' in kwargs['initial']:
             self.fields['transaction_type'].initial = kwargs['initial']['transaction_type']
 
-    def clean(self):
-        cleaned_data = super().clean()
-        payment_method = cleaned_data.get('payment_method')
-        bank = cleaned_data.get('bank')
-        entity = cleaned_data.get('entity')
-        amount = cleaned_data.get('amount')
-        commission = cleaned_data.get('commission')
-        commission_percentage = cleaned_data.get('commission_percentage')
+class TransactionSyncForm(TransactionRulesMixin, forms.ModelForm):
+    """
+    Valida una transacción encolada offline por un terminal del punto de venta.
 
-        # Validate bank requirement for certain payment methods
-        if payment_method in ['transfer', 'card'] and not bank:
-            raise forms.ValidationError(
-                'Debes seleccionar un banco para transferencias y pagos con tarjeta.'
-            )
+    Banks and entities are plain id choices preloaded once per batch, so
+    validating hundreds of items does not run a lookup query per item.
+    """
+    client_uuid = forms.UUIDField()
+    transaction_date = forms.DateTimeField(required=False)
+    bank = forms.TypedChoiceField(coerce=int, required=False, empty_value=None)
+    entity = forms.TypedChoiceField(coerce=int, required=False, empty_value=None)
+    cash_register = forms.IntegerField(required=False)
 
-        # Calculate commission if percentage is provided
-        if commission_percentage and amount:
-            calculated_commission = amount * (commission_percentage / 100)
-            if commission and abs(commission - calculated_commission) > 0.01:
-                cleaned_data['commission'] = calculated_commission
+    class Meta:
+        model = Transaction
+        fields = [
+            'transaction_type', 'amount', 'description', 'category', 'payment_method',
+            'commission', 'commission_percentage', 'reference_number', 'notes'
+        ]
 
-        return cleaned_data
+    def __init__(self, *args, bank_ids=(), entity_ids=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['bank'].choices = [('', '')] + [(pk, pk) for pk in bank_ids]
+        self.fields['entity'].choices = [('', '')] + [(pk, pk) for pk in entity_ids]
+
+        # Omitted fields fall back to the model defaults
+        for name in ('category', 'payment_method', 'commission', 'commission_percentage'):
+            self.fields[name].required = False
 
 class TransactionFilterForm(forms.Form):
     TRANSACTION_TYPE_CHOICES = [
@@ -0,0 +1,63 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+FORM_FIELD = 'idempotency_key'
+MAX_KEY_LENGTH = 64
+
+# Fields that change between renders of the same form and must not make a
+# genuine retry look like a different request.
+IGNORED_FIELDS = {'csrfmiddlewaretoken', FORM_FIELD}
+
+
+def get_key(request):
+    """Clave enviada en la cabecera (clientes API) o en el campo oculto del formulario"""
+    return (request.headers.get(HEADER) or request.POST.get(FORM_FIELD) or '').strip()
+
+
+def request_hash(request):
+    items = sorted(
+        (name, value)
+        for name, values in request.POST.lists()
+        if name not in IGNORED_FIELDS
+        for value in values
+    )
+    return hashlib.sha256(repr(items).encode()).hexdigest()
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def find(user, key):
+    return IdempotencyKey.objects.filter(
+        user=user,
+        key=key,
+        created_at__gte=expiry_cutoff()
+    ).select_related('transaction').first()
+
+
+def claim(user, key, fingerprint):
+    """
+    Reserva la clave dentro de la transacción de base de datos en curso.
+
+    Returns ``(record, created)``. A concurrent request holding the same key
+    blocks on the unique index until the first one commits and then gets the
+    stored record back, so only one of them writes.
+    """
+    IdempotencyKey.objects.filter(user=user, key=key, created_at__lt=expiry_cutoff()).delete()
+    return IdempotencyKey.objects.get_or_create(
+        user=user,
+        key=key,
+        defaults={'request_hash': fingerprint}
+    )
+
+
+def purge_expired():
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()
+    return deleted
@@ -0,0 +1,182 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from . import balances
+from .models import BalanceCheckpoint, CashRegister, Transaction, TransactionArchive
+
+# Changing any of these on a stored row would silently rewrite history and
+# every later balance_after; corrections go through reverse() instead. The
+# one exception is manage.py reprice_commissions, which rewrites commissions
+# of open registers only (no closing report yet, no effect on balance_after).
+FINANCIAL_FIELDS = ('transaction_type', 'amount', 'commission', 'cash_register_id')
+
+
+class LedgerError(Exception):
+    """Operación no permitida sobre el libro de caja"""
+
+
+def _advance(register, entries):
+    """Asigna secuencia y saldo a ``entries`` sobre una caja ya bloqueada"""
+    sequence = register.last_sequence
+    balance = register.current_balance
+    for entry in entries:
+        sequence += 1
+        balance += entry.signed_amount
+        entry.sequence = sequence
+        entry.balance_after = balance
+    return sequence, balance
+
+
+def _store_position(register, sequence, balance):
+    previous = register.last_sequence
+    CashRegister.objects.filter(pk=register.pk).update(
+        last_sequence=sequence,
+        current_balance=balance,
+        updated_at=timezone.now(),
+    )
+    register.last_sequence = sequence
+    register.current_balance = balance
+
+    interval = settings.BALANCE_CHECKPOINT_INTERVAL
+    if interval and sequence // interval > previous // interval:
+        write_checkpoint(register)
+
+
+def write_checkpoint(register):
+    """
+    Guarda los totales acumulados de la caja hasta su última secuencia.
+
+    Must run with the register row locked (inside post/post_many or after
+    select_for_update) so no entry lands between the aggregate and the write.
+    Returns None when the latest entry is already checkpointed.
+    """
+    totals = register.ledger_totals()
+    if not totals['sequence'] or register.checkpoints.filter(sequence=totals['sequence']).exists():
+        return None
+    return BalanceCheckpoint.objects.create(
+        cash_register=register,
+        sequence=totals['sequence'],
+        income_total=totals['income'],
+        outcome_total=totals['outcome'],
+        transaction_count=totals['count'],
+        balance=register.opening_balance + totals['income'] - totals['outcome'],
+    )
+
+
+def post(entry, *args, **kwargs):
+    """
+    Inserta una transacción al final del libro de su caja.
+
+    The register row is locked (SELECT ... FOR UPDATE) while the next sequence
+    number and balance are computed, so concurrent inserts on one register are
+    serialized and balance_after forms an unbroken running total. Bank and
+    entity balances are incremented in the same database transaction.
+    """
+    with transaction.atomic():
+        if entry.cash_register_id is None:
+            models.Model.save(entry, *args, **kwargs)
+            balances.apply([entry])
+            return entry
+
+        register = CashRegister.objects.select_for_update().get(pk=entry.cash_register_id)
+        sequence, balance = _advance(register, [entry])
+        models.Model.save(entry, *args, **kwargs)
+        _store_position(register, sequence, balance)
+        balances.apply([entry])
+
+    # Keep the caller's register instance in step with the stored row.
+    if Transaction.cash_register.is_cached(entry):
+        entry.cash_register.last_sequence = sequence
+        entry.cash_register.current_balance = balance
+    return entry
+
+
+def post_many(entries):
+    """Inserta varias transacciones con un bulk_create y una actualización por caja, banco y entidad"""
+    by_register = defaultdict(list)
+    for entry in entries:
+        by_register[entry.cash_register_id].append(entry)
+
+    with transaction.atomic():
+        registers = CashRegister.objects.select_for_update().filter(
+            pk__in=[pk for pk in by_register if pk is not None]
+        ).order_by('pk')
+        positions = [(register, _advance(register, by_register[register.pk])) for register in registers]
+        Transaction.objects.bulk_create(entries)
+        for register, (sequence, balance) in positions:
+            _store_position(register, sequence, balance)
+        balances.apply(entries)
+
+    stored = {register.pk: register for register, _ in positions}
+    for entry in entries:
+        if entry.cash_register_id and Transaction.cash_register.is_cached(entry):
+            entry.cash_register.last_sequence = stored[entry.cash_register_id].last_sequence
+            entry.cash_register.current_balance = stored[entry.cash_register_id].current_balance
+    return entries
+
+
+def check_immutable(entry):
+    stored = Transaction.objects.filter(pk=entry.pk).values(*FINANCIAL_FIELDS).first()
+    if stored is None:
+        return
+    changed = [name for name in FINANCIAL_FIELDS if getattr(entry, name) != stored[name]]
+    if changed:
+        raise LedgerError(
+            'Los campos financieros de una transacción registrada no se pueden modificar '
+            f'({", ".join(changed)}); registra una reversa.'
+        )
+
+
+def reverse(entry, user, reason=''):
+    """
+    Registra la transacción compensatoria de ``entry``.
+
+    The reversal has the opposite type, the same amount and the negated
+    commission, so it cancels the original's effect on the balance and on
+    every commission total without touching it.
+    """
+    with transaction.atomic():
+        original = Transaction.objects.select_for_update().get(pk=entry.pk)
+        if original.reverses_id is not None:
+            raise LedgerError('Una reversa no se puede reversar; registra una nueva transacción.')
+        if original.reversals.exists():
+            raise LedgerError('La transacción ya fue reversada.')
+        if original.cash_register_id and original.cash_register.status == 'closed':
+            raise LedgerError('La caja de la transacción ya está cerrada.')
+
+        return Transaction.objects.create(
+            transaction_type='outcome' if original.transaction_type == 'income' else 'income',
+            amount=original.amount,
+            commission=-original.commission,
+            commission_percentage=original.commission_percentage,
+            description=f'Reversa: {original.description}'[:255],
+            category=original.category,
+            payment_method=original.payment_method,
+            bank_id=original.bank_id,
+            entity_id=original.entity_id,
+            reference_number=original.reference_number,
+            notes=reason,
+            cash_register_id=original.cash_register_id,
+            reverses=original,
+            user=user,
+            transaction_date=timezone.now(),
+        )
+
+
+def balance_at(register, when):
+    """
+    Saldo de la caja en un instante dado.
+
+    One lookup on (cash_register, created_at): the balance_after of the last
+    entry recorded at or before ``when``.
+    """
+    model = TransactionArchive if register.archived_at else Transaction
+    balance = model.objects.filter(
+        cash_register=register,
+        created_at__lte=when,
+        sequence__isnull=False
+    ).order_by('-created_at', '-sequence').values_list('balance_after', flat=True).first()
+    return register.opening_balance if balance is None else balance
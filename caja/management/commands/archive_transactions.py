@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from caja.archive import archivable_registers, archive_register
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve a TransactionArchive las transacciones de cajas cerradas hace más de N meses, '
+        'una caja por transacción de base de datos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.TRANSACTION_ARCHIVE_MONTHS,
+                            help='Antigüedad mínima del cierre en meses')
+        parser.add_argument('--limit', type=int, help='Máximo de cajas a archivar en esta ejecución')
+        parser.add_argument('--dry-run', action='store_true', help='Solo listar las cajas a archivar')
+
+    def handle(self, *args, **options):
+        registers = archivable_registers(options['months']).values_list('pk', 'name', 'closed_at')
+        if options['limit']:
+            registers = registers[:options['limit']]
+
+        started = time.perf_counter()
+        archived = moved = failed = 0
+        for register_id, name, closed_at in registers:
+            if options['dry_run']:
+                self.stdout.write(f'{name} (cerrada {closed_at:%d/%m/%Y})')
+                continue
+            try:
+                rows = archive_register(register_id)
+            except (DatabaseError, RuntimeError) as exc:
+                # The register's transaction rolled back; carry on with the rest.
+                failed += 1
+                self.stderr.write(f'{name}: no se pudo archivar ({exc})')
+                continue
+            if rows is None:
+                continue
+            archived += 1
+            moved += rows
+
+        if not options['dry_run']:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f'{archived} cajas archivadas, {moved} transacciones movidas en {elapsed:.1f}s'
+            ))
+            if failed:
+                self.stderr.write(self.style.ERROR(f'{failed} cajas no se pudieron archivar'))
@@ -0,0 +1,77 @@
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+
+from caja.audit import empty_totals, audit_chunk, register_totals
+from caja.models import CashRegister
+
+FIELDS = ['register_id', 'register', 'status', 'check', 'stored', 'expected', 'difference']
+
+
+class Command(BaseCommand):
+    help = 'Verifica que el saldo de cada caja coincida con sus transacciones y su reporte de cierre'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Cajas por consulta agrupada')
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--output', help='Ruta del reporte CSV de discrepancias')
+        parser.add_argument('--fix', action='store_true', help='Corregir current_balance y last_sequence de las cajas con diferencias')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        register_ids = list(CashRegister.objects.order_by('pk').values_list('pk', flat=True))
+        size = options['chunk_size']
+        chunks = [register_ids[i:i + size] for i in range(0, len(register_ids), size)]
+
+        discrepancies = []
+        if options['processes'] > 1 and len(chunks) > 1:
+            # Forked workers must open their own connections, not share ours.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options['processes'],
+                mp_context=multiprocessing.get_context('fork'),
+            ) as pool:
+                for result in pool.map(audit_chunk, chunks):
+                    discrepancies.extend(result)
+        else:
+            for chunk in chunks:
+                discrepancies.extend(audit_chunk(chunk))
+
+        output = options['output'] or f'audit_balances_{timezone.now():%Y%m%d_%H%M%S}.csv'
+        with open(output, 'w', newline='') as handle:
+            writer = csv.DictWriter(handle, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(discrepancies)
+
+        affected = sorted({row['register_id'] for row in discrepancies})
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{len(register_ids)} cajas auditadas en {elapsed:.1f}s: '
+            f'{len(discrepancies)} discrepancias en {len(affected)} cajas ({output})'
+        )
+
+        if options['fix']:
+            fixable = sorted({
+                row['register_id'] for row in discrepancies
+                if row['check'] in ('current_balance', 'last_sequence')
+            })
+            fixed = sum(self.fix(fixable[i:i + size]) for i in range(0, len(fixable), size))
+            self.stdout.write(self.style.SUCCESS(f'{fixed} cajas corregidas'))
+
+    def fix(self, register_ids):
+        """Recalcula bajo bloqueo y corrige el lote con un solo bulk_update"""
+        with transaction.atomic():
+            registers = list(CashRegister.objects.select_for_update().filter(pk__in=register_ids).order_by('pk'))
+            totals = register_totals(register_ids)
+            for register in registers:
+                total = totals.get(register.pk) or empty_totals()
+                register.current_balance = register.opening_balance + total['income'] - total['outcome']
+                register.last_sequence = total['last_sequence']
+            CashRegister.objects.bulk_update(registers, ['current_balance', 'last_sequence'])
+        return len(registers)
@@ -0,0 +1,124 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from caja.models import Transaction
+
+# Scratch tables mirroring the hot Transaction columns in both layouts.
+LAYOUTS = {
+    'wide': {
+        'columns': (
+            'cash_register_id integer NOT NULL, transaction_type varchar(10) NOT NULL, '
+            'category varchar(25) NOT NULL, payment_method varchar(20) NOT NULL, '
+            'amount decimal(12, 2) NOT NULL, commission decimal(10, 2) NOT NULL, '
+            'commission_percentage decimal(5, 2) NOT NULL'
+        ),
+        'row': lambda r: (r[0], r[1], r[2], r[3], r[4], r[5], r[6]),
+    },
+    'compact': {
+        'columns': (
+            'cash_register_id integer NOT NULL, transaction_type smallint NOT NULL, '
+            'category smallint NOT NULL, payment_method smallint NOT NULL, '
+            'amount bigint NOT NULL, commission bigint NOT NULL, commission_percentage bigint NOT NULL'
+        ),
+        'row': lambda r: (
+            r[0], TYPES.index(r[1]) + 1, CATEGORIES.index(r[2]) + 1, METHODS.index(r[3]) + 1,
+            int(r[4] * 100), int(r[5] * 100), int(r[6] * 100),
+        ),
+    },
+}
+
+TYPES = [value for value, _ in Transaction.TRANSACTION_TYPES]
+CATEGORIES = [value for value, _ in Transaction.CATEGORY_CHOICES]
+METHODS = [value for value, _ in Transaction.PAYMENT_METHODS]
+
+
+class Command(BaseCommand):
+    help = 'Compara tamaño de tabla/índices y velocidad de agregados entre el formato decimal y el compacto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--repeat', type=int, default=5, help='Repeticiones de cada consulta')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError('Solo se soporta SQLite o PostgreSQL')
+
+        rng = random.Random(42)
+        rows = [
+            (
+                rng.randint(1, 50), rng.choice(TYPES), rng.choice(CATEGORIES), rng.choice(METHODS),
+                Decimal(rng.randint(100, 5000000)) / 100, Decimal(rng.randint(0, 50000)) / 100,
+                Decimal(rng.randint(0, 500)) / 100,
+            )
+            for _ in range(options['rows'])
+        ]
+
+        self.stdout.write(f'{"Formato":<10} {"tabla (KB)":>11} {"índice (KB)":>12} {"GROUP BY (ms)":>14} {"suma Python (ms)":>17}')
+        for name, layout in LAYOUTS.items():
+            table = f'bench_storage_{name}'
+            try:
+                self.create(table, layout, rows)
+                table_kb, index_kb = self.sizes(table)
+                sql_ms = self.timed(options['repeat'], lambda: self.group_by(table))
+                python_ms = self.timed(options['repeat'], lambda: self.python_sum(table, name))
+                self.stdout.write(f'{name:<10} {table_kb:>11.0f} {index_kb:>12.0f} {sql_ms:>14.2f} {python_ms:>17.2f}')
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+    def create(self, table, layout, rows):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+            cursor.execute(f'CREATE TABLE {table} (id integer PRIMARY KEY, {layout["columns"]})')
+            cursor.execute(f'CREATE INDEX {table}_idx ON {table} (cash_register_id, transaction_type, category)')
+            placeholders = ', '.join(['%s'] * 8)
+            cursor.executemany(
+                f'INSERT INTO {table} VALUES ({placeholders})',
+                [(i, *layout['row'](row)) for i, row in enumerate(rows, start=1)],
+            )
+            cursor.execute(f'ANALYZE {table}')
+
+    def sizes(self, table):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT pg_table_size(%s), pg_indexes_size(%s)', [table, table])
+                table_bytes, index_bytes = cursor.fetchone()
+            else:
+                try:
+                    cursor.execute('SELECT name, SUM(pgsize) FROM dbstat WHERE name IN (%s, %s) GROUP BY name',
+                                   [table, f'{table}_idx'])
+                except Exception:
+                    raise CommandError('SQLite sin la tabla virtual dbstat (SQLITE_ENABLE_DBSTAT_VTAB)')
+                found = dict(cursor.fetchall())
+                table_bytes, index_bytes = found.get(table, 0), found.get(f'{table}_idx', 0)
+        return table_bytes / 1024, index_bytes / 1024
+
+    def group_by(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT cash_register_id, transaction_type, SUM(amount), SUM(commission) '
+                f'FROM {table} GROUP BY cash_register_id, transaction_type'
+            )
+            return cursor.fetchall()
+
+    def python_sum(self, table, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT amount, commission FROM {table}')
+            fetched = cursor.fetchall()
+        if name == 'wide':
+            # What the ORM hands back for DecimalFields.
+            values = [(Decimal(str(amount)), Decimal(str(commission))) for amount, commission in fetched]
+            return sum(amount - commission for amount, commission in values)
+        return sum(amount - commission for amount, commission in fetched)
+
+    def timed(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings)
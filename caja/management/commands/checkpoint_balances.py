@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from caja.ledger import write_checkpoint
+from caja.models import CashRegister
+
+
+class Command(BaseCommand):
+    help = 'Escribe un punto de control de saldo para las cajas con transacciones nuevas desde el último'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Incluir cajas cerradas')
+
+    def handle(self, *args, **options):
+        registers = CashRegister.objects.annotate(
+            checkpointed=Max('checkpoints__sequence')
+        ).filter(last_sequence__gt=0)
+        if not options['all']:
+            registers = registers.exclude(status='closed')
+
+        written = 0
+        for register_id, last_sequence, checkpointed in registers.values_list('id', 'last_sequence', 'checkpointed'):
+            if checkpointed is not None and checkpointed >= last_sequence:
+                continue
+            with transaction.atomic():
+                register = CashRegister.objects.select_for_update().get(pk=register_id)
+                if write_checkpoint(register):
+                    written += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{written} puntos de control escritos'))
@@ -0,0 +1,161 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.test.utils import override_settings
+
+from caja.fields import CompactChoiceField, CompactDecimalField
+from caja.models import CashRegisterReport, Transaction, TransactionArchive
+
+MODELS = (Transaction, TransactionArchive, CashRegisterReport)
+
+TEMP_SUFFIX = '__compact_tmp'
+
+
+def compact_fields(model):
+    return [field for field in model._meta.local_fields
+            if isinstance(field, (CompactDecimalField, CompactChoiceField))]
+
+
+def column_kind(table, column):
+    """Tipo de campo Django que corresponde a la columna actual"""
+    with connection.cursor() as cursor:
+        for info in connection.introspection.get_table_description(cursor, table):
+            if info.name == column:
+                return connection.introspection.get_field_type(info.type_code, info)
+    raise CommandError(f'La columna {table}.{column} no existe')
+
+
+class Command(BaseCommand):
+    help = (
+        'Convierte las columnas de Transaction, TransactionArchive y CashRegisterReport entre el formato decimal/texto '
+        'y el compacto (centavos BIGINT, códigos SMALLINT) por lotes. Ejecutar con las cajas '
+        'detenidas y cambiar COMPACT_STORAGE al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--to', choices=['compact', 'decimal'], default='compact')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help='Solo mostrar las columnas a convertir')
+
+    def handle(self, *args, **options):
+        to_compact = options['to'] == 'compact'
+        for model in MODELS:
+            pending = [field for field in compact_fields(model) if self.needs_conversion(model, field, to_compact)]
+            if not pending:
+                self.stdout.write(f'{model._meta.db_table}: sin cambios')
+                continue
+            self.stdout.write(f'{model._meta.db_table}: {", ".join(f.column for f in pending)}')
+            if not options['dry_run']:
+                self.convert(model, pending, to_compact, options['batch_size'])
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'Conversión terminada: configura COMPACT_STORAGE={to_compact} y reinicia la aplicación.'
+            ))
+
+    def needs_conversion(self, model, field, to_compact):
+        kind = column_kind(model._meta.db_table, field.column)
+        compact_kinds = ('BigIntegerField', 'IntegerField', 'SmallIntegerField')
+        return (kind not in compact_kinds) if to_compact else (kind in compact_kinds)
+
+    def target_type(self, field, to_compact):
+        if isinstance(field, CompactDecimalField):
+            target = models.BigIntegerField() if to_compact else models.DecimalField(
+                max_digits=field.max_digits, decimal_places=field.decimal_places)
+        else:
+            target = models.SmallIntegerField() if to_compact else models.CharField(max_length=field.max_length)
+        return target.db_type(connection)
+
+    def expression(self, field, to_compact):
+        column = connection.ops.quote_name(field.column)
+        if isinstance(field, CompactDecimalField):
+            if to_compact:
+                return f'CAST(ROUND({column} * {field.scale}) AS BIGINT)', []
+            return f'{column} / {field.scale}.0', []
+
+        codes = field._codes()
+        cases = ' '.join('WHEN %s THEN %s' for _ in codes)
+        if to_compact:
+            params = [item for value, code in codes.items() for item in (value, code)]
+        else:
+            params = [item for value, code in codes.items() for item in (code, value)]
+        return f'CASE {column} {cases} END', params
+
+    def convert(self, model, fields, to_compact, batch_size):
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        pk = quote(model._meta.pk.column)
+
+        # Generated columns (Transaction.net_amount) reference the converted
+        # columns and bake choice codes into their expression: drop them
+        # first and recreate them for the target layout at the end.
+        generated = [field for field in model._meta.local_fields if field.generated]
+        names = {field.name for field in generated}
+        generated_indexes = [index for index in model._meta.indexes if names.intersection(index.fields)]
+        with connection.cursor() as cursor:
+            existing = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        with override_settings(COMPACT_STORAGE=not to_compact), connection.schema_editor() as editor:
+            for index in generated_indexes:
+                if index.name in existing:
+                    editor.remove_index(model, index)
+            for field in generated:
+                editor.remove_field(model, field)
+
+        # 1. New columns next to the old ones
+        for field in fields:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'ALTER TABLE {table} ADD COLUMN {quote(field.column + TEMP_SUFFIX)} '
+                    f'{self.target_type(field, to_compact)} NULL'
+                )
+
+        # 2. Copy in primary-key ranges, one short transaction per batch
+        assignments, params = [], []
+        for field in fields:
+            sql, field_params = self.expression(field, to_compact)
+            assignments.append(f'{quote(field.column + TEMP_SUFFIX)} = {sql}')
+            params.extend(field_params)
+        update = f'UPDATE {table} SET {", ".join(assignments)} WHERE {pk} >= %s AND {pk} < %s'
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MIN({pk}), MAX({pk}) FROM {table}')
+            low, high = cursor.fetchone()
+        copied = 0
+        if low is not None:
+            for start in range(low, high + 1, batch_size):
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(update, params + [start, start + batch_size])
+                    copied += cursor.rowcount
+        self.stdout.write(f'  {copied} filas copiadas')
+
+        # 3. Swap the columns
+        with transaction.atomic(), connection.cursor() as cursor:
+            for field in fields:
+                cursor.execute(f'ALTER TABLE {table} DROP COLUMN {quote(field.column)}')
+                cursor.execute(
+                    f'ALTER TABLE {table} RENAME COLUMN {quote(field.column + TEMP_SUFFIX)} TO {quote(field.column)}'
+                )
+
+        with override_settings(COMPACT_STORAGE=to_compact), connection.schema_editor() as editor:
+            for field in generated:
+                editor.add_field(model, field)
+                self.stdout.write(f'  {field.column} recalculada')
+            # SQLite may rebuild the table with its Meta indexes already.
+            with connection.cursor() as cursor:
+                existing = connection.introspection.get_constraints(cursor, model._meta.db_table)
+            for index in generated_indexes:
+                if index.name not in existing:
+                    editor.add_index(model, index)
+
+            # 4. Restore NOT NULL, which ADD COLUMN could not set. SQLite has
+            # no ALTER COLUMN: it rebuilds the table from the model, which
+            # fixes every column at once.
+            for field in fields:
+                if field.null:
+                    continue
+                nullable = field.clone()
+                nullable.null = True
+                nullable.set_attributes_from_name(field.name)
+                nullable.model = model
+                editor.alter_field(model, nullable, field)
+                if connection.vendor == 'sqlite':
+                    break
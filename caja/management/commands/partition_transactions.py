@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from caja import partitions
+from caja.models import Transaction, TransactionArchive
+
+
+class Command(BaseCommand):
+    help = (
+        'PostgreSQL: particiona caja_transaction por mes de transaction_date (--convert, una sola vez) '
+        'y crea las particiones mensuales de los próximos meses en la tabla y en el archivo'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true',
+                            help='Convertir la tabla actual en particionada (bloquea la tabla mientras copia)')
+        parser.add_argument('--months-ahead', type=int, default=settings.TRANSACTION_PARTITION_MONTHS_AHEAD)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El particionado declarativo solo está disponible en PostgreSQL')
+
+        table = Transaction._meta.db_table
+        last_month = partitions.add_months(partitions.month_start(date.today()), options['months_ahead'])
+
+        if not partitions.is_partitioned(table):
+            if not options['convert']:
+                raise CommandError(f'{table} no está particionada; ejecuta con --convert en una ventana de mantenimiento')
+            try:
+                with transaction.atomic():
+                    keys = partitions.convert_to_partitioned(table, options['months_ahead'])
+            except ValueError as error:
+                raise CommandError(str(error))
+            self.stdout.write(self.style.SUCCESS(f'{table} particionada por mes'))
+            if keys:
+                self.stdout.write(f'  Unicidad global y llaves foráneas mantenidas en {keys}')
+
+        for model in (Transaction, TransactionArchive):
+            table = model._meta.db_table
+            if not partitions.is_partitioned(table):
+                continue
+            with transaction.atomic():
+                created = partitions.ensure_partitions(table, partitions.month_start(date.today()), last_month)
+            self.stdout.write(f'{table}: {len(created)} particiones nuevas ({", ".join(created) or "ninguna"})')
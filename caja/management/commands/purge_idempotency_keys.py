@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from caja.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Elimina las claves de idempotencia vencidas (IDEMPOTENCY_KEY_TTL_HOURS)'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} claves de idempotencia eliminadas'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from caja.balances import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los saldos materializados de bancos y entidades desde las transacciones'
+
+    def handle(self, *args, **options):
+        created = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{created} filas de saldo reconstruidas'))
@@ -0,0 +1,105 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from caja import balances
+from caja.commissions import CommissionTable, compile_rules
+from caja.models import CashRegister, Transaction
+
+
+def _parse_date(value, end=False):
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Fecha inválida: {value} (usa AAAA-MM-DD)')
+    return timezone.make_aware(datetime.combine(day, time.max if end else time.min))
+
+
+class Command(BaseCommand):
+    """
+    Recalcula las comisiones de las transacciones de cajas abiertas.
+
+    Closed registers have stored closing reports, so only open ones are
+    touched. Rows are priced in Python, batch by batch. Each batch is written
+    with one UPDATE ... CASE, from bulk_update, while its registers are
+    locked, together with the matching bank and entity commission_total
+    deltas. Commission does not enter the register balance, so sequence and
+    balance_after stay valid. Reversals and reversed entries are skipped:
+    their commissions must keep cancelling.
+    """
+
+    help = 'Recalcula las comisiones de las transacciones de cajas abiertas con las tarifas vigentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='Desde la fecha (AAAA-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Hasta la fecha (AAAA-MM-DD)')
+        parser.add_argument('--entity', type=int, help='Solo transacciones de esta entidad')
+        parser.add_argument('--bank', type=int, help='Solo transacciones de este banco')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help='Solo mostrar cuántas cambiarían')
+
+    def handle(self, *args, **options):
+        queryset = Transaction.objects.filter(
+            cash_register__status='open',
+            reverses__isnull=True,
+            reversals__isnull=True,
+        )
+        if options['date_from']:
+            queryset = queryset.filter(transaction_date__gte=_parse_date(options['date_from']))
+        if options['date_to']:
+            queryset = queryset.filter(transaction_date__lte=_parse_date(options['date_to'], end=True))
+        if options['entity']:
+            queryset = queryset.filter(entity_id=options['entity'])
+        if options['bank']:
+            queryset = queryset.filter(bank_id=options['bank'])
+
+        # Compiled once from the database, not from the per-process cache.
+        table = compile_rules()
+        pricer = CommissionTable()
+        fields = ('id', 'amount', 'transaction_type', 'entity_id', 'bank_id',
+                  'commission', 'commission_percentage', 'transaction_date', 'cash_register_id')
+
+        scanned = changed = 0
+        delta_total = 0
+        last_id = 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list(*fields)[:options['batch_size']])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            scanned += len(rows)
+
+            repriced = []
+            for pk, amount, transaction_type, entity_id, bank_id, commission, percentage, transaction_date, register_id in rows:
+                quote = pricer.quote(amount, transaction_type, entity_id=entity_id, bank_id=bank_id, table=table)
+                if quote is None or (quote.commission, quote.percentage) == (commission, percentage):
+                    continue
+                repriced.append((pk, register_id, quote, (bank_id, entity_id, transaction_date, quote.commission - commission)))
+
+            if repriced and not options['dry_run']:
+                with transaction.atomic():
+                    # Same lock as close_register: a register cannot be closed,
+                    # and its report generated, halfway through a batch.
+                    register_ids = sorted({register_id for _, register_id, _, _ in repriced})
+                    still_open = set(
+                        CashRegister.objects.select_for_update().filter(
+                            pk__in=register_ids, status='open'
+                        ).order_by('pk').values_list('pk', flat=True)
+                    )
+                    repriced = [row for row in repriced if row[1] in still_open]
+                    now = timezone.now()
+                    Transaction.objects.bulk_update([
+                        Transaction(pk=pk, commission=quote.commission, commission_percentage=quote.percentage, updated_at=now)
+                        for pk, _, quote, _ in repriced
+                    ], ['commission', 'commission_percentage', 'updated_at'])
+                    balances.adjust_commissions([adjustment for *_, adjustment in repriced])
+
+            changed += len(repriced)
+            delta_total += sum(adjustment[3] for *_, adjustment in repriced)
+
+        verb = 'cambiarían' if options['dry_run'] else 'actualizadas'
+        self.stdout.write(self.style.SUCCESS(
+            f'{scanned} transacciones revisadas, {changed} {verb} (diferencia total ${delta_total:,.2f})'
+        ))
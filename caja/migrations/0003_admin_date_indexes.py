@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0002_transaction_category_cashregisterreport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cashregisterreport',
+            index=models.Index(fields=['created_at'], name='caja_report_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_date'], name='caja_txn_date_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0003_admin_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='client_uuid',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True, verbose_name='UUID del Terminal'),
+        ),
+    ]
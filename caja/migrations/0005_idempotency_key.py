@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0004_transaction_client_uuid'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, verbose_name='Clave')),
+                ('request_hash', models.CharField(max_length=64, verbose_name='Huella de la Solicitud')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='caja.transaction', verbose_name='Transacción')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Clave de Idempotencia',
+                'verbose_name_plural': 'Claves de Idempotencia',
+                'indexes': [models.Index(fields=['created_at'], name='caja_idempotency_created_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'key'), name='caja_idempotency_user_key_uniq')],
+            },
+        ),
+    ]
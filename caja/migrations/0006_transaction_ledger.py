@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_ledger(apps, schema_editor):
+    """Numera las transacciones existentes en orden de registro y calcula su saldo acumulado"""
+    CashRegister = apps.get_model('caja', 'CashRegister')
+    Transaction = apps.get_model('caja', 'Transaction')
+
+    for register in CashRegister.objects.all().iterator():
+        balance = register.opening_balance
+        sequence = 0
+        batch = []
+        rows = Transaction.objects.filter(cash_register=register).order_by('created_at', 'id').only(
+            'id', 'transaction_type', 'amount'
+        )
+        for txn in rows.iterator(chunk_size=2000):
+            sequence += 1
+            balance += txn.amount if txn.transaction_type == 'income' else -txn.amount
+            txn.sequence = sequence
+            txn.balance_after = balance
+            batch.append(txn)
+            if len(batch) >= 2000:
+                Transaction.objects.bulk_update(batch, ['sequence', 'balance_after'])
+                batch = []
+        Transaction.objects.bulk_update(batch, ['sequence', 'balance_after'])
+        CashRegister.objects.filter(pk=register.pk).update(last_sequence=sequence, current_balance=balance)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0005_idempotency_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashregister',
+            name='last_sequence',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Última Secuencia'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='balance_after',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True, verbose_name='Saldo Después'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='reverses',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='reversals', to='caja.transaction', verbose_name='Reversa de'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='sequence',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Secuencia'),
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['cash_register', 'created_at'], name='caja_txn_register_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(fields=('cash_register', 'sequence'), name='caja_txn_register_seq_uniq'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0006_transaction_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField(verbose_name='Hasta la Secuencia')),
+                ('income_total', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Ingresos Acumulados')),
+                ('outcome_total', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Egresos Acumulados')),
+                ('transaction_count', models.PositiveIntegerField(verbose_name='Transacciones Acumuladas')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Saldo')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('cash_register', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='caja.cashregister', verbose_name='Caja Registradora')),
+            ],
+            options={
+                'verbose_name': 'Punto de Control de Saldo',
+                'verbose_name_plural': 'Puntos de Control de Saldo',
+                'ordering': ['cash_register', '-sequence'],
+                'constraints': [models.UniqueConstraint(fields=('cash_register', 'sequence'), name='caja_checkpoint_register_seq_uniq')],
+            },
+        ),
+    ]
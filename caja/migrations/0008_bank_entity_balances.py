@@ -0,0 +1,96 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:16
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_balances(apps, schema_editor):
+    """Carga los saldos iniciales; equivale a manage.py rebuild_balances"""
+    Transaction = apps.get_model('caja', 'Transaction')
+    targets = [
+        (apps.get_model('caja', 'BankBalance'), 'bank_id'),
+        (apps.get_model('caja', 'EntityBalance'), 'entity_id'),
+    ]
+    daily = getattr(settings, 'MATERIALIZED_DAILY_BALANCES', True)
+
+    for model, field in targets:
+        for by_day in ((False, True) if daily else (False,)):
+            rows = Transaction.objects.filter(**{f'{field}__isnull': False})
+            extra = ()
+            if by_day:
+                rows = rows.annotate(day=TruncDate('transaction_date'))
+                extra = ('day',)
+            rows = rows.values(field, *extra).annotate(
+                income=Sum('amount', filter=Q(transaction_type='income')),
+                outcome=Sum('amount', filter=Q(transaction_type='outcome')),
+                commission=Sum('commission'),
+                count=Count('id'),
+            ).order_by()
+            model.objects.bulk_create([
+                model(
+                    **{field: row[field]},
+                    day=row.get('day'),
+                    income_total=row['income'] or Decimal('0.00'),
+                    outcome_total=row['outcome'] or Decimal('0.00'),
+                    commission_total=row['commission'] or Decimal('0.00'),
+                    transaction_count=row['count'],
+                    balance=(row['income'] or Decimal('0.00')) - (row['outcome'] or Decimal('0.00')),
+                )
+                for row in rows
+            ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0007_balance_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(blank=True, null=True, verbose_name='Día')),
+                ('income_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Ingresos')),
+                ('outcome_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Egresos')),
+                ('commission_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Comisiones')),
+                ('transaction_count', models.PositiveIntegerField(default=0, verbose_name='Transacciones')),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Saldo')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('bank', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='caja.bank', verbose_name='Banco')),
+            ],
+            options={
+                'verbose_name': 'Saldo de Banco',
+                'verbose_name_plural': 'Saldos de Bancos',
+                'ordering': ['bank', '-day'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('bank',), name='caja_bankbalance_total_uniq'), models.UniqueConstraint(fields=('bank', 'day'), name='caja_bankbalance_day_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EntityBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(blank=True, null=True, verbose_name='Día')),
+                ('income_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Ingresos')),
+                ('outcome_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Egresos')),
+                ('commission_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Comisiones')),
+                ('transaction_count', models.PositiveIntegerField(default=0, verbose_name='Transacciones')),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='Saldo')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('entity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='caja.entity', verbose_name='Entidad')),
+            ],
+            options={
+                'verbose_name': 'Saldo de Entidad',
+                'verbose_name_plural': 'Saldos de Entidades',
+                'ordering': ['entity', '-day'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('entity',), name='caja_entitybalance_total_uniq'), models.UniqueConstraint(fields=('entity', 'day'), name='caja_entitybalance_day_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
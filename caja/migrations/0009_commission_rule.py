@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:18
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0008_bank_entity_balances'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommissionRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_type', models.CharField(blank=True, choices=[('income', 'Ingreso'), ('outcome', 'Egreso')], help_text='Vacío aplica a ambos tipos', max_length=10, verbose_name='Tipo de Transacción')),
+                ('min_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))], verbose_name='Desde Valor')),
+                ('fixed_fee', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))], verbose_name='Tarifa Fija')),
+                ('percentage', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=5, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))], verbose_name='% Comisión')),
+                ('max_commission', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Comisión Máxima')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('bank', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='commission_rules', to='caja.bank', verbose_name='Banco')),
+                ('entity', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='commission_rules', to='caja.entity', verbose_name='Entidad')),
+            ],
+            options={
+                'verbose_name': 'Regla de Comisión',
+                'verbose_name_plural': 'Reglas de Comisión',
+                'ordering': ['entity', 'bank', 'transaction_type', 'min_amount'],
+                'constraints': [models.UniqueConstraint(fields=('entity', 'bank', 'transaction_type', 'min_amount'), name='caja_commission_rule_tier_uniq')],
+            },
+        ),
+    ]
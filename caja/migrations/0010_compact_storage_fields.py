@@ -0,0 +1,131 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:20
+
+import caja.fields
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0009_commission_rule'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='bank_operations_income',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Ingresos Operaciones Bancarias'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='card_total',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Total Tarjetas'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='cash_difference',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Diferencia en Efectivo'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='cash_total',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Total Efectivo'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='closing_balance',
+            field=caja.fields.CompactDecimalField(decimal_places=2, max_digits=12, verbose_name='Saldo Final'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='commission_income',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Ingresos por Comisiones'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='general_transactions_income',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Ingresos Transacciones Generales'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='opening_balance',
+            field=caja.fields.CompactDecimalField(decimal_places=2, max_digits=12, verbose_name='Saldo Inicial'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='other_income',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Otros Ingresos'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='other_payment_total',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Otros Métodos de Pago'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='papeleria_income',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Ingresos Papelería'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='physical_cash_count',
+            field=caja.fields.CompactDecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Conteo Físico de Efectivo'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='total_commissions',
+            field=caja.fields.CompactDecimalField(decimal_places=2, max_digits=12, verbose_name='Total Comisiones'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='total_income',
+            field=caja.fields.CompactDecimalField(decimal_places=2, max_digits=12, verbose_name='Total Ingresos'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='total_outcome',
+            field=caja.fields.CompactDecimalField(decimal_places=2, max_digits=12, verbose_name='Total Egresos'),
+        ),
+        migrations.AlterField(
+            model_name='cashregisterreport',
+            name='transfer_total',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Total Transferencias'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='amount',
+            field=caja.fields.CompactDecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='Valor'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='balance_after',
+            field=caja.fields.CompactDecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True, verbose_name='Saldo Después'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='category',
+            field=caja.fields.CompactChoiceField(choices=[('general_transaction', 'Transacción General'), ('papeleria_sale', 'Venta de Papelería'), ('bank_operation', 'Operación Bancaria'), ('commission_income', 'Ingreso por Comisiones'), ('expense_operational', 'Gasto Operacional'), ('expense_supplies', 'Gasto en Suministros'), ('cash_adjustment', 'Ajuste de Caja'), ('other_income', 'Otros Ingresos'), ('other_expense', 'Otros Gastos')], default='general_transaction', max_length=25, verbose_name='Categoría'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='commission',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))], verbose_name='Comisión'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='commission_percentage',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Porcentaje de comisión aplicado', max_digits=5, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))], verbose_name='% Comisión'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='payment_method',
+            field=caja.fields.CompactChoiceField(choices=[('cash', 'Efectivo'), ('transfer', 'Transferencia'), ('card', 'Tarjeta'), ('check', 'Cheque'), ('digital_wallet', 'Billetera Digital'), ('other', 'Otro')], default='cash', max_length=20, verbose_name='Método de Pago'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='transaction_type',
+            field=caja.fields.CompactChoiceField(choices=[('income', 'Ingreso'), ('outcome', 'Egreso')], max_length=10, verbose_name='Tipo de Transacción'),
+        ),
+    ]
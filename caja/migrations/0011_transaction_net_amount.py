@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:25
+
+import caja.fields
+import django.db.models.expressions
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_net_total(apps, schema_editor):
+    """Neto de los reportes existentes: ingresos - egresos - comisiones"""
+    CashRegisterReport = apps.get_model('caja', 'CashRegisterReport')
+    CashRegisterReport.objects.update(
+        net_total=models.F('total_income') - models.F('total_outcome') - models.F('total_commissions')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0010_compact_storage_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashregisterreport',
+            name='net_total',
+            field=caja.fields.CompactDecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12, verbose_name='Neto después de Comisiones'),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='net_amount',
+            field=caja.fields.CompactGeneratedField(db_persist=True, expression=models.Case(models.When(then=django.db.models.expressions.CombinedExpression(models.F('amount'), '-', models.F('commission')), transaction_type='income'), default=django.db.models.expressions.CombinedExpression(models.F('amount'), '+', models.F('commission'))), output_field=caja.fields.CompactDecimalField(decimal_places=2, max_digits=13), verbose_name='Monto Neto'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['net_amount'], name='caja_txn_net_amount_idx'),
+        ),
+        migrations.RunPython(backfill_net_total, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:29
+
+import caja.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def partition_archive(apps, schema_editor):
+    """En PostgreSQL el archivo se particiona por mes desde el inicio"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from caja.partitions import convert_to_partitioned
+    convert_to_partitioned('caja_transactionarchive', months_ahead=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('caja', '0011_transaction_net_amount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashregister',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Archivada el'),
+        ),
+        migrations.CreateModel(
+            name='TransactionArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('transaction_type', caja.fields.CompactChoiceField(choices=[('income', 'Ingreso'), ('outcome', 'Egreso')], max_length=10, verbose_name='Tipo de Transacción')),
+                ('amount', caja.fields.CompactDecimalField(decimal_places=2, max_digits=12, verbose_name='Monto')),
+                ('description', models.CharField(max_length=255, verbose_name='Descripción')),
+                ('category', caja.fields.CompactChoiceField(choices=[('general_transaction', 'Transacción General'), ('papeleria_sale', 'Venta de Papelería'), ('bank_operation', 'Operación Bancaria'), ('commission_income', 'Ingreso por Comisiones'), ('expense_operational', 'Gasto Operacional'), ('expense_supplies', 'Gasto en Suministros'), ('cash_adjustment', 'Ajuste de Caja'), ('other_income', 'Otros Ingresos'), ('other_expense', 'Otros Gastos')], max_length=25, verbose_name='Categoría')),
+                ('payment_method', caja.fields.CompactChoiceField(choices=[('cash', 'Efectivo'), ('transfer', 'Transferencia'), ('card', 'Tarjeta'), ('check', 'Cheque'), ('digital_wallet', 'Billetera Digital'), ('other', 'Otro')], max_length=20, verbose_name='Método de Pago')),
+                ('commission', caja.fields.CompactDecimalField(decimal_places=2, max_digits=10, verbose_name='Comisión')),
+                ('commission_percentage', caja.fields.CompactDecimalField(decimal_places=2, max_digits=5, verbose_name='% Comisión')),
+                ('net_amount', caja.fields.CompactDecimalField(decimal_places=2, max_digits=13, verbose_name='Monto Neto')),
+                ('reference_number', models.CharField(blank=True, max_length=50, verbose_name='Número de Referencia')),
+                ('notes', models.TextField(blank=True, verbose_name='Notas')),
+                ('client_uuid', models.UUIDField(blank=True, null=True, verbose_name='UUID del Terminal')),
+                ('sequence', models.PositiveIntegerField(blank=True, null=True, verbose_name='Secuencia')),
+                ('balance_after', caja.fields.CompactDecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='Saldo Después')),
+                ('reverses_id', models.BigIntegerField(blank=True, null=True, verbose_name='Reversa de')),
+                ('transaction_date', models.DateTimeField(verbose_name='Fecha de Transacción')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('bank', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='caja.bank', verbose_name='Banco')),
+                ('cash_register', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='archived_transactions', to='caja.cashregister', verbose_name='Caja Registradora')),
+                ('entity', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='caja.entity', verbose_name='Entidad')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuario que registra')),
+            ],
+            options={
+                'verbose_name': 'Transacción Archivada',
+                'verbose_name_plural': 'Transacciones Archivadas',
+                'ordering': ['-transaction_date', '-created_at'],
+                'indexes': [models.Index(fields=['cash_register', 'sequence'], name='caja_archive_register_seq_idx'), models.Index(fields=['user', 'transaction_date'], name='caja_archive_user_date_idx')],
+            },
+        ),
+        migrations.RunPython(partition_archive, migrations.RunPython.noop),
+    ]
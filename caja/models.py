@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+from datetime import datetime, time, timedelta
 from decimal import Decimal
+from .fields import CompactChoiceField, CompactDecimalField, CompactGeneratedField
 
 User = get_user_model()
 
@@ -20,6 +24,11 @@ class Bank(models.Model):
     def __str__(self):
         return f"{self.name} ({self.code})"
 
+    @property
+    def balance(self):
+        """Saldo acumulado de las transacciones del banco (una lectura de fila)"""
+        return self.balances.filter(day__isnull=True).values_list('balance', flat=True).first() or Decimal('0.00')
+
 class Entity(models.Model):
     ENTITY_TYPES = [
         ('bank', 'Banco'),
@@ -49,6 +58,89 @@ class Entity(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_entity_type_display()})"
 
+    @property
+    def balance(self):
+        """Saldo acumulado de las transacciones de la entidad (una lectura de fila)"""
+        return self.balances.filter(day__isnull=True).values_list('balance', flat=True).first() or Decimal('0.00')
+
+class CommissionRule(models.Model):
+    """
+    Tramo de la tarifa de comisión de una entidad o banco.
+
+    A tariff is the set of active rules sharing (entity, bank, transaction
+    type); each rule applies from ``min_amount`` up to the next rule's
+    ``min_amount``. Blank entity, bank or type act as wildcards.
+    """
+    entity = models.ForeignKey(
+        Entity,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='commission_rules',
+        verbose_name='Entidad'
+    )
+    bank = models.ForeignKey(
+        Bank,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='commission_rules',
+        verbose_name='Banco'
+    )
+    transaction_type = models.CharField(
+        max_length=10,
+        choices=[('income', 'Ingreso'), ('outcome', 'Egreso')],
+        blank=True,
+        verbose_name='Tipo de Transacción',
+        help_text='Vacío aplica a ambos tipos'
+    )
+    min_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        validators=[MinValueValidator(Decimal('0.00'))],
+        verbose_name='Desde Valor'
+    )
+    fixed_fee = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        validators=[MinValueValidator(Decimal('0.00'))],
+        verbose_name='Tarifa Fija'
+    )
+    percentage = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        validators=[MinValueValidator(Decimal('0.00'))],
+        verbose_name='% Comisión'
+    )
+    max_commission = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Comisión Máxima'
+    )
+    is_active = models.BooleanField(default=True, verbose_name='Activo')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Regla de Comisión'
+        verbose_name_plural = 'Reglas de Comisión'
+        ordering = ['entity', 'bank', 'transaction_type', 'min_amount']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['entity', 'bank', 'transaction_type', 'min_amount'],
+                name='caja_commission_rule_tier_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        target = self.entity or self.bank or 'General'
+        return f"{target} desde ${self.min_amount}: ${self.fixed_fee} + {self.percentage}%"
+
 class CashRegister(models.Model):
     STATUS_CHOICES = [
         ('open', 'Abierta'),
@@ -91,8 +183,16 @@ class CashRegister(models.Model):
         blank=True,
         verbose_name='Cerrada por'
     )
+    last_sequence = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Última Secuencia'
+    )
     opened_at = models.DateTimeField(null=True, blank=True, verbose_name='Fecha de Apertura')
     closed_at = models.DateTimeField(null=True, blank=True, verbose_name='Fecha de Cierre')
+    # Set by manage.py archive_transactions once the register's entries
+    # live in TransactionArchive instead of Transaction.
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name='Archivada el')
     notes = models.TextField(blank=True, verbose_name='Notas')
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -106,23 +206,82 @@ class CashRegister(models.Model):
     def __str__(self):
         return f"{self.name} - {self.get_status_display()}"
 
+    def ledger_totals(self):
+        """
+        Ingresos, egresos y número de transacciones acumulados de la caja.
+
+        Starts from the latest BalanceCheckpoint and aggregates only the rows
+        recorded after it, so the cost is bounded by the checkpoint interval
+        rather than by the register's history.
+        """
+        checkpoint = self.checkpoints.order_by('-sequence').first()
+        rows = self.transactions.all()
+        totals = {'income': Decimal('0.00'), 'outcome': Decimal('0.00'), 'count': 0, 'sequence': 0}
+        if checkpoint:
+            rows = rows.filter(sequence__gt=checkpoint.sequence)
+            totals = {
+                'income': checkpoint.income_total,
+                'outcome': checkpoint.outcome_total,
+                'count': checkpoint.transaction_count,
+                'sequence': checkpoint.sequence,
+            }
+
+        recent = rows.aggregate(
+            income=models.Sum('amount', filter=models.Q(transaction_type='income')),
+            outcome=models.Sum('amount', filter=models.Q(transaction_type='outcome')),
+            count=models.Count('id'),
+            sequence=models.Max('sequence'),
+        )
+        totals['income'] += recent['income'] or Decimal('0.00')
+        totals['outcome'] += recent['outcome'] or Decimal('0.00')
+        totals['count'] += recent['count']
+        totals['sequence'] = recent['sequence'] or totals['sequence']
+        return totals
+
     def calculate_balance(self):
         """Calcula el balance basado en las transacciones"""
-        income_total = self.transactions.filter(
-            transaction_type='income'
-        ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
-
-        outcome_total = self.transactions.filter(
-            transaction_type='outcome'
-        ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
-
-        return self.opening_balance + income_total - outcome_total
+        totals = self.ledger_totals()
+        return self.opening_balance + totals['income'] - totals['outcome']
 
     def update_balance(self):
-        """Actualiza el balance actual"""
+        """Recalcula el balance actual a partir de las transacciones (reparación)"""
         self.current_balance = self.calculate_balance()
         self.save(update_fields=['current_balance'])
 
+class TransactionQuerySet(models.QuerySet):
+    """
+    Filtros por fecha que PostgreSQL puede usar para descartar particiones.
+
+    ``transaction_date__date=...`` compiles to a cast of the column, which
+    defeats partition pruning; these helpers always compare the raw column
+    against a half-open range.
+    """
+
+    @staticmethod
+    def day_start(day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def between(self, start, end):
+        return self.filter(transaction_date__gte=start, transaction_date__lt=end)
+
+    def on_day(self, day):
+        return self.between_days(day, day)
+
+    def between_days(self, first=None, last=None):
+        """Transacciones entre dos fechas, ambas inclusive; cualquiera puede omitirse"""
+        queryset = self
+        if first:
+            queryset = queryset.filter(transaction_date__gte=self.day_start(first))
+        if last:
+            queryset = queryset.filter(transaction_date__lt=self.day_start(last) + timedelta(days=1))
+        return queryset
+
+    def recent(self, days=None):
+        """Transacciones de los últimos TRANSACTION_HOT_DAYS días (las particiones calientes)"""
+        days = settings.TRANSACTION_HOT_DAYS if days is None else days
+        return self.filter(transaction_date__gte=timezone.now() - timedelta(days=days))
+
+
 class Transaction(models.Model):
     TRANSACTION_TYPES = [
         ('income', 'Ingreso'),
@@ -150,25 +309,25 @@ class Transaction(models.Model):
         ('other_expense', 'Otros Gastos'),
     ]
 
-    transaction_type = models.CharField(
+    transaction_type = CompactChoiceField(
         max_length=10,
         choices=TRANSACTION_TYPES,
         verbose_name='Tipo de Transacción'
     )
-    amount = models.DecimalField(
+    amount = CompactDecimalField(
         max_digits=12,
         decimal_places=2,
         validators=[MinValueValidator(Decimal('0.01'))],
         verbose_name='Valor'
     )
     description = models.CharField(max_length=255, verbose_name='Descripción')
-    category = models.CharField(
+    category = CompactChoiceField(
         max_length=25,
         choices=CATEGORY_CHOICES,
         default='general_transaction',
         verbose_name='Categoría'
     )
-    payment_method = models.CharField(
+    payment_method = CompactChoiceField(
         max_length=20,
         choices=PAYMENT_METHODS,
         default='cash',
@@ -188,14 +347,14 @@ class Transaction(models.Model):
         blank=True,
         verbose_name='Entidad'
     )
-    commission = models.DecimalField(
+    commission = CompactDecimalField(
         max_digits=10,
         decimal_places=2,
         default=Decimal('0.00'),
         validators=[MinValueValidator(Decimal('0.00'))],
         verbose_name='Comisión'
     )
-    commission_percentage = models.DecimalField(
+    commission_percentage = CompactDecimalField(
         max_digits=5,
         decimal_places=2,
         default=Decimal('0.00'),
@@ -203,6 +362,16 @@ class Transaction(models.Model):
         verbose_name='% Comisión',
         help_text='Porcentaje de comisión aplicado'
     )
+    # Computed by the database so net totals can be summed and sorted in SQL.
+    net_amount = CompactGeneratedField(
+        expression=models.Case(
+            models.When(transaction_type='income', then=models.F('amount') - models.F('commission')),
+            default=models.F('amount') + models.F('commission'),
+        ),
+        output_field=CompactDecimalField(max_digits=13, decimal_places=2),
+        db_persist=True,
+        verbose_name='Monto Neto'
+    )
     reference_number = models.CharField(
         max_length=50,
         blank=True,
@@ -218,6 +387,37 @@ class Transaction(models.Model):
         verbose_name='Caja Registradora'
     )
 
+    # Set by POS terminals that queue transactions offline; the unique index
+    # makes replaying a sync batch idempotent.
+    client_uuid = models.UUIDField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        verbose_name='UUID del Terminal'
+    )
+
+    # Ledger position within the register, assigned under the register row
+    # lock when the transaction is inserted (see caja.ledger).
+    sequence = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name='Secuencia')
+    balance_after = CompactDecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Saldo Después'
+    )
+    reverses = models.ForeignKey(
+        'self',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='reversals',
+        editable=False,
+        verbose_name='Reversa de'
+    )
+
     # Tracking fields
     user = models.ForeignKey(
         User,
@@ -228,28 +428,177 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TransactionQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Transacción'
         verbose_name_plural = 'Transacciones'
         ordering = ['-transaction_date', '-created_at']
+        indexes = [
+            models.Index(fields=['transaction_date'], name='caja_txn_date_idx'),
+            models.Index(fields=['cash_register', 'created_at'], name='caja_txn_register_created_idx'),
+            models.Index(fields=['net_amount'], name='caja_txn_net_amount_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['cash_register', 'sequence'], name='caja_txn_register_seq_uniq'),
+        ]
 
     def __str__(self):
         type_symbol = '+' if self.transaction_type == 'income' else '-'
         return f"{type_symbol}${self.amount} - {self.description} ({self.transaction_date.strftime('%d/%m/%Y')})"
 
     @property
-    def net_amount(self):
-        """Retorna el monto neto después de comisiones"""
-        if self.transaction_type == 'income':
-            return self.amount - self.commission
-        else:
-            return self.amount + self.commission
+    def signed_amount(self):
+        """Efecto de la transacción sobre el saldo de la caja"""
+        return self.amount if self.transaction_type == 'income' else -self.amount
 
     def save(self, *args, **kwargs):
-        """Actualiza el balance de la caja al guardar"""
-        super().save(*args, **kwargs)
-        if self.cash_register:
-            self.cash_register.update_balance()
+        """
+        Inserta la transacción en el libro de la caja.
+
+        New rows get their sequence and running balance from caja.ledger;
+        financial fields of stored rows are immutable and must be corrected
+        with a compensating entry (ledger.reverse).
+        """
+        from .ledger import check_immutable, post
+
+        if self._state.adding:
+            post(self, *args, **kwargs)
+        else:
+            check_immutable(self)
+            super().save(*args, **kwargs)
+
+class TransactionArchive(models.Model):
+    """
+    Transacciones de cajas cerradas hace tiempo, movidas por archive_transactions.
+
+    Same columns as Transaction (net_amount is stored, not generated) and
+    the original primary keys. Rows are written once and never updated; on
+    PostgreSQL the table is partitioned by month of transaction_date.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    transaction_type = CompactChoiceField(max_length=10, choices=Transaction.TRANSACTION_TYPES, verbose_name='Tipo de Transacción')
+    amount = CompactDecimalField(max_digits=12, decimal_places=2, verbose_name='Monto')
+    description = models.CharField(max_length=255, verbose_name='Descripción')
+    category = CompactChoiceField(max_length=25, choices=Transaction.CATEGORY_CHOICES, verbose_name='Categoría')
+    payment_method = CompactChoiceField(max_length=20, choices=Transaction.PAYMENT_METHODS, verbose_name='Método de Pago')
+    bank = models.ForeignKey(Bank, on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name='+', verbose_name='Banco')
+    entity = models.ForeignKey(Entity, on_delete=models.DO_NOTHING, null=True, db_constraint=False, related_name='+', verbose_name='Entidad')
+    commission = CompactDecimalField(max_digits=10, decimal_places=2, verbose_name='Comisión')
+    commission_percentage = CompactDecimalField(max_digits=5, decimal_places=2, verbose_name='% Comisión')
+    net_amount = CompactDecimalField(max_digits=13, decimal_places=2, verbose_name='Monto Neto')
+    reference_number = models.CharField(max_length=50, blank=True, verbose_name='Número de Referencia')
+    notes = models.TextField(blank=True, verbose_name='Notas')
+    cash_register = models.ForeignKey(
+        CashRegister,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        db_constraint=False,
+        related_name='archived_transactions',
+        verbose_name='Caja Registradora'
+    )
+    client_uuid = models.UUIDField(null=True, blank=True, verbose_name='UUID del Terminal')
+    sequence = models.PositiveIntegerField(null=True, blank=True, verbose_name='Secuencia')
+    balance_after = CompactDecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name='Saldo Después')
+    reverses_id = models.BigIntegerField(null=True, blank=True, verbose_name='Reversa de')
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+', verbose_name='Usuario que registra')
+    transaction_date = models.DateTimeField(verbose_name='Fecha de Transacción')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    objects = TransactionQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Transacción Archivada'
+        verbose_name_plural = 'Transacciones Archivadas'
+        ordering = ['-transaction_date', '-created_at']
+        indexes = [
+            models.Index(fields=['cash_register', 'sequence'], name='caja_archive_register_seq_idx'),
+            models.Index(fields=['user', 'transaction_date'], name='caja_archive_user_date_idx'),
+        ]
+
+    def __str__(self):
+        type_symbol = '+' if self.transaction_type == 'income' else '-'
+        return f"{type_symbol}${self.amount} - {self.description} ({self.transaction_date.strftime('%d/%m/%Y')})"
+
+    @property
+    def signed_amount(self):
+        return self.amount if self.transaction_type == 'income' else -self.amount
+
+class MaterializedBalance(models.Model):
+    """
+    Totales acumulados de las transacciones de un banco o entidad.
+
+    The row with ``day`` NULL holds the all-time totals; rows with a date hold
+    that day's totals. caja.balances keeps them up to date with F()
+    increments in the same database transaction as each ledger insert.
+    """
+    day = models.DateField(null=True, blank=True, verbose_name='Día')
+    income_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos')
+    outcome_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Egresos')
+    commission_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Comisiones')
+    transaction_count = models.PositiveIntegerField(default=0, verbose_name='Transacciones')
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'), verbose_name='Saldo')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+class BankBalance(MaterializedBalance):
+    bank = models.ForeignKey(Bank, on_delete=models.CASCADE, related_name='balances', verbose_name='Banco')
+
+    class Meta:
+        verbose_name = 'Saldo de Banco'
+        verbose_name_plural = 'Saldos de Bancos'
+        ordering = ['bank', '-day']
+        constraints = [
+            models.UniqueConstraint(fields=['bank'], condition=models.Q(day__isnull=True), name='caja_bankbalance_total_uniq'),
+            models.UniqueConstraint(fields=['bank', 'day'], name='caja_bankbalance_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.bank.name} {self.day or 'total'}: ${self.balance}"
+
+class EntityBalance(MaterializedBalance):
+    entity = models.ForeignKey(Entity, on_delete=models.CASCADE, related_name='balances', verbose_name='Entidad')
+
+    class Meta:
+        verbose_name = 'Saldo de Entidad'
+        verbose_name_plural = 'Saldos de Entidades'
+        ordering = ['entity', '-day']
+        constraints = [
+            models.UniqueConstraint(fields=['entity'], condition=models.Q(day__isnull=True), name='caja_entitybalance_total_uniq'),
+            models.UniqueConstraint(fields=['entity', 'day'], name='caja_entitybalance_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity.name} {self.day or 'total'}: ${self.balance}"
+
+class BalanceCheckpoint(models.Model):
+    """Totales acumulados de una caja hasta una posición del libro"""
+    cash_register = models.ForeignKey(
+        CashRegister,
+        on_delete=models.CASCADE,
+        related_name='checkpoints',
+        verbose_name='Caja Registradora'
+    )
+    sequence = models.PositiveIntegerField(verbose_name='Hasta la Secuencia')
+    income_total = models.DecimalField(max_digits=14, decimal_places=2, verbose_name='Ingresos Acumulados')
+    outcome_total = models.DecimalField(max_digits=14, decimal_places=2, verbose_name='Egresos Acumulados')
+    transaction_count = models.PositiveIntegerField(verbose_name='Transacciones Acumuladas')
+    balance = models.DecimalField(max_digits=14, decimal_places=2, verbose_name='Saldo')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Punto de Control de Saldo'
+        verbose_name_plural = 'Puntos de Control de Saldo'
+        ordering = ['cash_register', '-sequence']
+        constraints = [
+            models.UniqueConstraint(fields=['cash_register', 'sequence'], name='caja_checkpoint_register_seq_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.cash_register.name} #{self.sequence}: ${self.balance}"
 
 class CashRegisterReport(models.Model):
     """Reporte detallado del cierre de caja"""
@@ -261,34 +610,40 @@ class CashRegisterReport(models.Model):
     )
 
     # Summary totals
-    opening_balance = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Saldo Inicial')
-    closing_balance = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Saldo Final')
-    total_income = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Total Ingresos')
-    total_outcome = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Total Egresos')
-    total_commissions = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Total Comisiones')
+    opening_balance = CompactDecimalField(max_digits=12, decimal_places=2, verbose_name='Saldo Inicial')
+    closing_balance = CompactDecimalField(max_digits=12, decimal_places=2, verbose_name='Saldo Final')
+    total_income = CompactDecimalField(max_digits=12, decimal_places=2, verbose_name='Total Ingresos')
+    total_outcome = CompactDecimalField(max_digits=12, decimal_places=2, verbose_name='Total Egresos')
+    total_commissions = CompactDecimalField(max_digits=12, decimal_places=2, verbose_name='Total Comisiones')
+    net_total = CompactDecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Neto después de Comisiones'
+    )
 
     # Breakdown by category
-    papeleria_income = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos Papelería')
-    bank_operations_income = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos Operaciones Bancarias')
-    commission_income = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos por Comisiones')
-    general_transactions_income = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos Transacciones Generales')
-    other_income = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Otros Ingresos')
+    papeleria_income = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos Papelería')
+    bank_operations_income = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos Operaciones Bancarias')
+    commission_income = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos por Comisiones')
+    general_transactions_income = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Ingresos Transacciones Generales')
+    other_income = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Otros Ingresos')
 
     # Breakdown by payment method
-    cash_total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Total Efectivo')
-    transfer_total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Total Transferencias')
-    card_total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Total Tarjetas')
-    other_payment_total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Otros Métodos de Pago')
+    cash_total = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Total Efectivo')
+    transfer_total = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Total Transferencias')
+    card_total = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Total Tarjetas')
+    other_payment_total = CompactDecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), verbose_name='Otros Métodos de Pago')
 
     # Cash reconciliation
-    physical_cash_count = models.DecimalField(
+    physical_cash_count = CompactDecimalField(
         max_digits=12,
         decimal_places=2,
         null=True,
         blank=True,
         verbose_name='Conteo Físico de Efectivo'
     )
-    cash_difference = models.DecimalField(
+    cash_difference = CompactDecimalField(
         max_digits=12,
         decimal_places=2,
         default=Decimal('0.00'),
@@ -306,6 +661,9 @@ class CashRegisterReport(models.Model):
         verbose_name = 'Reporte de Cierre de Caja'
         verbose_name_plural = 'Reportes de Cierre de Caja'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='caja_report_created_idx'),
+        ]
 
     def __str__(self):
         return f"Reporte - {self.cash_register.name} ({self.cash_register.closed_at.strftime('%d/%m/%Y')})"
@@ -319,3 +677,36 @@ class CashRegisterReport(models.Model):
     def has_cash_discrepancy(self):
         """Verifica si hay discrepancia en el efectivo"""
         return self.physical_cash_count is not None and abs(self.cash_difference) > Decimal('0.01')
+
+class IdempotencyKey(models.Model):
+    """Clave de idempotencia de un POST que crea una transacción"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name='Usuario'
+    )
+    key = models.CharField(max_length=64, verbose_name='Clave')
+    request_hash = models.CharField(max_length=64, verbose_name='Huella de la Solicitud')
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Transacción'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Clave de Idempotencia'
+        verbose_name_plural = 'Claves de Idempotencia'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='caja_idempotency_user_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='caja_idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.user})"
@@ -0,0 +1,226 @@
+"""
+Particionado mensual declarativo (PostgreSQL) por transaction_date.
+
+Django has no notion of partitioned tables, so the tables are created by
+migrations as usual and converted in place: the parent gets a composite
+primary key (id, transaction_date) and one partition per month is created
+ahead of time, plus a DEFAULT partition for dates outside the prepared
+range (offline terminals with wrong clocks). Unique constraints without
+the partition key, and the targets of foreign keys, live in a small
+non-partitioned ``<table>_keys`` table kept in step by a trigger.
+"""
+import re
+from datetime import date
+
+from django.db import connection
+
+KEY = 'transaction_date'
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_y{month:%Y}m{month:%m}'
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s',
+            [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def ensure_partitions(table, first_month, last_month):
+    """Crea las particiones mensuales faltantes entre ``first_month`` y ``last_month`` (inclusive)"""
+    quote = connection.ops.quote_name
+    created = []
+    month = month_start(first_month)
+    with connection.cursor() as cursor:
+        while month <= last_month:
+            name = partition_name(table, month)
+            cursor.execute('SELECT to_regclass(%s)', [name])
+            if cursor.fetchone()[0] is None:
+                cursor.execute(
+                    f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} '
+                    'FOR VALUES FROM (%s) TO (%s)',
+                    [month, add_months(month, 1)]
+                )
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+def _columns(cursor, table):
+    cursor.execute(
+        "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 "
+        "AND NOT attisdropped AND attgenerated = '' ORDER BY attnum",
+        [table]
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _key_columns(cursor, relation, numbers):
+    cursor.execute(
+        'SELECT attname FROM pg_attribute WHERE attrelid = %s AND attnum = ANY(%s) ORDER BY attnum',
+        [relation, list(numbers)]
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def keys_table(table):
+    return f'{table}_keys'
+
+
+def _create_keys_table(cursor, table, columns, constraints):
+    """
+    Crea ``<table>_keys`` con las restricciones UNIQUE globales y el trigger que la mantiene.
+
+    PostgreSQL only enforces uniqueness on a partitioned table when the
+    constraint includes the partition key, so (client_uuid) would silently
+    become (client_uuid, transaction_date). The keys table holds one small,
+    non-partitioned row per id with the columns of those constraints, keeps
+    them globally unique and is what foreign keys to the table reference.
+    """
+    quote = connection.ops.quote_name
+    keys = keys_table(table)
+    column_list = ', '.join(quote(column) for column in columns)
+    cursor.execute(f'CREATE TABLE {quote(keys)} AS SELECT {column_list} FROM {quote(table)}')
+    cursor.execute(f'ALTER TABLE {quote(keys)} ADD PRIMARY KEY (id)')
+    for name, definition in constraints:
+        cursor.execute(f'ALTER TABLE {quote(keys)} ADD CONSTRAINT {quote(name)} {definition}')
+
+    new_values = ', '.join(f'NEW.{quote(column)}' for column in columns)
+    assignments = ', '.join(f'{quote(column)} = NEW.{quote(column)}' for column in columns)
+    # A row moved across partitions by an UPDATE may fire its DELETE and
+    # INSERT in either order: the insert upserts and the delete only removes
+    # ids that are gone from the table.
+    cursor.execute(f"""
+        CREATE FUNCTION {quote(keys + '_sync')}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO {quote(keys)} ({column_list}) VALUES ({new_values})
+                ON CONFLICT (id) DO UPDATE SET {assignments};
+            ELSIF TG_OP = 'UPDATE' THEN
+                UPDATE {quote(keys)} SET {assignments} WHERE id = OLD.id;
+            ELSIF NOT EXISTS (SELECT 1 FROM {quote(table)} WHERE id = OLD.id) THEN
+                DELETE FROM {quote(keys)} WHERE id = OLD.id;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    cursor.execute(
+        f'CREATE TRIGGER {quote(keys + "_sync")} AFTER INSERT OR UPDATE OR DELETE ON {quote(table)} '
+        f'FOR EACH ROW EXECUTE FUNCTION {quote(keys + "_sync")}()'
+    )
+    return keys
+
+
+def convert_to_partitioned(table, months_ahead=3):
+    """
+    Convierte ``table`` en una tabla particionada por mes y copia sus filas.
+
+    Runs in the caller's transaction and holds an ACCESS EXCLUSIVE lock on
+    the table until commit, so run it in a maintenance window. Unique
+    constraints without the partition key and foreign keys that point to the
+    table (PostgreSQL requires them to reference the whole partition key)
+    move to ``<table>_keys``; its name is returned, or None when nothing
+    needed it. Unique indexes without the partition key cannot be kept and
+    raise ValueError before anything changes.
+    """
+    quote = connection.ops.quote_name
+    old = f'{table}_unpartitioned'
+    with connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {quote(table)} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid), confrelid = conrelid, conrelid::oid, conkey "
+            "FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('u', 'f')",
+            [table]
+        )
+        constraints = [
+            (name, kind, definition, self_reference, _key_columns(cursor, relation, numbers))
+            for name, kind, definition, self_reference, relation, numbers in cursor.fetchall()
+        ]
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE confrelid = %s::regclass AND conrelid <> confrelid",
+            [table]
+        )
+        inbound = cursor.fetchall()
+        cursor.execute(
+            'SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisunique, i.indrelid::oid, i.indkey::int2[] '
+            'FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+            'WHERE i.indrelid = %s::regclass AND c.relname NOT IN '
+            '(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)',
+            [table, table]
+        )
+        indexes = []
+        for name, definition, unique, relation, numbers in cursor.fetchall():
+            if unique and KEY not in _key_columns(cursor, relation, numbers):
+                raise ValueError(f'El índice único {name} no incluye {KEY}; no puede mantenerse al particionar {table}')
+            indexes.append(definition)
+        cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, 'id'])
+        has_sequence = cursor.fetchone()[0] is not None
+        cursor.execute(f'SELECT MIN({KEY}), MAX({KEY}), MAX(id) FROM {quote(table)}')
+        first, last, max_id = cursor.fetchone()
+        columns = ', '.join(quote(column) for column in _columns(cursor, table))
+
+        cursor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(old)}')
+        cursor.execute(
+            f'CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS INCLUDING GENERATED '
+            f'INCLUDING CONSTRAINTS) PARTITION BY RANGE ({KEY})'
+        )
+        # Identity columns do not carry over to partitioned tables on every
+        # supported version; a plain owned sequence works everywhere.
+        sequence = f'{table}_pk_seq'
+        if has_sequence:
+            cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {quote(sequence)}')
+            cursor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+            cursor.execute(f'ALTER SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id')
+
+        current = month_start(date.today())
+        ensure_partitions(table, month_start(first) if first else current, add_months(current, months_ahead))
+        cursor.execute(f'CREATE TABLE {quote(table + "_default")} PARTITION OF {quote(table)} DEFAULT')
+        cursor.execute(f'INSERT INTO {quote(table)} ({columns}) SELECT {columns} FROM {quote(old)}')
+        cursor.execute(f'DROP TABLE {quote(old)} CASCADE')
+        if has_sequence and max_id:
+            cursor.execute('SELECT setval(%s, %s)', [sequence, max_id])
+
+        cursor.execute(f'ALTER TABLE {quote(table)} ADD PRIMARY KEY (id, {KEY})')
+        global_unique = [
+            (name, definition, key_columns) for name, kind, definition, _, key_columns in constraints
+            if kind == 'u' and KEY not in key_columns
+        ]
+        keys = None
+        if global_unique or inbound or any(self_reference for _, _, _, self_reference, _ in constraints):
+            key_columns = ['id']
+            for _, _, unique_columns in global_unique:
+                key_columns += [column for column in unique_columns if column not in key_columns]
+            keys = _create_keys_table(
+                cursor, table, key_columns, [(name, definition) for name, definition, _ in global_unique]
+            )
+        for name, kind, definition, self_reference, key_columns in constraints:
+            if kind == 'u' and KEY not in key_columns:
+                continue
+            if self_reference:
+                definition = _referencing(definition, keys)
+            cursor.execute(f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}')
+        for owner, name, definition in inbound:
+            cursor.execute(f'ALTER TABLE {owner} ADD CONSTRAINT {quote(name)} {_referencing(definition, keys)}')
+        for definition in indexes:
+            cursor.execute(definition)
+    return keys
+
+
+def _referencing(definition, keys):
+    """Apunta una definición FOREIGN KEY ... REFERENCES a la tabla de claves"""
+    return re.sub(r'REFERENCES\s+\S+?\(', f'REFERENCES {connection.ops.quote_name(keys)}(', definition, count=1)
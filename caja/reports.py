@@ -0,0 +1,212 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import Q, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import CashRegister, CashRegisterReport, Transaction
+
+
+def close_register(register, user, physical_cash_count, notes=''):
+    """Generate the closing report, reconcile the cash count and close the register"""
+    with db_transaction.atomic():
+        register = CashRegister.objects.select_for_update().get(pk=register.pk)
+        if register.status != 'open':
+            # Retried job whose previous attempt already committed.
+            return register.closing_report
+
+        # Generate comprehensive closing report
+        report = generate_closing_report(register)
+
+        # Add reconciliation data
+        report.physical_cash_count = physical_cash_count
+        report.cash_difference = report.physical_cash_count - report.expected_cash_balance
+        report.notes = notes
+        report.save()
+
+        # Close the register
+        register.status = 'closed'
+        register.closed_by = user
+        register.closed_at = timezone.now()
+        register.save()
+
+    return report
+
+def net_totals(transactions):
+    """Ingresos y egresos netos de comisiones, sumados en la base de datos sobre net_amount"""
+    totals = transactions.aggregate(
+        income=Sum('net_amount', filter=Q(transaction_type='income')),
+        outcome=Sum('net_amount', filter=Q(transaction_type='outcome')),
+    )
+    net_income = (totals['income'] or Decimal('0.00')).quantize(Decimal('0.01'))
+    net_outcome = (totals['outcome'] or Decimal('0.00')).quantize(Decimal('0.01'))
+    return {
+        'net_income': net_income,
+        'net_outcome': net_outcome,
+        'net_after_commissions': net_income - net_outcome,
+    }
+
+def generate_closing_report(register):
+    """Generate comprehensive closing report"""
+    transactions = register.transactions.all()
+
+    # Calculate shift duration
+    shift_duration = None
+    if register.opened_at:
+        duration_delta = timezone.now() - register.opened_at
+        shift_duration = int(duration_delta.total_seconds() / 60)  # minutes
+
+    # Basic totals
+    income_transactions = transactions.filter(transaction_type='income')
+    outcome_transactions = transactions.filter(transaction_type='outcome')
+
+    total_income = income_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    total_outcome = outcome_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    total_commissions = transactions.aggregate(total=Sum('commission'))['total'] or Decimal('0.00')
+
+    # Category breakdown (income only)
+    papeleria_income = income_transactions.filter(
+        category='papeleria_sale'
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    bank_operations_income = income_transactions.filter(
+        category='bank_operation'
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    commission_income = income_transactions.filter(
+        category='commission_income'
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    general_transactions_income = income_transactions.filter(
+        category='general_transaction'
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    other_income = income_transactions.filter(
+        category__in=['other_income', 'cash_adjustment']
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    # Payment method breakdown (all transactions)
+    cash_total = transactions.filter(
+        payment_method='cash', transaction_type='income'
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    # Subtract cash outcomes
+    cash_outcomes = transactions.filter(
+        payment_method='cash', transaction_type='outcome'
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    cash_total -= cash_outcomes
+
+    transfer_total = transactions.filter(
+        payment_method='transfer'
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    card_total = transactions.filter(
+        payment_method='card'
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    other_payment_total = transactions.filter(
+        payment_method__in=['check', 'digital_wallet', 'other']
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    # Create the report
+    report = CashRegisterReport.objects.create(
+        cash_register=register,
+        opening_balance=register.opening_balance,
+        closing_balance=register.current_balance,
+        total_income=total_income,
+        total_outcome=total_outcome,
+        total_commissions=total_commissions,
+        net_total=net_totals(transactions)['net_after_commissions'],
+        papeleria_income=papeleria_income,
+        bank_operations_income=bank_operations_income,
+        commission_income=commission_income,
+        general_transactions_income=general_transactions_income,
+        other_income=other_income,
+        cash_total=cash_total,
+        transfer_total=transfer_total,
+        card_total=card_total,
+        other_payment_total=other_payment_total,
+        transaction_count=transactions.count(),
+        shift_duration_minutes=shift_duration
+    )
+
+    return report
+
+def calculate_shift_summary(register):
+    """Calculate detailed shift summary for preview"""
+    transactions = register.transactions.all()
+
+    # Basic totals
+    income_transactions = transactions.filter(transaction_type='income')
+    outcome_transactions = transactions.filter(transaction_type='outcome')
+
+    total_income = income_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    total_outcome = outcome_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+
+    # Category breakdown
+    category_breakdown = {}
+    for choice_value, choice_label in Transaction.CATEGORY_CHOICES:
+        amount = income_transactions.filter(category=choice_value).aggregate(
+            total=Sum('amount')
+        )['total'] or Decimal('0.00')
+        if amount > 0:
+            category_breakdown[choice_label] = amount
+
+    # Payment method breakdown
+    payment_breakdown = {}
+    for choice_value, choice_label in Transaction.PAYMENT_METHODS:
+        income_amount = income_transactions.filter(payment_method=choice_value).aggregate(
+            total=Sum('amount')
+        )['total'] or Decimal('0.00')
+        outcome_amount = outcome_transactions.filter(payment_method=choice_value).aggregate(
+            total=Sum('amount')
+        )['total'] or Decimal('0.00')
+        net_amount = income_amount - outcome_amount
+        if net_amount != 0:
+            payment_breakdown[choice_label] = {
+                'income': income_amount,
+                'outcome': outcome_amount,
+                'net': net_amount
+            }
+
+    # Expected cash balance
+    cash_income = income_transactions.filter(payment_method='cash').aggregate(
+        total=Sum('amount')
+    )['total'] or Decimal('0.00')
+    cash_outcome = outcome_transactions.filter(payment_method='cash').aggregate(
+        total=Sum('amount')
+    )['total'] or Decimal('0.00')
+    expected_cash = register.opening_balance + cash_income - cash_outcome
+
+    return {
+        'total_income': total_income,
+        'total_outcome': total_outcome,
+        'net_total': total_income - total_outcome,
+        'category_breakdown': category_breakdown,
+        'payment_breakdown': payment_breakdown,
+        'expected_cash': expected_cash,
+        'transaction_count': transactions.count(),
+        'final_balance': register.current_balance,
+        **net_totals(transactions),
+    }
+
+# Bump when closing_report_body.html changes so cached reports are re-rendered.
+CLOSING_REPORT_CACHE_VERSION = 2
+
+def render_closing_report(report):
+    """Render the report body; reports of closed registers never change, so their HTML is cached forever"""
+    context = {
+        'report': report,
+        'register': report.cash_register,
+    }
+    if report.cash_register.status != 'closed':
+        return render_to_string('caja/closing_report_body.html', context)
+
+    cache_key = f'caja:closing_report_html:v{CLOSING_REPORT_CACHE_VERSION}:{report.pk}'
+    html = cache.get(cache_key)
+    if html is None:
+        html = render_to_string('caja/closing_report_body.html', context)
+        cache.set(cache_key, html, None)
+    return html
@@ -0,0 +1,10 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .commissions import bump_rules_version
+from .models import CommissionRule
+
+@receiver(post_save, sender=CommissionRule)
+@receiver(post_delete, sender=CommissionRule)
+def commission_rule_changed(sender, instance, **kwargs):
+    transaction.on_commit(bump_rules_version)
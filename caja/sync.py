@@ -0,0 +1,118 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .forms import TransactionSyncForm
+from .ledger import post_many
+from .models import Bank, CashRegister, Entity, Transaction
+
+MAX_BATCH_SIZE = 500
+
+
+def _result(client_uuid, status, transaction_id=None, errors=None):
+    result = {'client_uuid': client_uuid, 'status': status}
+    if transaction_id is not None:
+        result['transaction_id'] = transaction_id
+    if errors is not None:
+        result['errors'] = errors
+    return result
+
+
+def _validate(user, items):
+    bank_ids = list(Bank.objects.filter(is_active=True).values_list('id', flat=True))
+    entity_ids = list(Entity.objects.filter(is_active=True).values_list('id', flat=True))
+    registers = {
+        register.pk: register
+        for register in CashRegister.objects.filter(opened_by=user, status='open')
+    }
+    # Items without an explicit register go to the user's current one, as in
+    # TransactionCreateView.
+    default_register = max(registers.values(), key=lambda r: r.opened_at or timezone.now(), default=None)
+
+    results = [None] * len(items)
+    pending = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = _result(None, 'invalid', errors={'__all__': ['Formato inválido.']})
+            continue
+
+        form = TransactionSyncForm(item, bank_ids=bank_ids, entity_ids=entity_ids)
+        if not form.is_valid():
+            results[index] = _result(item.get('client_uuid'), 'invalid', errors={
+                field: list(messages) for field, messages in form.errors.items()
+            })
+            continue
+
+        data = form.cleaned_data
+        register_id = data['cash_register']
+        if register_id is not None and register_id not in registers:
+            results[index] = _result(item.get('client_uuid'), 'invalid', errors={
+                'cash_register': ['La caja no existe, no es tuya o ya está cerrada.']
+            })
+            continue
+
+        client_uuid = data['client_uuid']
+        if client_uuid in pending:
+            # Repeated within the batch: resolved with the first occurrence.
+            results[index] = client_uuid
+            continue
+
+        txn = form.save(commit=False)
+        txn.client_uuid = client_uuid
+        txn.bank_id = data['bank']
+        txn.entity_id = data['entity']
+        txn.cash_register = registers[register_id] if register_id is not None else default_register
+        txn.transaction_date = data['transaction_date'] or timezone.now()
+        txn.user = user
+        pending[client_uuid] = (index, txn)
+
+    return results, pending
+
+
+def _apply(pending):
+    with transaction.atomic():
+        # Syncs for the same register run one at a time, so the duplicate
+        # check below cannot race with another replay of the same batch.
+        register_ids = sorted({txn.cash_register_id for _, txn in pending.values() if txn.cash_register_id})
+        list(CashRegister.objects.select_for_update().filter(pk__in=register_ids).order_by('pk'))
+
+        existing = dict(
+            Transaction.objects.filter(client_uuid__in=list(pending)).values_list('client_uuid', 'id')
+        )
+        new = [txn for client_uuid, (_, txn) in pending.items() if client_uuid not in existing]
+        # One bulk_create, one sequence/balance update per register.
+        post_many(new)
+
+    return existing, new
+
+
+def sync_transactions(user, items):
+    """
+    Aplica un lote de transacciones encoladas offline por un terminal.
+
+    Every item carries a client-generated UUID; items already stored (a
+    replayed batch or a retry after a lost response) are reported as
+    duplicates instead of being inserted again. Valid new items are inserted
+    in one atomic bulk_create. Returns one result per item, in order.
+    """
+    results, pending = _validate(user, items)
+
+    try:
+        existing, new = _apply(pending)
+    except IntegrityError:
+        # A concurrent sync without a register lock inserted some of the
+        # same UUIDs first; the retry sees them as duplicates.
+        existing, new = _apply(pending)
+
+    ids = {txn.client_uuid: txn.pk for txn in new}
+    for client_uuid, (index, _) in pending.items():
+        if client_uuid in existing:
+            results[index] = _result(str(client_uuid), 'duplicate', existing[client_uuid])
+        else:
+            results[index] = _result(str(client_uuid), 'created', ids[client_uuid])
+
+    for index, result in enumerate(results):
+        if not isinstance(result, dict):
+            first = results[pending[result][0]]
+            results[index] = _result(str(result), 'duplicate', first.get('transaction_id'))
+
+    return results
@@ -0,0 +1,25 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from jobs.queue import task
+from .models import CashRegister
+from .reports import close_register
+
+User = get_user_model()
+
+@task('caja.close_register')
+def close_register_task(payload):
+    """Cierra una caja en segundo plano y retorna la URL de su reporte"""
+    register = CashRegister.objects.get(pk=payload['register_id'])
+    user = User.objects.get(pk=payload['user_id'])
+    report = close_register(
+        register,
+        user,
+        Decimal(payload['physical_cash_count']),
+        payload.get('notes', '')
+    )
+    return {
+        'report_id': report.pk,
+        'report_url': reverse('caja:closing_report', args=[report.pk]),
+        'closing_balance': str(report.closing_balance),
+    }
@@ -0,0 +1,23 @@
+from decimal import Decimal, InvalidOperation
+from django import template
+
+register = template.Library()
+
+def _to_decimal(value):
+    return Decimal(str(value))
+
+@register.filter
+def sub(value, arg):
+    """Resta arg a value"""
+    try:
+        return _to_decimal(value) - _to_decimal(arg)
+    except (InvalidOperation, TypeError, ValueError):
+        return ''
+
+@register.filter
+def div(value, arg):
+    """Divide value entre arg"""
+    try:
+        return _to_decimal(value) / _to_decimal(arg)
+    except (InvalidOperation, ZeroDivisionError, TypeError, ValueError):
+        return ''
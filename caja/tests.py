@@ -1,3 +1,415 @@
-from django.test import TestCase
+import json
+import uuid
+from decimal import Decimal
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from jobs.models import Job
+from jobs.queue import run_pending
+from . import balances, ledger, partitions
+from .commissions import CommissionTable
+from .archive import archivable_registers, archive_register, transactions_for
+from .models import (
+    Bank, BankBalance, CashRegister, CashRegisterReport, CommissionRule, Entity, EntityBalance, IdempotencyKey,
+    Transaction,
+)
+from .reports import net_totals
+
+
+class CajaTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cajero', password='secreto123', role='user')
+        self.register = CashRegister.objects.create(
+            name='Caja 1',
+            opening_balance=Decimal('100.00'),
+            current_balance=Decimal('100.00'),
+            status='open',
+            opened_by=self.user,
+            opened_at=timezone.now(),
+        )
+        self.client.force_login(self.user)
+
+
+class SyncTests(CajaTestCase):
+    def sync(self, items):
+        response = self.client.post(
+            reverse('caja:transaction_sync'),
+            json.dumps({'transactions': items}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def item(self, client_uuid, amount='10.00'):
+        return {
+            'client_uuid': str(client_uuid),
+            'transaction_type': 'income',
+            'amount': amount,
+            'description': 'Venta offline',
+        }
+
+    def test_replayed_batch_is_reported_as_duplicates(self):
+        batch = [self.item(uuid.uuid4()), self.item(uuid.uuid4(), '5.00')]
+
+        first = self.sync(batch)
+        replay = self.sync(batch)
+
+        self.assertEqual(first['created'], 2)
+        self.assertEqual((replay['created'], replay['duplicates']), (0, 2))
+        self.assertEqual(
+            [result['transaction_id'] for result in replay['results']],
+            [result['transaction_id'] for result in first['results']],
+        )
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.register.refresh_from_db()
+        self.assertEqual(self.register.current_balance, Decimal('115.00'))
+
+    def test_uuid_repeated_within_a_batch_is_inserted_once(self):
+        client_uuid = uuid.uuid4()
+
+        data = self.sync([self.item(client_uuid), self.item(client_uuid), {'amount': 'x'}])
+
+        self.assertEqual([result['status'] for result in data['results']], ['created', 'duplicate', 'invalid'])
+        self.assertEqual(data['results'][0]['transaction_id'], data['results'][1]['transaction_id'])
+        self.assertEqual(Transaction.objects.count(), 1)
+
+
+class IdempotencyTests(CajaTestCase):
+    def submit(self, key, amount='20.00'):
+        return self.client.post(reverse('caja:transaction_create'), {
+            'transaction_type': 'income',
+            'amount': amount,
+            'description': 'Pago de servicio',
+            'category': 'general_transaction',
+            'payment_method': 'cash',
+            'commission': '0.00',
+            'commission_percentage': '0.00',
+            'idempotency_key': key,
+        })
+
+    def test_resubmitted_form_is_replayed_without_writing(self):
+        first = self.submit('clave-1')
+        replay = self.submit('clave-1')
+
+        self.assertRedirects(first, reverse('caja:dashboard'), fetch_redirect_response=False)
+        self.assertRedirects(replay, reverse('caja:dashboard'), fetch_redirect_response=False)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.register.refresh_from_db()
+        self.assertEqual(self.register.current_balance, Decimal('120.00'))
+
+    def test_key_reused_with_other_data_is_rejected(self):
+        self.submit('clave-1')
+
+        response = self.submit('clave-1', amount='99.00')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Transaction.objects.count(), 1)
+
+
+class LedgerTestCase(CajaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bank = Bank.objects.create(name='Banco Uno', code='B1')
+
+    def entry(self, transaction_type, amount, commission='0.00'):
+        return Transaction.objects.create(
+            transaction_type=transaction_type,
+            amount=Decimal(amount),
+            commission=Decimal(commission),
+            description='Movimiento',
+            payment_method='transfer',
+            bank=self.bank,
+            cash_register=self.register,
+            user=self.user,
+            transaction_date=timezone.now(),
+        )
+
+    def totals(self):
+        transactions = self.register.transactions.all()
+        self.register.refresh_from_db()
+        bank = BankBalance.objects.filter(bank=self.bank, day__isnull=True).values(
+            'balance', 'commission_total'
+        ).first() or {'balance': Decimal('0.00'), 'commission_total': Decimal('0.00')}
+        return {
+            'register_balance': self.register.current_balance,
+            'commissions': transactions.aggregate(total=Sum('commission'))['total'] or Decimal('0.00'),
+            'net': net_totals(transactions)['net_after_commissions'],
+            'bank_balance': bank['balance'],
+            'bank_commissions': bank['commission_total'],
+        }
+
+
+class LedgerTests(LedgerTestCase):
+    def test_entries_get_consecutive_sequence_and_running_balance(self):
+        entries = [self.entry('income', '50.00'), self.entry('outcome', '20.00'), self.entry('income', '5.00')]
+
+        self.assertEqual([entry.sequence for entry in entries], [1, 2, 3])
+        self.assertEqual(
+            [entry.balance_after for entry in entries],
+            [Decimal('150.00'), Decimal('130.00'), Decimal('135.00')],
+        )
+        self.register.refresh_from_db()
+        self.assertEqual(self.register.last_sequence, 3)
+        self.assertEqual(self.register.current_balance, Decimal('135.00'))
+
+    def test_reversal_leaves_all_totals_unchanged(self):
+        self.entry('income', '10.00')
+        before = self.totals()
+
+        for transaction_type in ('income', 'outcome'):
+            with self.subTest(transaction_type=transaction_type):
+                original = self.entry(transaction_type, '200.00', commission='3.00')
+                reversal = ledger.reverse(original, self.user)
+
+                reversal.refresh_from_db()
+                self.assertEqual(reversal.net_amount, original.net_amount)
+                self.assertEqual(self.totals(), before)
+
+    def test_financial_fields_are_immutable(self):
+        original = self.entry('income', '10.00')
+        original.amount = Decimal('11.00')
+
+        with self.assertRaises(ledger.LedgerError):
+            original.save()
+
+    @override_settings(BALANCE_CHECKPOINT_INTERVAL=3)
+    def test_checkpointed_totals_match_a_full_sum(self):
+        amounts = ['10.00', '4.00', '7.50', '3.25', '20.00', '1.00', '8.00', '2.50']
+        for number, amount in enumerate(amounts):
+            self.entry('outcome' if number % 3 == 1 else 'income', amount)
+
+        self.assertEqual(list(self.register.checkpoints.values_list('sequence', flat=True).order_by('sequence')), [3, 6])
+        rows = self.register.transactions.all()
+        full = {
+            'income': rows.filter(transaction_type='income').aggregate(total=Sum('amount'))['total'],
+            'outcome': rows.filter(transaction_type='outcome').aggregate(total=Sum('amount'))['total'],
+            'count': rows.count(),
+            'sequence': len(amounts),
+        }
+        self.assertEqual(self.register.ledger_totals(), full)
+        self.register.refresh_from_db()
+        self.assertEqual(self.register.calculate_balance(), self.register.current_balance)
+
+
+@override_settings(MATERIALIZED_DAILY_BALANCES=True)
+class MaterializedBalanceTests(LedgerTestCase):
+    def snapshot(self):
+        fields = ('day', 'income_total', 'outcome_total', 'commission_total', 'transaction_count', 'balance')
+        return {
+            'banks': sorted(BankBalance.objects.values_list('bank_id', *fields), key=repr),
+            'entities': sorted(EntityBalance.objects.values_list('entity_id', *fields), key=repr),
+        }
+
+    def test_rebuild_reproduces_incremental_rows(self):
+        other_bank = Bank.objects.create(name='Banco Dos', code='B2')
+        entity = Entity.objects.create(name='Corresponsal', entity_type='payment_platform')
+        yesterday = timezone.now() - timedelta(days=1)
+        ledger.post_many([
+            Transaction(
+                transaction_type=transaction_type, amount=Decimal(amount), commission=Decimal(commission),
+                description='Movimiento', payment_method='transfer', bank=bank, entity=entity_or_none,
+                cash_register=self.register, user=self.user, transaction_date=when,
+            )
+            for transaction_type, amount, commission, bank, entity_or_none, when in [
+                ('income', '100.00', '2.00', self.bank, entity, yesterday),
+                ('outcome', '30.00', '0.50', self.bank, None, yesterday),
+                ('income', '45.00', '1.00', other_bank, entity, timezone.now()),
+            ]
+        ])
+        reversed_entry = self.entry('income', '12.00', commission='0.25')
+        ledger.reverse(reversed_entry, self.user)
+        incremental = self.snapshot()
+
+        balances.rebuild()
+
+        self.assertEqual(self.snapshot(), incremental)
+        self.assertEqual(
+            BankBalance.objects.filter(bank=self.bank).exclude(day__isnull=True).count(),
+            len({timezone.localdate(yesterday), timezone.localdate()}),
+        )
+        entity_total = EntityBalance.objects.get(entity=entity, day__isnull=True)
+        self.assertEqual(
+            (entity_total.income_total, entity_total.commission_total, entity_total.transaction_count),
+            (Decimal('145.00'), Decimal('3.00'), 2),
+        )
+
+
+class RepriceCommissionsTests(LedgerTestCase):
+    def test_reprices_open_registers_only_and_keeps_balances_in_step(self):
+        closed_register = CashRegister.objects.create(
+            name='Caja cerrada', opening_balance=Decimal('0.00'), current_balance=Decimal('0.00'),
+            status='open', opened_by=self.user, opened_at=timezone.now(),
+        )
+        closed = self.entry('income', '100.00')
+        Transaction.objects.filter(pk=closed.pk).update(cash_register=closed_register)
+        CashRegister.objects.filter(pk=closed_register.pk).update(status='closed')
+        repriced = self.entry('income', '100.00')
+        reversed_entry = self.entry('income', '100.00')
+        reversal = ledger.reverse(reversed_entry, self.user)
+        CommissionRule.objects.create(bank=self.bank, fixed_fee=Decimal('1.00'), percentage=Decimal('2.00'))
+
+        call_command('reprice_commissions', stdout=StringIO())
+
+        commissions = dict(Transaction.objects.values_list('pk', 'commission'))
+        self.assertEqual(commissions[repriced.pk], Decimal('3.00'))
+        for entry in (closed, reversed_entry, reversal):
+            self.assertEqual(commissions[entry.pk], Decimal('0.00'))
+        bank = BankBalance.objects.get(bank=self.bank, day__isnull=True)
+        self.assertEqual(bank.commission_total, sum(commissions.values()))
+
+
+class ArchiveTests(LedgerTestCase):
+    def close(self, register):
+        CashRegister.objects.filter(pk=register.pk).update(
+            status='closed', closed_at=timezone.now() - timedelta(days=400)
+        )
+
+    def test_archive_moves_rows_and_keeps_balances(self):
+        self.entry('income', '50.00')
+        self.entry('outcome', '20.00', commission='1.00')
+        self.close(self.register)
+        bank_before = BankBalance.objects.get(bank=self.bank, day__isnull=True).balance
+
+        self.assertEqual(list(archivable_registers(12)), [self.register])
+        self.assertEqual(archive_register(self.register.pk), 2)
+
+        self.register.refresh_from_db()
+        self.assertIsNotNone(self.register.archived_at)
+        self.assertFalse(self.register.transactions.exists())
+        self.assertEqual(
+            list(transactions_for(self.register).order_by('sequence').values_list('balance_after', flat=True)),
+            [Decimal('150.00'), Decimal('130.00')],
+        )
+        self.assertEqual(ledger.balance_at(self.register, timezone.now()), Decimal('130.00'))
+        self.assertEqual(BankBalance.objects.get(bank=self.bank, day__isnull=True).balance, bank_before)
+        self.assertFalse(archivable_registers(12).exists())
+        self.assertIsNone(archive_register(self.register.pk))
+
+    def test_command_continues_after_a_failed_register(self):
+        other = CashRegister.objects.create(
+            name='Caja 2', opening_balance=Decimal('0.00'), current_balance=Decimal('0.00'),
+            status='open', opened_by=self.user, opened_at=timezone.now(),
+        )
+        self.entry('income', '50.00')
+        self.close(self.register)
+        self.close(other)
+        failing = mock.Mock(side_effect=[IntegrityError('FOREIGN KEY constraint failed'), 0])
+        stdout, stderr = StringIO(), StringIO()
+
+        with mock.patch('caja.management.commands.archive_transactions.archive_register', failing):
+            call_command('archive_transactions', stdout=stdout, stderr=stderr)
+
+        self.assertEqual(failing.call_count, 2)
+        self.assertIn('1 cajas archivadas', stdout.getvalue())
+        self.assertIn('1 cajas no se pudieron archivar', stderr.getvalue())
+
+
+@override_settings(JOBS_EAGER=False)
+class CloseRegisterTests(LedgerTestCase):
+    def close(self):
+        return self.client.post(
+            reverse('caja:close_register', args=[self.register.pk]),
+            {'physical_cash_count': '100.00', 'notes': ''},
+        )
+
+    def test_double_submit_reuses_the_queued_job(self):
+        self.entry('income', '50.00')
+
+        first = self.close()
+        second = self.close()
+
+        job = Job.objects.get(name='caja.close_register')
+        self.assertRedirects(first, reverse('caja:closing_status', args=[job.pk]), fetch_redirect_response=False)
+        self.assertEqual(second['Location'], first['Location'])
+
+    def test_closing_twice_generates_one_report(self):
+        self.entry('income', '50.00')
+        self.close()
+        # A retried job whose first attempt already committed.
+        Job.objects.create(name='caja.close_register', payload=Job.objects.get().payload)
+
+        self.assertEqual(run_pending('worker-a', limit=5), 2)
+
+        results = list(Job.objects.order_by('pk').values_list('status', 'result'))
+        self.assertEqual([status for status, _ in results], ['succeeded', 'succeeded'])
+        self.assertEqual(results[0][1]['report_id'], results[1][1]['report_id'])
+        self.assertEqual(CashRegisterReport.objects.count(), 1)
+        self.register.refresh_from_db()
+        self.assertEqual(self.register.status, 'closed')
+        self.assertEqual(self.register.closing_report.cash_difference, Decimal('0.00'))
+
+
+class CommissionTableTests(TestCase):
+    def setUp(self):
+        self.bank = Bank.objects.create(name='Banco Uno', code='B1')
+
+    def test_rules_saved_by_another_worker_are_picked_up_without_shared_cache(self):
+        table = CommissionTable(check_interval=0)
+        self.assertIsNone(table.quote(Decimal('100.00'), 'income', bank_id=self.bank.pk))
+
+        # bulk_create sends no signal: like a save in another worker, whose
+        # version bump never reaches this process's cache.
+        CommissionRule.objects.bulk_create([CommissionRule(bank=self.bank, fixed_fee=Decimal('1.50'))])
+
+        quote = table.quote(Decimal('100.00'), 'income', bank_id=self.bank.pk)
+        self.assertEqual(quote.commission, Decimal('1.50'))
+
+    def test_amount_below_the_specific_tiers_falls_back_to_the_general_tariff(self):
+        CommissionRule.objects.create(bank=self.bank, min_amount=Decimal('1000.00'), fixed_fee=Decimal('5.00'))
+        CommissionRule.objects.create(fixed_fee=Decimal('0.50'))
+        table = CommissionTable(check_interval=0)
+
+        self.assertEqual(table.quote(Decimal('2000.00'), 'income', bank_id=self.bank.pk).commission, Decimal('5.00'))
+        self.assertEqual(table.quote(Decimal('20.00'), 'income', bank_id=self.bank.pk).commission, Decimal('0.50'))
+
+
+class CompactStorageTests(TransactionTestCase):
+    def nullable_columns(self, model):
+        with connection.cursor() as cursor:
+            description = connection.introspection.get_table_description(cursor, model._meta.db_table)
+        return {info.name for info in description if info.null_ok}
+
+    def convert(self, to):
+        call_command('compact_storage', to=to, stdout=StringIO())
+
+    def test_converted_columns_keep_not_null(self):
+        required = {
+            model: {field.column for field in model._meta.local_fields if not (field.null or field.generated)}
+            for model in (Transaction, CashRegisterReport)
+        }
+        self.addCleanup(self.convert, 'decimal')
+        self.convert('compact')
+
+        for model, columns in required.items():
+            self.assertFalse(columns & self.nullable_columns(model), model._meta.db_table)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'El particionado solo está disponible en PostgreSQL')
+class PartitionTests(LedgerTestCase):
+    def test_uniqueness_and_foreign_keys_survive_conversion(self):
+        first = self.entry('income', '10.00')
+        client_uuid = uuid.uuid4()
+        Transaction.objects.filter(pk=first.pk).update(client_uuid=client_uuid)
+        partitions.convert_to_partitioned(Transaction._meta.db_table)
+
+        # Months before the first row fall into the DEFAULT partition.
+        second = self.entry('income', '5.00')
+        Transaction.objects.filter(pk=second.pk).update(transaction_date=first.transaction_date - timedelta(days=40))
+        for changes in ({'client_uuid': client_uuid}, {'sequence': first.sequence}):
+            with self.subTest(changes=changes), self.assertRaises(IntegrityError), transaction.atomic():
+                Transaction.objects.filter(pk=second.pk).update(**changes)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            IdempotencyKey.objects.create(user=self.user, key='k', request_hash='h', transaction_id=second.pk + 1000)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -5,15 +6,18 @@ app_name = 'caja'
 
 urlpatterns = [
     # Dashboard
-    path('', views.caja_dashboard, name='dashboard'),
+    path('', views.caja_dashboard_async if settings.ASYNC_DASHBOARDS else views.caja_dashboard, name='dashboard'),
 
     # Cash Register Management
     path('abrir/', views.open_cash_register, name='open_register'),
     path('cerrar/<int:register_id>/', views.close_cash_register, name='close_register'),
+    path('cerrar/estado/<int:job_id>/', views.closing_status_view, name='closing_status'),
     path('reporte/<int:report_id>/', views.closing_report_view, name='closing_report'),
 
     # Transactions
     path('transacciones/', views.TransactionListView.as_view(), name='transaction_list'),
     path('transacciones/nueva/', views.TransactionCreateView.as_view(), name='transaction_create'),
+    path('transacciones/exportar/', views.export_transactions_view, name='transaction_export'),
+    path('transacciones/sincronizar/', views.sync_transactions_view, name='transaction_sync'),
     path('transacciones/nueva/<str:transaction_type>/', views.TransactionCreateView.as_view(), name='transaction_create_type'),
 ]
\ No newline at end of file
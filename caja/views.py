@@ -1,51 +1,74 @@
+import csv
+import json
+import uuid
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView
 from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
+from django.db import transaction as db_transaction
 from django.db.models import Sum, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from decimal import Decimal
-from .models import CashRegister, Transaction, Bank, Entity, CashRegisterReport
+from jobs.models import Job
+from jobs.queue import enqueue
+from main.pagination import EstimatedCountPaginator
+from main.queries import gather_queries, run_queries
+from softwareTienda.db_router import use_replica
+from .models import CashRegister, Transaction, TransactionArchive, Bank, Entity, CashRegisterReport
+from .reports import calculate_shift_summary, net_totals, render_closing_report
 from .forms import TransactionForm, CashRegisterForm, CashReconciliationForm
+from .sync import MAX_BATCH_SIZE, sync_transactions
+from . import idempotency
 
-@login_required
-def caja_dashboard(request):
-    # Get user's current cash register
-    current_register = CashRegister.objects.filter(
-        opened_by=request.user,
-        status='open'
-    ).first()
-
-    # Recent transactions
-    recent_transactions = Transaction.objects.filter(
-        user=request.user
-    ).select_related('bank', 'entity', 'cash_register')[:10]
-
-    # Daily summary
+def dashboard_queries(user):
+    """Consultas independientes del panel de caja, ejecutables en paralelo"""
     today = timezone.now().date()
-    daily_income = Transaction.objects.filter(
-        user=request.user,
-        transaction_type='income',
-        transaction_date__date=today
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    daily_outcome = Transaction.objects.filter(
-        user=request.user,
-        transaction_type='outcome',
-        transaction_date__date=today
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    daily = Transaction.objects.on_day(today).filter(user=user)
 
-    context = {
-        'current_register': current_register,
-        'recent_transactions': recent_transactions,
-        'daily_income': daily_income,
-        'daily_outcome': daily_outcome,
-        'daily_balance': daily_income - daily_outcome,
+    return {
+        # Get user's current cash register
+        'current_register': lambda: CashRegister.objects.filter(
+            opened_by=user,
+            status='open'
+        ).first(),
+        # Recent transactions
+        'recent_transactions': lambda: list(
+            Transaction.objects.filter(
+                user=user
+            ).select_related('bank', 'entity', 'cash_register')[:10]
+        ),
+        # Daily summary
+        'daily_income': lambda: daily.filter(
+            transaction_type='income'
+        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00'),
+        'daily_outcome': lambda: daily.filter(
+            transaction_type='outcome'
+        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00'),
     }
 
-    return render(request, 'caja/dashboard.html', context)
+def dashboard_context(results):
+    context = dict(results)
+    context['daily_balance'] = results['daily_income'] - results['daily_outcome']
+    return context
+
+@login_required
+def caja_dashboard(request):
+    results = run_queries(dashboard_queries(request.user))
+    return render(request, 'caja/dashboard.html', dashboard_context(results))
+
+@login_required
+async def caja_dashboard_async(request):
+    """Versión asíncrona del panel; las consultas se ejecutan en paralelo"""
+    user = await request.auser()
+    results = await gather_queries(dashboard_queries(user))
+    return await sync_to_async(render)(request, 'caja/dashboard.html', dashboard_context(results))
 
 @login_required
 def open_cash_register(request):
@@ -88,23 +111,22 @@ def close_cash_register(request, register_id):
     if request.method == 'POST':
         form = CashReconciliationForm(request.POST)
         if form.is_valid():
-            # Generate comprehensive closing report
-            report = generate_closing_report(register)
-
-            # Add reconciliation data
-            report.physical_cash_count = form.cleaned_data['physical_cash_count']
-            report.cash_difference = report.physical_cash_count - report.expected_cash_balance
-            report.notes = form.cleaned_data['notes']
-            report.save()
-
-            # Close the register
-            register.status = 'closed'
-            register.closed_by = request.user
-            register.closed_at = timezone.now()
-            register.save()
-
-            messages.success(request, f'Caja {register.name} cerrada exitosamente. Balance final: ${register.current_balance}')
-            return redirect('caja:closing_report', report_id=report.id)
+            # Report generation runs in a background job; a double submit
+            # reuses the job that is already closing this register.
+            job = Job.objects.filter(
+                name='caja.close_register',
+                payload__register_id=register.id,
+                status__in=['queued', 'running']
+            ).first()
+            if job is None:
+                job = enqueue('caja.close_register', {
+                    'register_id': register.id,
+                    'user_id': request.user.id,
+                    'physical_cash_count': str(form.cleaned_data['physical_cash_count']),
+                    'notes': form.cleaned_data['notes'],
+                }, user=request.user)
+
+            return redirect('caja:closing_status', job_id=job.id)
     else:
         form = CashReconciliationForm()
 
@@ -119,162 +141,40 @@ def close_cash_register(request, register_id):
 
     return render(request, 'caja/close_register.html', context)
 
-def generate_closing_report(register):
-    """Generate comprehensive closing report"""
-    from django.utils import timezone
-
-    transactions = register.transactions.all()
-
-    # Calculate shift duration
-    shift_duration = None
-    if register.opened_at:
-        duration_delta = timezone.now() - register.opened_at
-        shift_duration = int(duration_delta.total_seconds() / 60)  # minutes
-
-    # Basic totals
-    income_transactions = transactions.filter(transaction_type='income')
-    outcome_transactions = transactions.filter(transaction_type='outcome')
-
-    total_income = income_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-    total_outcome = outcome_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-    total_commissions = transactions.aggregate(total=Sum('commission'))['total'] or Decimal('0.00')
-
-    # Category breakdown (income only)
-    papeleria_income = income_transactions.filter(
-        category='papeleria_sale'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    bank_operations_income = income_transactions.filter(
-        category='bank_operation'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    commission_income = income_transactions.filter(
-        category='commission_income'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    general_transactions_income = income_transactions.filter(
-        category='general_transaction'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    other_income = income_transactions.filter(
-        category__in=['other_income', 'cash_adjustment']
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    # Payment method breakdown (all transactions)
-    cash_total = transactions.filter(
-        payment_method='cash', transaction_type='income'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    # Subtract cash outcomes
-    cash_outcomes = transactions.filter(
-        payment_method='cash', transaction_type='outcome'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-    cash_total -= cash_outcomes
-
-    transfer_total = transactions.filter(
-        payment_method='transfer'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    card_total = transactions.filter(
-        payment_method='card'
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    other_payment_total = transactions.filter(
-        payment_method__in=['check', 'digital_wallet', 'other']
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    # Create the report
-    report = CashRegisterReport.objects.create(
-        cash_register=register,
-        opening_balance=register.opening_balance,
-        closing_balance=register.current_balance,
-        total_income=total_income,
-        total_outcome=total_outcome,
-        total_commissions=total_commissions,
-        papeleria_income=papeleria_income,
-        bank_operations_income=bank_operations_income,
-        commission_income=commission_income,
-        general_transactions_income=general_transactions_income,
-        other_income=other_income,
-        cash_total=cash_total,
-        transfer_total=transfer_total,
-        card_total=card_total,
-        other_payment_total=other_payment_total,
-        transaction_count=transactions.count(),
-        shift_duration_minutes=shift_duration
+@login_required
+def closing_status_view(request, job_id):
+    """Wait page shown while the closing job runs"""
+    job = get_object_or_404(
+        Job,
+        id=job_id,
+        name='caja.close_register',
+        created_by=request.user
     )
+    register = get_object_or_404(CashRegister, id=job.payload.get('register_id'))
 
-    return report
-
-def calculate_shift_summary(register):
-    """Calculate detailed shift summary for preview"""
-    transactions = register.transactions.all()
-
-    # Basic totals
-    income_transactions = transactions.filter(transaction_type='income')
-    outcome_transactions = transactions.filter(transaction_type='outcome')
-
-    total_income = income_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-    total_outcome = outcome_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    # Category breakdown
-    category_breakdown = {}
-    for choice_value, choice_label in Transaction.CATEGORY_CHOICES:
-        amount = income_transactions.filter(category=choice_value).aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
-        if amount > 0:
-            category_breakdown[choice_label] = amount
-
-    # Payment method breakdown
-    payment_breakdown = {}
-    for choice_value, choice_label in Transaction.PAYMENT_METHODS:
-        income_amount = income_transactions.filter(payment_method=choice_value).aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
-        outcome_amount = outcome_transactions.filter(payment_method=choice_value).aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0.00')
-        net_amount = income_amount - outcome_amount
-        if net_amount != 0:
-            payment_breakdown[choice_label] = {
-                'income': income_amount,
-                'outcome': outcome_amount,
-                'net': net_amount
-            }
-
-    # Expected cash balance
-    cash_income = income_transactions.filter(payment_method='cash').aggregate(
-        total=Sum('amount')
-    )['total'] or Decimal('0.00')
-    cash_outcome = outcome_transactions.filter(payment_method='cash').aggregate(
-        total=Sum('amount')
-    )['total'] or Decimal('0.00')
-    expected_cash = register.opening_balance + cash_income - cash_outcome
-
-    return {
-        'total_income': total_income,
-        'total_outcome': total_outcome,
-        'net_total': total_income - total_outcome,
-        'category_breakdown': category_breakdown,
-        'payment_breakdown': payment_breakdown,
-        'expected_cash': expected_cash,
-        'transaction_count': transactions.count(),
-        'final_balance': register.current_balance,
+    context = {
+        'job': job,
+        'register': register,
     }
 
+    return render(request, 'caja/closing_status.html', context)
+
 @login_required
+@use_replica
 def closing_report_view(request, report_id):
     """View the detailed closing report"""
-    report = get_object_or_404(
-        CashRegisterReport,
+    reports = CashRegisterReport.objects.select_related('cash_register').filter(
         id=report_id,
         cash_register__opened_by=request.user
     )
+    # The report is written by a background job; a lagging replica may not
+    # have it yet when the status page redirects here.
+    report = reports.first() or get_object_or_404(reports.using('default'))
 
     context = {
         'report': report,
         'register': report.cash_register,
+        'report_html': render_closing_report(report),
     }
 
     return render(request, 'caja/closing_report.html', context)
@@ -291,6 +191,16 @@ class TransactionCreateView(CreateView):
         kwargs['user'] = self.request.user
         return kwargs
 
+    def post(self, request, *args, **kwargs):
+        self.idempotency_key = idempotency.get_key(request)
+        if self.idempotency_key:
+            if len(self.idempotency_key) > idempotency.MAX_KEY_LENGTH:
+                return JsonResponse({'error': 'Clave de idempotencia inválida.'}, status=400)
+            record = idempotency.find(request.user, self.idempotency_key)
+            if record:
+                return self.replay(record)
+        return super().post(request, *args, **kwargs)
+
     def form_valid(self, form):
         transaction = form.save(commit=False)
         transaction.user = self.request.user
@@ -305,48 +215,90 @@ class TransactionCreateView(CreateView):
         if current_register:
             transaction.cash_register = current_register
 
-        transaction.save()
+        with db_transaction.atomic():
+            if self.idempotency_key:
+                record, created = idempotency.claim(
+                    self.request.user,
+                    self.idempotency_key,
+                    idempotency.request_hash(self.request)
+                )
+                if not created:
+                    # Lost the race against a concurrent submit of the same form.
+                    return self.replay(record)
+
+            transaction.save()
+
+            if self.idempotency_key:
+                record.transaction = transaction
+                record.save(update_fields=['transaction'])
 
+        self.add_success_message(transaction)
+        return super().form_valid(form)
+
+    def replay(self, record):
+        """Responde a un reenvío con el resultado original, sin volver a escribir"""
+        if record.request_hash != idempotency.request_hash(self.request):
+            return JsonResponse(
+                {'error': 'La clave de idempotencia ya se usó con otros datos.'},
+                status=422
+            )
+
+        self.object = record.transaction
+        self.add_success_message(self.object)
+        response = redirect(self.get_success_url())
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def add_success_message(self, transaction):
         type_text = 'Ingreso' if transaction.transaction_type == 'income' else 'Egreso'
         messages.success(
             self.request,
             f'{type_text} de ${transaction.amount} registrado exitosamente'
         )
 
-        return super().form_valid(form)
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['transaction_type'] = self.kwargs.get('transaction_type', 'income')
+        context['idempotency_key'] = uuid.uuid4().hex
         return context
 
+def filter_transactions(user, params):
+    """
+    Transacciones del usuario con los filtros del listado (tipo y rango de fechas).
+
+    Without a date range only the recent (hot) history is listed, so the
+    list, its totals and exports never scan old partitions. ``archivo=1``
+    reads registers moved to TransactionArchive instead.
+    """
+    model = TransactionArchive if params.get('archivo') == '1' else Transaction
+    queryset = model.objects.filter(user=user)
+
+    # Filter by type
+    transaction_type = params.get('type')
+    if transaction_type in ['income', 'outcome']:
+        queryset = queryset.filter(transaction_type=transaction_type)
+
+    # Filter by date range
+    date_from = parse_date(params.get('date_from') or '')
+    date_to = parse_date(params.get('date_to') or '')
+
+    if date_from or date_to or model is TransactionArchive:
+        return queryset.between_days(date_from, date_to)
+    return queryset.recent()
+
 @method_decorator(login_required, name='dispatch')
+@method_decorator(use_replica, name='dispatch')
 class TransactionListView(ListView):
     model = Transaction
     template_name = 'caja/transaction_list.html'
     context_object_name = 'transactions'
     paginate_by = 20
+    paginator_class = EstimatedCountPaginator
 
     def get_queryset(self):
-        queryset = Transaction.objects.filter(
-            user=self.request.user
-        ).select_related('bank', 'entity', 'cash_register')
-
-        # Filter by type
-        transaction_type = self.request.GET.get('type')
-        if transaction_type in ['income', 'outcome']:
-            queryset = queryset.filter(transaction_type=transaction_type)
-
-        # Filter by date range
-        date_from = self.request.GET.get('date_from')
-        date_to = self.request.GET.get('date_to')
-
-        if date_from:
-            queryset = queryset.filter(transaction_date__date__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(transaction_date__date__lte=date_to)
-
-        return queryset.order_by('-transaction_date')
+        return filter_transactions(self.request.user, self.request.GET).select_related(
+            'bank', 'entity', 'cash_register'
+        ).order_by('-transaction_date')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -362,5 +314,82 @@ class TransactionListView(ListView):
         ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
 
         context['net_total'] = context['total_income'] - context['total_outcome']
+        context.update(net_totals(queryset))
+        context['export_query'] = self.request.GET.urlencode()
+        context['showing_archive'] = self.request.GET.get('archivo') == '1'
+        context['recent_only'] = not (
+            context['showing_archive'] or self.request.GET.get('date_from') or self.request.GET.get('date_to')
+        )
+        context['hot_days'] = settings.TRANSACTION_HOT_DAYS
 
         return context
+
+EXPORT_COLUMNS = [
+    ('transaction_date', 'Fecha'),
+    ('transaction_type', 'Tipo'),
+    ('category', 'Categoría'),
+    ('description', 'Descripción'),
+    ('payment_method', 'Método de Pago'),
+    ('bank__name', 'Banco'),
+    ('entity__name', 'Entidad'),
+    ('reference_number', 'Referencia'),
+    ('amount', 'Monto'),
+    ('commission', 'Comisión'),
+    ('net_amount', 'Monto Neto'),
+    ('cash_register__name', 'Caja'),
+]
+
+class Echo:
+    """Buffer mínimo para csv.writer: retorna cada línea en vez de acumularla"""
+    def write(self, value):
+        return value
+
+@login_required
+@use_replica
+def export_transactions_view(request):
+    """Exporta a CSV las transacciones filtradas como en el listado, con su monto neto"""
+    queryset = filter_transactions(request.user, request.GET).order_by('-transaction_date', '-id')
+    fields = [field for field, _ in EXPORT_COLUMNS]
+    totals = net_totals(queryset)
+
+    def rows():
+        writer = csv.writer(Echo())
+        yield writer.writerow([label for _, label in EXPORT_COLUMNS])
+        # values_list keeps the stream lean; net_amount comes computed from the database.
+        for row in queryset.values_list(*fields).iterator(chunk_size=2000):
+            yield writer.writerow(row)
+        yield writer.writerow([])
+        yield writer.writerow(['Neto ingresos', totals['net_income']])
+        yield writer.writerow(['Neto egresos', totals['net_outcome']])
+        yield writer.writerow(['Neto después de comisiones', totals['net_after_commissions']])
+
+    response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+    filename = f"transacciones_{timezone.localdate():%Y%m%d}.csv"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@login_required
+@require_POST
+def sync_transactions_view(request):
+    """Recibe un lote de transacciones registradas offline por un terminal (JSON)"""
+    try:
+        items = json.loads(request.body)['transactions']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Formato de lote inválido.'}, status=400)
+
+    if not isinstance(items, list):
+        return JsonResponse({'error': 'Formato de lote inválido.'}, status=400)
+    if len(items) > MAX_BATCH_SIZE:
+        return JsonResponse(
+            {'error': f'El lote supera el máximo de {MAX_BATCH_SIZE} transacciones.'},
+            status=413
+        )
+
+    results = sync_transactions(request.user, items)
+    statuses = [result['status'] for result in results]
+    return JsonResponse({
+        'created': statuses.count('created'),
+        'duplicates': statuses.count('duplicate'),
+        'invalid': statuses.count('invalid'),
+        'results': results,
+    })
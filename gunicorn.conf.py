@@ -0,0 +1,58 @@
+# Gunicorn configuration: gunicorn -c gunicorn.conf.py
+#
+# GUNICORN_WORKER_CLASS=sync     WSGI, one request per worker process (default)
+# GUNICORN_WORKER_CLASS=gthread  WSGI, GUNICORN_THREADS requests per worker, so
+#                                a slow client holds a thread, not a process
+# GUNICORN_WORKER_CLASS=uvicorn  ASGI via uvicorn workers; pair with
+#                                ASYNC_DASHBOARDS=True so the dashboards run
+#                                their aggregates concurrently
+#
+# With GUNICORN_PRELOAD=True (default) the master imports Django and every app
+# once and the workers are forked from it, sharing those pages copy-on-write.
+# Compare the profiles with: python manage.py bench_serving
+import gc
+
+# Gunicorn reads every module-level name as a setting, and 'config' is one.
+from decouple import config as env
+
+bind = env('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = env('GUNICORN_WORKERS', default=3, cast=int)
+timeout = env('GUNICORN_TIMEOUT', default=30, cast=int)
+preload_app = env('GUNICORN_PRELOAD', default=True, cast=bool)
+
+# Recycle workers after a number of requests so slow leaks stay bounded; the
+# jitter keeps all workers from restarting at the same moment.
+max_requests = env('GUNICORN_MAX_REQUESTS', default=1000, cast=int)
+max_requests_jitter = env('GUNICORN_MAX_REQUESTS_JITTER', default=100, cast=int)
+
+worker_class = env('GUNICORN_WORKER_CLASS', default='sync')
+if worker_class == 'uvicorn':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    wsgi_app = 'softwareTienda.asgi:application'
+else:
+    wsgi_app = 'softwareTienda.wsgi:application'
+    if worker_class == 'gthread':
+        threads = env('GUNICORN_THREADS', default=4, cast=int)
+
+accesslog = '-'
+
+if preload_app:
+    # A collection in the master while the app is imported would leave holes
+    # in pages the workers are about to share; collect nothing until forking.
+    gc.disable()
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # wsgi.py warms the barcode index with a query; a connection opened
+        # in the master must not be inherited by every worker.
+        from django.db import connections
+        connections.close_all()
+        # Move every preloaded object to the permanent generation: the
+        # workers' collections then never touch (and copy) those pages.
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
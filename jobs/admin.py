@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.utils import timezone
+from main.pagination import EstimatedCountPaginator
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_after', 'locked_by', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'locked_by')
+    readonly_fields = ('result', 'error', 'attempts', 'locked_by', 'locked_at', 'finished_at', 'created_at', 'updated_at')
+    raw_id_fields = ('created_by',)
+    ordering = ('-created_at',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    actions = ['requeue']
+
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='queued',
+            attempts=0,
+            run_after=timezone.now(),
+            locked_by='',
+            locked_at=None,
+        )
+        self.message_user(request, f'{updated} tareas devueltas a la cola.')
+    requeue.short_description = 'Volver a encolar'
@@ -0,0 +1,81 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connections
+
+from jobs.queue import requeue_stale, run_pending
+
+logger = logging.getLogger(__name__)
+
+
+def work(worker_id, stop, poll_interval, batch_size, once):
+    while not stop.is_set():
+        try:
+            ran = run_pending(worker_id, limit=batch_size)
+        except DatabaseError:
+            # Lock contention (SQLite) or a dropped connection; retry later.
+            logger.warning('Worker %s could not claim jobs', worker_id, exc_info=True)
+            connections.close_all()
+            stop.wait(poll_interval)
+            continue
+        if once and not ran:
+            return
+        if not ran:
+            stop.wait(poll_interval)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los workers de tareas en segundo plano (reportes de cierre, exportaciones, consolidados)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Número de workers concurrentes')
+        parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Segundos de espera con la cola vacía')
+        parser.add_argument('--batch-size', type=int, default=1, help='Tareas tomadas por consulta')
+        parser.add_argument('--stale-after', type=int, default=900,
+                            help='Segundos tras los que una tarea en ejecución se considera abandonada')
+        parser.add_argument('--once', action='store_true', help='Vaciar la cola y terminar')
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale(timedelta(seconds=options['stale_after']))
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'{requeued} tareas abandonadas devueltas a la cola'))
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        worker_args = (options['poll_interval'], options['batch_size'], options['once'])
+
+        if options['mode'] == 'process':
+            # Forked children must not inherit the parent's DB connections.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            stop = context.Event()
+            workers = [
+                context.Process(target=work, args=(f'{prefix}:p{i}', stop, *worker_args))
+                for i in range(options['workers'])
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=work, args=(f'{prefix}:t{i}', stop, *worker_args))
+                for i in range(options['workers'])
+            ]
+
+        def shutdown(signum, frame):
+            self.stdout.write('Deteniendo workers...')
+            stop.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(f"Iniciando {options['workers']} workers ({options['mode']})")
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Tarea')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('status', models.CharField(choices=[('queued', 'En cola'), ('running', 'En ejecución'), ('succeeded', 'Completada'), ('failed', 'Fallida')], default='queued', max_length=10, verbose_name='Estado')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Resultado')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='Máximo de Intentos')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Ejecutar Después de')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Tomada en')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizada en')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL, verbose_name='Creada por')),
+            ],
+            options={
+                'verbose_name': 'Tarea',
+                'verbose_name_plural': 'Tareas',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='jobs_job_claim_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+User = get_user_model()
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'En cola'),
+        ('running', 'En ejecución'),
+        ('succeeded', 'Completada'),
+        ('failed', 'Fallida'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name='Tarea')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='Parámetros')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='queued',
+        verbose_name='Estado'
+    )
+    result = models.JSONField(null=True, blank=True, verbose_name='Resultado')
+    error = models.TextField(blank=True, verbose_name='Error')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name='Máximo de Intentos')
+    run_after = models.DateTimeField(default=timezone.now, verbose_name='Ejecutar Después de')
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Tomada en')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Finalizada en')
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name='Creada por'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+        ordering = ['-created_at']
+        indexes = [
+            # Serves the worker's claim query: queued jobs that are due, oldest first.
+            models.Index(fields=['status', 'run_after'], name='jobs_job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
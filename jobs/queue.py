@@ -0,0 +1,132 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+def task(name):
+    """Registra una función como tarea ejecutable por los workers"""
+    def decorator(func):
+        _tasks[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, user=None, max_attempts=3, run_after=None):
+    """
+    Encola una tarea y retorna el Job creado.
+
+    With JOBS_EAGER the job still goes through the table but runs in this
+    process right after the surrounding transaction commits, so development
+    servers work without a separate worker.
+    """
+    if name not in _tasks:
+        raise KeyError(f'Unknown task: {name}')
+
+    job = Job.objects.create(
+        name=name,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+    if getattr(settings, 'JOBS_EAGER', False):
+        transaction.on_commit(lambda: run_pending(worker_id='eager', job_ids=[job.pk]))
+    return job
+
+
+def claim(worker_id, limit=1, job_ids=None):
+    """
+    Toma hasta ``limit`` tareas pendientes para este worker.
+
+    Rows are selected with SELECT ... FOR UPDATE SKIP LOCKED so concurrent
+    workers never block on or double-claim the same job. Backends without
+    row locks (SQLite) still get exclusivity from the conditional UPDATE on
+    status.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = Job.objects.select_for_update(skip_locked=True).filter(
+            status='queued',
+            run_after__lte=now
+        )
+        if job_ids is not None:
+            candidates = candidates.filter(pk__in=job_ids)
+        candidates = list(candidates.order_by('run_after', 'id')[:limit])
+
+        claimed = []
+        for job in candidates:
+            updated = Job.objects.filter(pk=job.pk, status='queued').update(
+                status='running',
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if updated:
+                claimed.append(job.pk)
+
+    return list(Job.objects.filter(pk__in=claimed))
+
+
+def run(job):
+    """Ejecuta una tarea ya tomada y registra su resultado o reprograma un reintento"""
+    try:
+        result = _tasks[job.name](job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Job %s (%s) failed on attempt %s', job.pk, job.name, job.attempts)
+        if job.attempts < job.max_attempts:
+            delay = getattr(settings, 'JOBS_RETRY_BASE_SECONDS', 10) * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status='queued',
+                error=error,
+                locked_by='',
+                locked_at=None,
+                run_after=timezone.now() + timedelta(seconds=delay),
+                updated_at=timezone.now(),
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status='failed',
+                error=error,
+                finished_at=timezone.now(),
+                updated_at=timezone.now(),
+            )
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status='succeeded',
+        result=result,
+        error='',
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    return True
+
+
+def run_pending(worker_id, limit=1, job_ids=None):
+    """Toma y ejecuta tareas pendientes; retorna cuántas se ejecutaron"""
+    close_old_connections()
+    jobs = claim(worker_id, limit=limit, job_ids=job_ids)
+    for job in jobs:
+        run(job)
+    close_old_connections()
+    return len(jobs)
+
+
+def requeue_stale(timeout):
+    """Devuelve a la cola las tareas de workers que murieron a mitad de ejecución"""
+    return Job.objects.filter(
+        status='running',
+        locked_at__lt=timezone.now() - timeout
+    ).update(status='queued', locked_by='', locked_at=None, updated_at=timezone.now())
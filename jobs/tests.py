@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim, enqueue, requeue_stale, run_pending, task
+
+calls = []
+
+
+@task('tests.echo')
+def echo(payload):
+    calls.append(payload)
+    return {'echo': payload['value']}
+
+
+@task('tests.fail')
+def fail(payload):
+    raise RuntimeError('falla a propósito')
+
+
+@override_settings(JOBS_EAGER=False, JOBS_RETRY_BASE_SECONDS=10)
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_is_claimed_only_once(self):
+        job = enqueue('tests.echo', {'value': 1})
+
+        first = claim('worker-a', limit=5)
+        second = claim('worker-b', limit=5)
+
+        self.assertEqual([claimed.pk for claimed in first], [job.pk])
+        self.assertEqual(second, [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts), ('running', 'worker-a', 1))
+
+    def test_run_pending_stores_the_result(self):
+        job = enqueue('tests.echo', {'value': 7})
+
+        self.assertEqual(run_pending('worker-a'), 1)
+        self.assertEqual(run_pending('worker-a'), 0)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.result, {'echo': 7})
+        self.assertEqual(calls, [{'value': 7}])
+
+    def test_future_jobs_wait_for_run_after(self):
+        enqueue('tests.echo', {'value': 1}, run_after=timezone.now() + timedelta(minutes=5))
+
+        self.assertEqual(run_pending('worker-a'), 0)
+
+    def test_failed_job_is_retried_with_backoff_then_fails(self):
+        job = enqueue('tests.fail', max_attempts=2)
+
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            run_pending('worker-a')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertIn('falla a propósito', job.error)
+        self.assertAlmostEqual(
+            (job.run_after - timezone.now()).total_seconds(), 10, delta=2
+        )
+        # Not due yet.
+        self.assertEqual(run_pending('worker-a'), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            run_pending('worker-a')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_requeue_stale_returns_abandoned_jobs_to_the_queue(self):
+        stale = enqueue('tests.echo', {'value': 1})
+        fresh = enqueue('tests.echo', {'value': 2})
+        claim('worker-a', limit=2)
+        Job.objects.filter(pk=stale.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale(timedelta(minutes=10)), 1)
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((stale.status, stale.locked_by), ('queued', ''))
+        self.assertEqual(fresh.status, 'running')
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_jobs_run_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = enqueue('tests.echo', {'value': 3})
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
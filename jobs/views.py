@@ -0,0 +1,24 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from .models import Job
+
+@login_required
+def job_status(request, job_id):
+    """Estado de una tarea en segundo plano, para consultar desde el navegador"""
+    job = get_object_or_404(Job, pk=job_id)
+    if job.created_by_id != request.user.pk and not request.user.is_admin():
+        return JsonResponse({'error': 'No tienes permisos para ver esta tarea.'}, status=403)
+
+    data = {
+        'id': job.pk,
+        'name': job.name,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'attempts': job.attempts,
+        'finished': job.is_finished,
+        'result': job.result,
+    }
+    if job.status == 'failed':
+        data['error'] = 'La tarea falló. Contacta a un administrador.'
+    return JsonResponse(data)
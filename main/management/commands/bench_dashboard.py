@@ -0,0 +1,125 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import AsyncRequestFactory, RequestFactory
+from django.utils import timezone
+
+from accounts.models import User
+from caja.ledger import post_many
+from caja.models import CashRegister, Transaction
+from caja.views import caja_dashboard, caja_dashboard_async
+from main.views import dashboard_view, dashboard_view_async
+
+VIEWS = [
+    ('caja', caja_dashboard, caja_dashboard_async),
+    ('main', dashboard_view, dashboard_view_async),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compara la latencia p50/p99 de los paneles síncronos y asíncronos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=1, help='Solicitudes simultáneas')
+        parser.add_argument('--transactions', type=int, default=5000, help='Transacciones de ejemplo')
+
+    def handle(self, *args, **options):
+        # The async views query from other threads and connections, so the
+        # sample rows must be committed; they are deleted afterwards.
+        user = self.create_sample(options['transactions'])
+        try:
+            self.stdout.write(f'{"Panel":<8} {"modo":<6} {"p50 (ms)":>9} {"p99 (ms)":>9} {"req/s":>8}')
+            for name, sync_view, async_view in VIEWS:
+                for mode, view in (('sync', sync_view), ('async', async_view)):
+                    if mode == 'sync':
+                        timings, elapsed = self.bench_sync(view, user, options['iterations'], options['concurrency'])
+                    else:
+                        timings, elapsed = asyncio.run(
+                            self.bench_async(view, user, options['iterations'], options['concurrency'])
+                        )
+                    timings.sort()
+                    p50 = statistics.median(timings)
+                    p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+                    self.stdout.write(
+                        f'{name:<8} {mode:<6} {p50:>9.3f} {p99:>9.3f} {len(timings) / elapsed:>8.1f}'
+                    )
+        finally:
+            Transaction.objects.filter(user=user).delete()
+            CashRegister.objects.filter(opened_by=user).delete()
+            user.delete()
+
+    def create_sample(self, transaction_count):
+        user = User.objects.create_user('bench-dashboard', password='bench', role='user')
+        register = CashRegister.objects.create(
+            name='Caja Benchmark',
+            opening_balance=Decimal('100000.00'),
+            current_balance=Decimal('100000.00'),
+            status='open',
+            opened_by=user,
+            opened_at=timezone.now(),
+        )
+        post_many([
+            Transaction(
+                transaction_type='income' if i % 3 else 'outcome',
+                amount=Decimal('1500.00') + i % 100,
+                description=f'Transacción de prueba {i}',
+                category='general_transaction',
+                cash_register=register,
+                user=user,
+                transaction_date=timezone.now(),
+            )
+            for i in range(transaction_count)
+        ])
+        return user
+
+    def prepare(self, request, user):
+        async def auser():
+            return user
+        request.user = user
+        request.auser = auser
+        request._messages = CookieStorage(request)
+        return request
+
+    def bench_sync(self, view, user, iterations, concurrency):
+        factory = RequestFactory()
+
+        def call():
+            request = self.prepare(factory.get('/'), user)
+            started = time.perf_counter()
+            view(request)
+            duration = (time.perf_counter() - started) * 1000
+            close_old_connections()
+            return duration
+
+        call()
+        started = time.perf_counter()
+        if concurrency == 1:
+            timings = [call() for _ in range(iterations)]
+        else:
+            with ThreadPoolExecutor(concurrency) as pool:
+                timings = list(pool.map(lambda _: call(), range(iterations)))
+        return timings, time.perf_counter() - started
+
+    async def bench_async(self, view, user, iterations, concurrency):
+        factory = AsyncRequestFactory()
+
+        async def call():
+            request = self.prepare(factory.get('/'), user)
+            started = time.perf_counter()
+            await view(request)
+            return (time.perf_counter() - started) * 1000
+
+        await call()
+        timings = []
+        started = time.perf_counter()
+        for offset in range(0, iterations, concurrency):
+            batch = min(concurrency, iterations - offset)
+            timings.extend(await asyncio.gather(*(call() for _ in range(batch))))
+        return timings, time.perf_counter() - started
@@ -0,0 +1,145 @@
+import http.client
+import importlib.util
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = {
+    'sync': {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_PRELOAD': 'False'},
+    'sync+preload': {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_PRELOAD': 'True'},
+    'gthread+preload': {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_PRELOAD': 'True'},
+    'uvicorn+preload': {'GUNICORN_WORKER_CLASS': 'uvicorn', 'GUNICORN_PRELOAD': 'True'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def memory(pid):
+    """RSS y PSS (MB) de un proceso; PSS reparte las páginas compartidas entre quienes las usan"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            name, _, rest = line.partition(':')
+            if name in ('Rss', 'Pss'):
+                values[name] = int(rest.split()[0]) / 1024
+    return values['Rss'], values['Pss']
+
+
+def worker_pids(master):
+    with open(f'/proc/{master}/task/{master}/children') as children:
+        return [int(pid) for pid in children.read().split()]
+
+
+class Command(BaseCommand):
+    help = 'Compara los perfiles de gunicorn.conf.py: memoria por worker y solicitudes por segundo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+        parser.add_argument('--workers', type=int, default=3)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=8, help='Clientes simultáneos')
+        parser.add_argument('--path', default='/accounts/login/', help='URL solicitada')
+
+    def handle(self, *args, **options):
+        if not Path('/proc/self/smaps_rollup').exists():
+            raise CommandError('La medición de memoria necesita /proc (Linux 4.14 o superior).')
+
+        self.stdout.write(
+            f'{"Perfil":<16} {"RSS/worker":>11} {"PSS/worker":>11} {"req/s":>8} {"p50 (ms)":>9} {"p99 (ms)":>9} {"errores":>8}'
+        )
+        for name in options['profiles']:
+            env = PROFILES[name]
+            if env['GUNICORN_WORKER_CLASS'] == 'uvicorn' and importlib.util.find_spec('uvicorn') is None:
+                self.stdout.write(f'{name:<16} omitido: uvicorn no está instalado')
+                continue
+            self.run(name, env, options)
+
+    def run(self, name, env, options):
+        port = free_port()
+        master = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(settings.BASE_DIR / 'gunicorn.conf.py')],
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ, **env,
+                'GUNICORN_BIND': f'127.0.0.1:{port}',
+                'GUNICORN_WORKERS': str(options['workers']),
+                'ALLOWED_HOSTS': '127.0.0.1',
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self.wait_ready(master, port, options['workers'])
+            timings, errors, elapsed = self.load(port, options['path'], options['requests'], options['concurrency'])
+            usage = [memory(pid) for pid in worker_pids(master.pid)]
+        finally:
+            master.send_signal(signal.SIGTERM)
+            master.wait(timeout=30)
+
+        rss = statistics.mean(value[0] for value in usage)
+        pss = statistics.mean(value[1] for value in usage)
+        timings.sort()
+        p50 = statistics.median(timings) if timings else 0
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)] if timings else 0
+        self.stdout.write(
+            f'{name:<16} {rss:>8.1f} MB {pss:>8.1f} MB {len(timings) / elapsed:>8.1f} {p50:>9.3f} {p99:>9.3f} {errors:>8}'
+        )
+
+    def wait_ready(self, master, port, workers, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if master.poll() is not None:
+                raise CommandError(f'gunicorn terminó al iniciar (código {master.returncode})')
+            try:
+                if len(worker_pids(master.pid)) == workers:
+                    with socket.create_connection(('127.0.0.1', port), timeout=1):
+                        return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise CommandError('gunicorn no respondió a tiempo')
+
+    def load(self, port, path, total, concurrency):
+        local = threading.local()
+
+        def call(_):
+            if not hasattr(local, 'conn'):
+                local.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            started = time.perf_counter()
+            try:
+                local.conn.request('GET', path)
+                response = local.conn.getresponse()
+                response.read()
+                if response.will_close:
+                    local.conn.close()
+                    del local.conn
+            except (OSError, http.client.HTTPException):
+                local.conn.close()
+                del local.conn
+                return None
+            if response.status >= 500:
+                return None
+            return (time.perf_counter() - started) * 1000
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            # Warm-up: every worker renders the page once before measuring.
+            list(pool.map(call, range(concurrency * 4)))
+            started = time.perf_counter()
+            results = list(pool.map(call, range(total)))
+            elapsed = time.perf_counter() - started
+        timings = [result for result in results if result is not None]
+        return timings, len(results) - len(timings), elapsed
@@ -0,0 +1,133 @@
+import multiprocessing
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from caja.ledger import post
+from caja.models import Bank, CashRegister, Transaction
+
+MODES = {
+    # Plain SQLite as Django configures it: rollback journal, deferred BEGIN.
+    'default': {'tuning': False, 'options': {}},
+    'tuned': {'tuning': True, 'options': {'transaction_mode': 'IMMEDIATE'}},
+}
+
+
+def write(register_id, user_id, bank_id, count, go, results):
+    connections.close_all()
+    go.wait()
+    ok = errors = 0
+    timings = []
+    for i in range(count):
+        started = time.perf_counter()
+        try:
+            post(Transaction(
+                transaction_type='income' if i % 3 else 'outcome',
+                amount=Decimal('100.00') + i % 50,
+                description=f'Escritura concurrente {i}',
+                category='bank_operation',
+                payment_method='transfer',
+                bank_id=bank_id,
+                cash_register_id=register_id,
+                user_id=user_id,
+                transaction_date=timezone.now(),
+            ))
+        except OperationalError:
+            errors += 1
+        else:
+            ok += 1
+            timings.append((time.perf_counter() - started) * 1000)
+    connections.close_all()
+    results.put((ok, errors, timings))
+
+
+class Command(BaseCommand):
+    help = 'Mide el rendimiento de escritura de SQLite con varios procesos registrando transacciones a la vez'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=3, help='Procesos escribiendo a la vez (uno por caja)')
+        parser.add_argument('--transactions', type=int, default=200, help='Transacciones por proceso')
+        parser.add_argument('--mode', choices=[*MODES, 'both'], default='both')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Este benchmark solo aplica a SQLite (DATABASE_ENGINE=sqlite3).')
+        modes = list(MODES) if options['mode'] == 'both' else [options['mode']]
+
+        # Each mode runs against a fresh scratch database, never db.sqlite3.
+        settings_dict = connection.settings_dict
+        original = settings_dict['NAME'], settings_dict.get('OPTIONS', {})
+        self.stdout.write(
+            f'{"Modo":<8} {"journal":>8} {"ok":>6} {"errores":>8} {"tx/s":>8} {"p50 (ms)":>9} {"p99 (ms)":>9} {"íntegro":>8}'
+        )
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for mode in modes:
+                    connections.close_all()
+                    settings_dict['NAME'] = str(Path(directory) / f'{mode}.sqlite3')
+                    settings_dict['OPTIONS'] = MODES[mode]['options']
+                    with override_settings(SQLITE_TUNING=MODES[mode]['tuning']):
+                        self.run(mode, options['processes'], options['transactions'])
+        finally:
+            connections.close_all()
+            settings_dict['NAME'], settings_dict['OPTIONS'] = original
+
+    def run(self, mode, processes, count):
+        call_command('migrate', verbosity=0, interactive=False)
+        bank = Bank.objects.create(name='Banco Benchmark', code='BENCH')
+        workers = []
+        for i in range(processes):
+            user = User.objects.create_user(f'bench-writer-{i}', password='bench', role='user')
+            register = CashRegister.objects.create(
+                name=f'Caja {i}',
+                opening_balance=Decimal('100000.00'),
+                current_balance=Decimal('100000.00'),
+                status='open',
+                opened_by=user,
+                opened_at=timezone.now(),
+            )
+            workers.append((register.pk, user.pk))
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal = cursor.fetchone()[0]
+
+        # Forked children must not inherit the parent's DB connections.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        go = context.Event()
+        results = context.Queue()
+        children = [
+            context.Process(target=write, args=(register_id, user_id, bank.pk, count, go, results))
+            for register_id, user_id in workers
+        ]
+        for child in children:
+            child.start()
+        started = time.perf_counter()
+        go.set()
+        collected = [results.get() for _ in children]
+        elapsed = time.perf_counter() - started
+        for child in children:
+            child.join()
+
+        ok = sum(result[0] for result in collected)
+        errors = sum(result[1] for result in collected)
+        timings = sorted(timing for result in collected for timing in result[2])
+        p50 = statistics.median(timings) if timings else 0
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)] if timings else 0
+
+        # Every committed post must have advanced its register's sequence.
+        stored = Transaction.objects.count()
+        sequences = sum(CashRegister.objects.values_list('last_sequence', flat=True))
+        consistent = 'sí' if stored == ok == sequences else 'no'
+        self.stdout.write(
+            f'{mode:<8} {journal:>8} {ok:>6} {errors:>8} {ok / elapsed:>8.1f} {p50:>9.3f} {p99:>9.3f} {consistent:>8}'
+        )
@@ -0,0 +1,154 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+
+from accounts.forms import CustomUserCreationForm, LoginForm, UserEditForm
+from accounts.models import User
+from caja.forms import CashReconciliationForm, CashRegisterForm, TransactionForm
+from caja.ledger import post_many
+from caja.models import CashRegister, CashRegisterReport, Transaction
+from caja.reports import (
+    CLOSING_REPORT_CACHE_VERSION, calculate_shift_summary, generate_closing_report, render_closing_report,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo de render de cada plantilla con datos de ejemplo (se revierten al terminar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--transactions', type=int, default=50, help='Transacciones de ejemplo por caja')
+
+    def handle(self, *args, **options):
+        self.cache_keys = []
+        try:
+            with transaction.atomic():
+                self.run(options['iterations'], options['transactions'])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            cache.delete_many(self.cache_keys)
+
+    def run(self, iterations, transaction_count):
+        admin = User.objects.create_user('bench-admin', password='bench', role='admin')
+        cashier = User.objects.create_user('bench-user', password='bench', role='user')
+        register = CashRegister.objects.create(
+            name='Caja Benchmark',
+            opening_balance=Decimal('100000.00'),
+            current_balance=Decimal('100000.00'),
+            status='open',
+            opened_by=cashier,
+            opened_at=timezone.now(),
+        )
+        post_many([
+            Transaction(
+                transaction_type='income' if i % 3 else 'outcome',
+                amount=Decimal('1500.00') + i,
+                commission=Decimal('50.00') if i % 5 == 0 else Decimal('0.00'),
+                description=f'Transacción de prueba {i}',
+                category='papeleria_sale' if i % 2 else 'bank_operation',
+                payment_method='cash' if i % 4 else 'transfer',
+                cash_register=register,
+                user=cashier,
+                transaction_date=timezone.now(),
+            )
+            for i in range(transaction_count)
+        ])
+        register.refresh_from_db()
+        summary = calculate_shift_summary(register)
+        report = generate_closing_report(register)
+        register.status = 'closed'
+        register.closed_at = timezone.now()
+        register.save()
+        report = CashRegisterReport.objects.select_related('cash_register').get(pk=report.pk)
+        # The sample rows are rolled back, so their cached HTML must not outlive the run.
+        self.cache_keys = [
+            f'caja:closing_report_html:v{CLOSING_REPORT_CACHE_VERSION}:{report.pk}',
+            make_template_fragment_key('navbar_menu', ['admin']),
+            make_template_fragment_key('navbar_menu', ['user']),
+            make_template_fragment_key('navbar_menu', ['']),
+        ]
+
+        transactions = list(Transaction.objects.filter(cash_register=register).select_related('bank', 'entity', 'cash_register'))
+        paginator = Paginator(transactions, 20)
+        page_obj = paginator.page(1)
+        users = list(User.objects.order_by('-created_at'))
+        user_page = Paginator(users, 20).page(1)
+
+        cases = [
+            ('base.html', cashier, {}),
+            ('main/home.html', AnonymousUser(), {'title': 'Bienvenido', 'description': 'Punto de servicio'}),
+            ('main/dashboard.html', cashier, {'title': 'Panel Principal', 'user_role': 'Usuario', 'is_admin': False}),
+            ('accounts/login.html', AnonymousUser(), {'form': LoginForm()}),
+            ('accounts/signup.html', AnonymousUser(), {'form': CustomUserCreationForm()}),
+            ('accounts/admin/dashboard.html', admin, {'stats': {
+                'total_users': len(users), 'admin_users': 1, 'regular_users': 1,
+                'active_users': len(users), 'recent_users': users[:5],
+            }}),
+            ('accounts/admin/user_list.html', admin, {
+                'users': user_page.object_list, 'page_obj': user_page, 'paginator': user_page.paginator, 'is_paginated': False,
+            }),
+            ('accounts/admin/user_create.html', admin, {'form': CustomUserCreationForm()}),
+            ('accounts/admin/user_edit.html', admin, {'form': UserEditForm(instance=cashier), 'object': cashier}),
+            ('accounts/admin/user_delete.html', admin, {'user_obj': cashier}),
+            ('caja/dashboard.html', cashier, {
+                'current_register': register, 'recent_transactions': transactions[:10],
+                'daily_income': summary['total_income'], 'daily_outcome': summary['total_outcome'],
+                'daily_balance': summary['net_total'],
+            }),
+            ('caja/open_register.html', cashier, {'form': CashRegisterForm()}),
+            ('caja/close_register.html', cashier, {
+                'register': register, 'form': CashReconciliationForm(), 'summary': summary,
+            }),
+            ('caja/transaction_create.html', cashier, {'form': TransactionForm(user=cashier), 'transaction_type': 'income'}),
+            ('caja/transaction_list.html', cashier, {
+                'transactions': page_obj.object_list, 'page_obj': page_obj, 'paginator': paginator,
+                'is_paginated': True, 'total_income': summary['total_income'],
+                'total_outcome': summary['total_outcome'], 'net_total': summary['net_total'],
+            }),
+            ('caja/closing_report_body.html', cashier, {'report': report, 'register': register}),
+            ('caja/closing_report.html', cashier, {
+                'report': report, 'register': register, 'report_html': render_closing_report(report),
+            }),
+        ]
+
+        loaders = engines['django'].engine.loaders
+        self.stdout.write(f'Loaders: {loaders}')
+        self.stdout.write(f'{"Plantilla":<36} {"primera (ms)":>13} {"media (ms)":>11} {"p95 (ms)":>9}')
+
+        factory = RequestFactory()
+        for name, user, context in cases:
+            request = factory.get('/')
+            request.user = user
+            request._messages = CookieStorage(request)
+            cache.delete_many(self.cache_keys[1:])
+
+            started = time.perf_counter()
+            render_to_string(name, context, request)
+            first = (time.perf_counter() - started) * 1000
+
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                render_to_string(name, context, request)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            self.stdout.write(f'{name:<36} {first:>13.3f} {statistics.mean(timings):>11.3f} {p95:>9.3f}')
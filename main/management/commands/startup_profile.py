@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What each kind of process imports before it can do any work.
+ENTRYPOINTS = {
+    'manage': 'import django; django.setup()',
+    'web': 'import softwareTienda.wsgi',
+}
+
+# -X importtime only times imports made through __import__; apps, models and
+# the settings module are loaded with importlib.import_module and would be
+# missing from the tree, their own imports showing up as top-level entries.
+TRACE_IMPORT_MODULE = (
+    'import importlib, importlib.util, sys\n'
+    'def import_module(name, package=None):\n'
+    '    name = importlib.util.resolve_name(name, package)\n'
+    '    __import__(name)\n'
+    '    return sys.modules[name]\n'
+    'importlib.import_module = import_module\n'
+)
+
+
+def measure_startup(entrypoint, importtime=False):
+    """
+    Arranca un intérprete nuevo con el punto de entrada indicado.
+
+    Returns (process seconds, setup seconds, -X importtime report). Setup
+    time covers settings, app loading and, for 'web', the WSGI module; the
+    process time adds interpreter start-up and shutdown.
+    """
+    code = (
+        (TRACE_IMPORT_MODULE if importtime else '')
+        + 'import time; started = time.perf_counter(); '
+        + f'{ENTRYPOINTS[entrypoint]}; print(time.perf_counter() - started)'
+    )
+    command = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', code]
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'softwareTienda.settings'),
+        'DJANGO_ENTRYPOINT': entrypoint,
+    }
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        raise CommandError(f'El arranque {entrypoint!r} falló:\n{result.stderr[-2000:]}')
+    return elapsed, float(result.stdout.split()[-1]), result.stderr
+
+
+def import_tree(report):
+    """Convierte la salida de -X importtime en un árbol de {'name', 'self', 'cumulative', 'children'}"""
+    pending = {}
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Children are printed before their parent, two spaces deeper.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        node = {
+            'name': name.strip(),
+            'self': int(self_us) / 1000,
+            'cumulative': int(cumulative_us) / 1000,
+            'children': pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+class Command(BaseCommand):
+    help = 'Muestra el tiempo de arranque y el árbol de tiempos de importación de cada punto de entrada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entrypoint', choices=[*ENTRYPOINTS, 'both'], default='both')
+        parser.add_argument('--depth', type=int, default=3, help='Niveles del árbol a mostrar')
+        parser.add_argument('--min-ms', type=float, default=5.0, help='Ocultar módulos por debajo de este tiempo acumulado')
+        parser.add_argument('--runs', type=int, default=3, help='Arranques medidos; se informa el más rápido')
+
+    def handle(self, *args, **options):
+        entrypoints = list(ENTRYPOINTS) if options['entrypoint'] == 'both' else [options['entrypoint']]
+        timings = {}
+        for entrypoint in entrypoints:
+            runs = [measure_startup(entrypoint)[:2] for _ in range(options['runs'])]
+            timings[entrypoint] = min(runs, key=lambda run: run[1])
+            _, _, report = measure_startup(entrypoint, importtime=True)
+            tree = import_tree(report)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{entrypoint}: {ENTRYPOINTS[entrypoint]}'))
+            self.stdout.write(f'{"acum. (ms)":>10} {"propio (ms)":>11}  módulo')
+            for node in sorted(tree, key=lambda node: -node['cumulative']):
+                self.write_node(node, 0, options['depth'], options['min_ms'])
+            self.stdout.write(f'Módulos importados: {report.count("import time:") - 1}')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nResumen (mejor de %d)' % options['runs']))
+        self.stdout.write(f'{"Punto de entrada":<18} {"proceso (ms)":>13} {"setup (ms)":>11}')
+        for entrypoint, (process, setup) in timings.items():
+            self.stdout.write(f'{entrypoint:<18} {process * 1000:>13.1f} {setup * 1000:>11.1f}')
+
+    def write_node(self, node, depth, max_depth, min_ms):
+        if node['cumulative'] < min_ms:
+            return
+        self.stdout.write(f'{node["cumulative"]:>10.1f} {node["self"]:>11.1f}  {"  " * depth}{node["name"]}')
+        if depth + 1 < max_depth:
+            for child in sorted(node['children'], key=lambda child: -child['cumulative']):
+                self.write_node(child, depth + 1, max_depth, min_ms)
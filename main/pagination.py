@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator que evita el COUNT(*) exacto en tablas grandes.
+
+    Por debajo de PAGINATION_ESTIMATE_THRESHOLD cuenta de forma exacta. Por
+    encima usa el último conteo exacto cacheado o, en PostgreSQL, la
+    estimación del planificador (pg_class.reltuples / EXPLAIN), y refresca el
+    conteo exacto en segundo plano. ``count_is_estimate`` indica a las
+    plantillas que deben mostrar el total como aproximado.
+    """
+
+    def __init__(self, *args, threshold=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if threshold is None:
+            threshold = _setting('PAGINATION_ESTIMATE_THRESHOLD', 10000)
+        self.threshold = threshold
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        cache_key = self._count_cache_key(queryset)
+        cached = cache.get(cache_key)
+        if cached is not None and cached[0] >= self.threshold:
+            count, counted_at = cached
+            if time.time() - counted_at > _setting('PAGINATION_COUNT_REFRESH_SECONDS', 60):
+                self._refresh_count_async(cache_key, queryset)
+            self.count_is_estimate = True
+            return count
+
+        estimate = self._planner_estimate(queryset)
+        if estimate is not None and estimate >= self.threshold:
+            self._refresh_count_async(cache_key, queryset)
+            self.count_is_estimate = True
+            return estimate
+
+        count = queryset.count()
+        if cached is None or cached[0] != count:
+            # Small lists are counted on every page load; only a changed
+            # count is worth a cache write.
+            self._store_count(cache_key, count)
+        return count
+
+    def page(self, number):
+        if not self.count or not self.count_is_estimate:
+            return super().page(number)
+
+        # The total is approximate: do not clamp the last page to it, just
+        # report an empty page once we run past the real end of the results.
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page])
+        if not object_list and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return self._get_page(object_list, number, self)
+
+    def validate_number(self, number):
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().validate_number(number)
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    # Count sources ---------------------------------------------------------
+
+    @staticmethod
+    def _count_cache_key(queryset):
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+        return f'pagination:count:{digest}'
+
+    @staticmethod
+    def _store_count(cache_key, count):
+        cache.set(cache_key, (count, time.time()), _setting('PAGINATION_COUNT_CACHE_TIMEOUT', 60 * 60 * 24))
+
+    @staticmethod
+    def _planner_estimate(queryset):
+        """Row estimate from PostgreSQL statistics, None on other backends."""
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        try:
+            if not queryset.query.where and not queryset.query.distinct:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                        [queryset.model._meta.db_table],
+                    )
+                    row = cursor.fetchone()
+                # reltuples is -1 for tables that were never analyzed.
+                if row and row[0] >= 0:
+                    return row[0]
+                return None
+
+            plan = json.loads(queryset.order_by().explain(format='json'))
+            return int(plan[0]['Plan']['Plan Rows'])
+        except Exception:
+            logger.exception('Could not estimate row count for %s', queryset.model._meta.label)
+            return None
+
+    @classmethod
+    def _refresh_count_async(cls, cache_key, queryset):
+        # Only one refresh per query signature runs at a time across workers.
+        if not cache.add(f'{cache_key}:refreshing', True, 60):
+            return
+
+        queryset = queryset.all()
+
+        def refresh():
+            try:
+                cls._store_count(cache_key, queryset.count())
+            except Exception:
+                logger.exception('Could not refresh row count for %s', queryset.model._meta.label)
+            finally:
+                cache.delete(f'{cache_key}:refreshing')
+                connections[queryset.db].close()
+
+        threading.Thread(target=refresh, daemon=True).start()
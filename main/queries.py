@@ -0,0 +1,36 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def run_queries(queries):
+    """Ejecuta consultas independientes una tras otra (vista síncrona)"""
+    return {name: query() for name, query in queries.items()}
+
+
+def _run_isolated(query):
+    try:
+        return query()
+    finally:
+        # Executor threads outlive the request; release their connection
+        # according to CONN_MAX_AGE like the request thread does.
+        close_old_connections()
+
+
+async def gather_queries(queries):
+    """
+    Ejecuta consultas independientes en paralelo (vista asíncrona).
+
+    Django's own async ORM methods (aget, aaggregate, ...) funnel through a
+    single thread-sensitive executor, so gathering them still runs one query
+    at a time. Each callable here runs with ``thread_sensitive=False`` instead,
+    i.e. on its own thread and database connection, so the queries overlap.
+    Callables must fully evaluate their querysets.
+    """
+    names = list(queries)
+    results = await asyncio.gather(*(
+        sync_to_async(_run_isolated, thread_sensitive=False)(queries[name])
+        for name in names
+    ))
+    return dict(zip(names, results))
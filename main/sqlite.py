@@ -0,0 +1,34 @@
+"""
+Ajustes de SQLite para varios procesos escribiendo a la vez (SQLITE_TUNING).
+
+With the default rollback journal a writer blocks every reader and a second
+writer fails with "database is locked" as soon as the short default timeout
+runs out. Each new connection is switched to WAL (readers never block the
+writer), waits up to SQLITE_BUSY_TIMEOUT_MS for the write lock and keeps a
+larger page cache and memory map. Transactions start with BEGIN IMMEDIATE
+(see DATABASES['default']['OPTIONS']): a deferred transaction that reads
+first and writes later cannot wait for the lock once another writer
+committed, so it would fail right away regardless of busy_timeout.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def pragmas():
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': settings.SQLITE_BUSY_TIMEOUT_MS,
+        'mmap_size': settings.SQLITE_MMAP_SIZE,
+        'cache_size': -settings.SQLITE_CACHE_SIZE_KB,
+    }
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_TUNING:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
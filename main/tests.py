@@ -1,3 +1,103 @@
-from django.test import TestCase
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import get_commands
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import User
+from main.management.commands.startup_profile import import_tree, measure_startup
+from main.pagination import EstimatedCountPaginator
+from manage import MANAGE_COMMANDS
+
+
+def module_names(nodes):
+    for node in nodes:
+        yield node['name']
+        yield from module_names(node['children'])
+
+
+def imported_modules(entrypoint):
+    _, _, report = measure_startup(entrypoint, importtime=True)
+    return set(module_names(import_tree(report)))
+
+
+class StartupTests(SimpleTestCase):
+    def test_manage_entrypoint_skips_form_rendering_apps(self):
+        modules = imported_modules('manage')
+        self.assertIn('caja.models', modules)
+        self.assertNotIn('crispy_forms', modules)
+        self.assertNotIn('crispy_bootstrap5', modules)
+
+    def test_web_entrypoint_loads_form_rendering_apps(self):
+        modules = imported_modules('web')
+        self.assertIn('crispy_forms', modules)
+        self.assertIn('crispy_bootstrap5', modules)
+
+    def test_manage_commands_exist(self):
+        # A misspelt name would silently start that command as 'web'.
+        self.assertLessEqual(MANAGE_COMMANDS, set(get_commands()))
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for number in range(3):
+            User.objects.create_user(f'usuario{number}')
+        self.users = User.objects.order_by('pk')
+
+    def paginator(self, threshold=10):
+        return EstimatedCountPaginator(self.users, 1, threshold=threshold)
+
+    def test_small_list_is_counted_exactly_and_cached_once(self):
+        with mock.patch.object(EstimatedCountPaginator, '_store_count', wraps=EstimatedCountPaginator._store_count) as store:
+            self.assertEqual(self.paginator().count, 3)
+            self.assertEqual(self.paginator().count, 3)
+
+        self.assertEqual(store.call_count, 1)
+        self.assertFalse(self.paginator().count_is_estimate)
+
+    def test_cached_count_above_threshold_is_served_as_estimate(self):
+        cache_key = EstimatedCountPaginator._count_cache_key(self.users)
+        cache.set(cache_key, (50, time.time()))
+        paginator = self.paginator(threshold=2)
+
+        with mock.patch.object(EstimatedCountPaginator, '_refresh_count_async') as refresh:
+            self.assertEqual(paginator.count, 50)
+            self.assertTrue(paginator.count_is_estimate)
+            # The approximate total does not clamp pages; running past the
+            # real rows is an empty page.
+            self.assertEqual(len(paginator.page(3)), 1)
+            with self.assertRaises(EmptyPage):
+                paginator.page(4)
+        refresh.assert_not_called()
+
+    def test_stale_cached_count_is_refreshed(self):
+        cache_key = EstimatedCountPaginator._count_cache_key(self.users)
+        cache.set(cache_key, (50, time.time() - 3600))
+
+        with mock.patch.object(EstimatedCountPaginator, '_refresh_count_async') as refresh:
+            self.assertEqual(self.paginator(threshold=2).count, 50)
+        refresh.assert_called_once()
+
+    def test_planner_estimate_above_threshold_is_used(self):
+        with mock.patch.object(EstimatedCountPaginator, '_planner_estimate', return_value=40000), \
+                mock.patch.object(EstimatedCountPaginator, '_refresh_count_async') as refresh:
+            paginator = self.paginator(threshold=2)
+            self.assertEqual(paginator.count, 40000)
+            self.assertTrue(paginator.count_is_estimate)
+        refresh.assert_called_once()
+
+    def test_planner_estimate_below_threshold_falls_back_to_exact_count(self):
+        with mock.patch.object(EstimatedCountPaginator, '_planner_estimate', return_value=5):
+            paginator = self.paginator(threshold=10)
+            self.assertEqual(paginator.count, 3)
+            self.assertFalse(paginator.count_is_estimate)
+
+    @skipUnless(connection.vendor == 'postgresql', 'pg_class estimates are PostgreSQL only')
+    def test_postgresql_estimate_reads_pg_class(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {User._meta.db_table}')
+        self.assertEqual(EstimatedCountPaginator._planner_estimate(User.objects.all()), 3)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -5,5 +6,5 @@ app_name = 'main'
 
 urlpatterns = [
     path('', views.home_view, name='home'),
-    path('dashboard/', views.dashboard_view, name='dashboard'),
+    path('dashboard/', views.dashboard_view_async if settings.ASYNC_DASHBOARDS else views.dashboard_view, name='dashboard'),
 ]
\ No newline at end of file
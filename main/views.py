@@ -1,5 +1,12 @@
+from decimal import Decimal
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from caja.models import CashRegister, Transaction
+from papeleria.models import Sale
+from .queries import gather_queries, run_queries
 
 def home_view(request):
     """Landing page view"""
@@ -12,12 +19,55 @@ def home_view(request):
     }
     return render(request, 'main/home.html', context)
 
+def activity_queries(user):
+    """Resumen de actividad del día; administradores ven todas las cajas"""
+    today = timezone.now().date()
+    transactions = Transaction.objects.on_day(today)
+    sales = Sale.objects.filter(created_at__date=today)
+    registers = CashRegister.objects.filter(status='open')
+    if not user.is_admin():
+        transactions = transactions.filter(user=user)
+        sales = sales.filter(user=user)
+        registers = registers.filter(opened_by=user)
+
+    return {
+        'transactions': lambda: transactions.aggregate(
+            count=Count('id'),
+            income=Sum('amount', filter=Q(transaction_type='income')),
+            outcome=Sum('amount', filter=Q(transaction_type='outcome')),
+        ),
+        'sales': lambda: sales.aggregate(count=Count('id'), total=Sum('total')),
+        'open_registers': lambda: registers.count(),
+    }
+
+def dashboard_context(user, results):
+    transactions = results['transactions']
+    income = transactions['income'] or Decimal('0.00')
+    outcome = transactions['outcome'] or Decimal('0.00')
+    return {
+        'title': 'Panel Principal',
+        'user_role': user.get_role_display(),
+        'is_admin': user.is_admin(),
+        'today': {
+            'transaction_count': transactions['count'],
+            'income': income,
+            'outcome': outcome,
+            'balance': income - outcome,
+            'sale_count': results['sales']['count'],
+            'sales_total': results['sales']['total'] or Decimal('0.00'),
+            'open_registers': results['open_registers'],
+        },
+    }
+
 @login_required
 def dashboard_view(request):
     """Main dashboard view after login"""
-    context = {
-        'title': 'Panel Principal',
-        'user_role': request.user.get_role_display(),
-        'is_admin': request.user.is_admin(),
-    }
-    return render(request, 'main/dashboard.html', context)
+    results = run_queries(activity_queries(request.user))
+    return render(request, 'main/dashboard.html', dashboard_context(request.user, results))
+
+@login_required
+async def dashboard_view_async(request):
+    """Async dashboard; the day's aggregates run concurrently"""
+    user = await request.auser()
+    results = await gather_queries(activity_queries(user))
+    return await sync_to_async(render)(request, 'main/dashboard.html', dashboard_context(user, results))
@@ -3,10 +3,22 @@
 import os
 import sys
 
+# Commands known not to render forms start without the form rendering apps;
+# anything else (runserver, runserver_plus, shell_plus, third-party commands)
+# keeps the full 'web' app list.
+MANAGE_COMMANDS = {
+    'migrate', 'showmigrations', 'sqlmigrate', 'dbshell',
+    'run_workers', 'startup_profile', 'bench_sqlite_writes', 'bench_storage',
+    'archive_transactions', 'audit_balances', 'checkpoint_balances', 'compact_storage',
+    'partition_transactions', 'purge_idempotency_keys', 'rebuild_balances', 'reprice_commissions',
+}
+
 
 def main():
     """Run administrative tasks."""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softwareTienda.settings')
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    os.environ.setdefault('DJANGO_ENTRYPOINT', 'manage' if command in MANAGE_COMMANDS else 'web')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
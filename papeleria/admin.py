@@ -0,0 +1,57 @@
+from django.contrib import admin
+from .models import Product, Sale, SaleLine, StockMovement
+from .services import record_movement
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ('name', 'sku', 'barcode', 'category', 'brand', 'price', 'stock', 'is_active')
+    list_filter = ('is_active', 'category', 'brand')
+    search_fields = ('name', 'sku', 'barcode')
+    ordering = ('name',)
+
+    def get_readonly_fields(self, request, obj=None):
+        # Stock of existing products only changes through stock movements.
+        if obj is not None:
+            return ('stock', 'created_at', 'updated_at')
+        return ('created_at', 'updated_at')
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('product', 'movement_type', 'quantity', 'sale', 'user', 'created_at')
+    list_filter = ('movement_type', 'created_at')
+    search_fields = ('product__name', 'product__sku', 'notes')
+    raw_id_fields = ('product', 'sale')
+    fields = ('product', 'movement_type', 'quantity', 'notes')
+    ordering = ('-created_at',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product', 'user')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        movement = record_movement(
+            obj.product, obj.quantity, obj.movement_type, request.user, notes=obj.notes
+        )
+        obj.pk = movement.pk
+
+class SaleLineInline(admin.TabularInline):
+    model = SaleLine
+    extra = 0
+    readonly_fields = ('product', 'quantity', 'unit_price', 'subtotal')
+    can_delete = False
+
+@admin.register(Sale)
+class SaleAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'cash_register', 'payment_method', 'total', 'created_at')
+    list_filter = ('payment_method', 'created_at')
+    readonly_fields = ('user', 'cash_register', 'transaction', 'payment_method', 'total', 'created_at')
+    inlines = [SaleLineInline]
+    ordering = ('-created_at',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'cash_register')
+
+    def has_add_permission(self, request):
+        return False
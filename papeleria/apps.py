@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PapeleriaConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "papeleria"
+    verbose_name = "Papelería"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'papeleria:catalog_version'
+
+ProductEntry = namedtuple('ProductEntry', ['id', 'sku', 'barcode', 'name', 'price', 'stock'])
+
+ENTRY_FIELDS = ('id', 'sku', 'barcode', 'name', 'price', 'stock', 'is_active')
+
+
+def catalog_version():
+    return cache.get(VERSION_KEY, 0)
+
+
+def bump_catalog_version():
+    """Marca el catálogo como modificado para que los índices se refresquen"""
+    if not cache.add(VERSION_KEY, 1, None):
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 1, None)
+
+
+class ProductIndex:
+    """
+    Índice en memoria de código de barras / SKU a precio, stock y nombre.
+
+    Scans are plain dict lookups. The shared catalog version is checked at
+    most every ``check_interval`` seconds; when it moved, only products
+    updated since the last load are re-read, and the ids of active products
+    are compared against the index so rows deleted or deactivated in another
+    worker are dropped too. ``max_age`` bounds staleness when the cache
+    backend is process-local and other workers' bumps are not visible.
+    Misses fall back to the unique barcode/SKU indexes.
+    """
+
+    def __init__(self, check_interval=1.0, max_age=30.0, clock_skew=timedelta(seconds=5)):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.clock_skew = clock_skew
+        self._entries = {}
+        self._codes_by_id = {}
+        self._version = None
+        self._loaded_at = None
+        self._checked_at = 0.0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Carga el índice completo; pensado para el arranque del worker"""
+        try:
+            self.refresh(full=True)
+        except DatabaseError:
+            logger.warning('Product index not loaded; is the database migrated?')
+        finally:
+            # Do not leak the warm-up connection into forked workers.
+            connections.close_all()
+
+    def lookup(self, code):
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            if self._loaded_at is None:
+                self.refresh(full=True)
+            elif catalog_version() != self._version or now - self._refreshed_at >= self.max_age:
+                self.refresh()
+
+        entry = self._entries.get(code)
+        if entry is None:
+            entry = self._fetch(code)
+        return entry
+
+    def refresh(self, full=False):
+        version = catalog_version()
+        started_at = timezone.now()
+        products = Product.objects.values_list(*ENTRY_FIELDS)
+        if not full:
+            products = products.filter(updated_at__gte=self._loaded_at - self.clock_skew)
+        rows = list(products)
+        active_ids = None if full else set(Product.objects.filter(is_active=True).values_list('pk', flat=True))
+
+        with self._lock:
+            if full:
+                self._entries = {}
+                self._codes_by_id = {}
+            for row in rows:
+                self._store(row)
+            if not full:
+                # Deletions and queryset.update() deactivations leave no
+                # updated row behind; reconcile against the live ids.
+                for product_id in self._codes_by_id.keys() - active_ids:
+                    for code in self._codes_by_id.pop(product_id):
+                        self._entries.pop(code, None)
+            self._version = version
+            self._loaded_at = started_at
+            self._refreshed_at = time.monotonic()
+
+    def discard(self, product_id):
+        with self._lock:
+            for code in self._codes_by_id.pop(product_id, ()):
+                self._entries.pop(code, None)
+
+    def _fetch(self, code):
+        row = Product.objects.filter(
+            Q(barcode=code) | Q(sku=code),
+            is_active=True
+        ).values_list(*ENTRY_FIELDS).first()
+        if row is None:
+            return None
+        with self._lock:
+            return self._store(row)
+
+    def _store(self, row):
+        product_id, sku, barcode, name, price, stock, is_active = row
+        for code in self._codes_by_id.pop(product_id, ()):
+            self._entries.pop(code, None)
+        if not is_active:
+            return None
+
+        entry = ProductEntry(product_id, sku, barcode, name, price, stock)
+        codes = (sku, barcode) if barcode else (sku,)
+        for code in codes:
+            self._entries[code] = entry
+        self._codes_by_id[product_id] = codes
+        return entry
+
+
+product_index = ProductIndex()
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:01
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('caja', '0003_admin_date_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sku', models.CharField(max_length=50, unique=True, verbose_name='SKU')),
+                ('barcode', models.CharField(blank=True, max_length=50, null=True, unique=True, verbose_name='Código de Barras')),
+                ('name', models.CharField(max_length=150, verbose_name='Nombre')),
+                ('category', models.CharField(blank=True, max_length=50, verbose_name='Categoría')),
+                ('brand', models.CharField(blank=True, max_length=50, verbose_name='Marca')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))], verbose_name='Precio')),
+                ('stock', models.PositiveIntegerField(default=0, verbose_name='Existencias')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Producto',
+                'verbose_name_plural': 'Productos',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Sale',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_method', models.CharField(choices=[('cash', 'Efectivo'), ('transfer', 'Transferencia'), ('card', 'Tarjeta'), ('check', 'Cheque'), ('digital_wallet', 'Billetera Digital'), ('other', 'Otro')], default='cash', max_length=20, verbose_name='Método de Pago')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Total')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('cash_register', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='papeleria_sales', to='caja.cashregister', verbose_name='Caja Registradora')),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='papeleria_sale', to='caja.transaction', verbose_name='Transacción')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='papeleria_sales', to=settings.AUTH_USER_MODEL, verbose_name='Vendedor')),
+            ],
+            options={
+                'verbose_name': 'Venta',
+                'verbose_name_plural': 'Ventas',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SaleLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Cantidad')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Precio Unitario')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Subtotal')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='sale_lines', to='papeleria.product', verbose_name='Producto')),
+                ('sale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='papeleria.sale', verbose_name='Venta')),
+            ],
+            options={
+                'verbose_name': 'Línea de Venta',
+                'verbose_name_plural': 'Líneas de Venta',
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('movement_type', models.CharField(choices=[('purchase', 'Compra'), ('sale', 'Venta'), ('return', 'Devolución'), ('adjustment', 'Ajuste')], max_length=20, verbose_name='Tipo de Movimiento')),
+                ('quantity', models.IntegerField(verbose_name='Cantidad')),
+                ('notes', models.CharField(blank=True, max_length=255, verbose_name='Notas')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='movements', to='papeleria.product', verbose_name='Producto')),
+                ('sale', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='papeleria.sale', verbose_name='Venta')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Inventario',
+                'verbose_name_plural': 'Movimientos de Inventario',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
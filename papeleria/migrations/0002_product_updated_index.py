@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('papeleria', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at'], name='papeleria_product_updated_idx'),
+        ),
+    ]
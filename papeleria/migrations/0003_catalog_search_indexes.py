@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:02
+
+from django.db import migrations, models
+
+
+def create_trigram_index(apps, schema_editor):
+    # Trigram search is PostgreSQL-only; other backends fall back to scans.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Matches the UPPER(name::text) LIKE ... that Django emits for icontains.
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS papeleria_product_name_trgm '
+        'ON papeleria_product USING gin ((UPPER(name::text)) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS papeleria_product_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('papeleria', '0002_product_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'category', 'brand', 'price', 'stock'], name='papeleria_product_facets_idx'),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
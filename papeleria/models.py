@@ -0,0 +1,153 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.core.validators import MinValueValidator
+from decimal import Decimal
+from caja.models import CashRegister, Transaction
+
+User = get_user_model()
+
+class Product(models.Model):
+    sku = models.CharField(max_length=50, unique=True, verbose_name='SKU')
+    barcode = models.CharField(
+        max_length=50,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name='Código de Barras'
+    )
+    name = models.CharField(max_length=150, verbose_name='Nombre')
+    category = models.CharField(max_length=50, blank=True, verbose_name='Categoría')
+    brand = models.CharField(max_length=50, blank=True, verbose_name='Marca')
+    price = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('0.00'))],
+        verbose_name='Precio'
+    )
+    stock = models.PositiveIntegerField(default=0, verbose_name='Existencias')
+    is_active = models.BooleanField(default=True, verbose_name='Activo')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Producto'
+        verbose_name_plural = 'Productos'
+        ordering = ['name']
+        indexes = [
+            # Lets the POS lookup index reload only recently changed products.
+            models.Index(fields=['updated_at'], name='papeleria_product_updated_idx'),
+            # Covers the grouped facet query so it can run as an index-only scan.
+            models.Index(
+                fields=['is_active', 'category', 'brand', 'price', 'stock'],
+                name='papeleria_product_facets_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.sku})"
+
+class Sale(models.Model):
+    """Venta de papelería; se registra en caja como una sola transacción"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='papeleria_sales',
+        verbose_name='Vendedor'
+    )
+    cash_register = models.ForeignKey(
+        CashRegister,
+        on_delete=models.CASCADE,
+        related_name='papeleria_sales',
+        verbose_name='Caja Registradora'
+    )
+    transaction = models.OneToOneField(
+        Transaction,
+        on_delete=models.PROTECT,
+        related_name='papeleria_sale',
+        verbose_name='Transacción'
+    )
+    payment_method = models.CharField(
+        max_length=20,
+        choices=Transaction.PAYMENT_METHODS,
+        default='cash',
+        verbose_name='Método de Pago'
+    )
+    total = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Total')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Venta'
+        verbose_name_plural = 'Ventas'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Venta #{self.pk} - ${self.total}"
+
+class SaleLine(models.Model):
+    sale = models.ForeignKey(
+        Sale,
+        on_delete=models.CASCADE,
+        related_name='lines',
+        verbose_name='Venta'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.PROTECT,
+        related_name='sale_lines',
+        verbose_name='Producto'
+    )
+    quantity = models.PositiveIntegerField(verbose_name='Cantidad')
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Precio Unitario')
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='Subtotal')
+
+    class Meta:
+        verbose_name = 'Línea de Venta'
+        verbose_name_plural = 'Líneas de Venta'
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product.name}"
+
+class StockMovement(models.Model):
+    """Movimiento de inventario; quantity es positivo para entradas y negativo para salidas"""
+    MOVEMENT_TYPES = [
+        ('purchase', 'Compra'),
+        ('sale', 'Venta'),
+        ('return', 'Devolución'),
+        ('adjustment', 'Ajuste'),
+    ]
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.PROTECT,
+        related_name='movements',
+        verbose_name='Producto'
+    )
+    movement_type = models.CharField(
+        max_length=20,
+        choices=MOVEMENT_TYPES,
+        verbose_name='Tipo de Movimiento'
+    )
+    quantity = models.IntegerField(verbose_name='Cantidad')
+    sale = models.ForeignKey(
+        Sale,
+        on_delete=models.CASCADE,
+        related_name='stock_movements',
+        null=True,
+        blank=True,
+        verbose_name='Venta'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Usuario'
+    )
+    notes = models.CharField(max_length=255, blank=True, verbose_name='Notas')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Movimiento de Inventario'
+        verbose_name_plural = 'Movimientos de Inventario'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_movement_type_display()} {self.quantity:+d} - {self.product.name}"
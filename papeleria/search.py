@@ -0,0 +1,161 @@
+import hashlib
+from collections import Counter
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, CharField, Count, Q, Value, When
+
+from .lookup import catalog_version
+from .models import Product
+
+FACET_CACHE_TIMEOUT = 60 * 10
+
+# (value, label, min inclusive, max exclusive)
+PRICE_BANDS = [
+    ('0-1000', 'Menos de $1.000', None, Decimal('1000')),
+    ('1000-5000', '$1.000 - $5.000', Decimal('1000'), Decimal('5000')),
+    ('5000-20000', '$5.000 - $20.000', Decimal('5000'), Decimal('20000')),
+    ('20000+', 'Más de $20.000', Decimal('20000'), None),
+]
+
+FACETS = ('category', 'brand', 'price_band', 'in_stock')
+
+
+def _band_q(low, high):
+    q = Q()
+    if low is not None:
+        q &= Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lt=high)
+    return q
+
+
+def price_band_expression():
+    return Case(
+        *[When(_band_q(low, high), then=Value(value)) for value, _, low, high in PRICE_BANDS],
+        output_field=CharField(),
+    )
+
+
+def in_stock_expression():
+    return Case(
+        When(stock__gt=0, then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField(),
+    )
+
+
+def clean_query(query):
+    return (query or '').strip()
+
+
+def text_queryset(query):
+    """
+    Productos activos que coinciden con el texto buscado.
+
+    On PostgreSQL ``name__icontains`` is served by the trigram index created
+    in migration 0003 and ``sku__startswith`` by the varchar_pattern_ops
+    index Django adds for unique CharFields.
+    """
+    queryset = Product.objects.filter(is_active=True)
+    query = clean_query(query)
+    if query:
+        queryset = queryset.filter(
+            Q(name__icontains=query) | Q(sku__startswith=query) | Q(barcode=query)
+        )
+    return queryset
+
+
+def facet_groups(query):
+    """
+    Conteos por combinación (categoría, marca, rango de precio, stock).
+
+    All facets come from a single GROUP BY over the text matches; the rows are
+    cached per query and catalog version, so product saves and stock
+    movements invalidate them without explicit deletes. The key is the exact
+    string text_queryset filters with: SKU and barcode matches are
+    case-sensitive, so queries differing only in case can match differently.
+    """
+    query = clean_query(query)
+    digest = hashlib.md5(query.encode()).hexdigest()
+    cache_key = f'papeleria:facets:{catalog_version()}:{digest}'
+
+    groups = cache.get(cache_key)
+    if groups is None:
+        groups = list(
+            text_queryset(query)
+            .annotate(price_band=price_band_expression(), in_stock=in_stock_expression())
+            .values_list(*FACETS)
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        cache.set(cache_key, groups, FACET_CACHE_TIMEOUT)
+    return groups
+
+
+def facet_counts(groups, selected):
+    """
+    Agrega los grupos en conteos por faceta.
+
+    Each facet is counted with every *other* selected facet applied, so the
+    shopper sees how many results picking another value would give.
+    """
+    counts = {facet: Counter() for facet in FACETS}
+    for *values, count in groups:
+        row = dict(zip(FACETS, values))
+        for facet in FACETS:
+            if all(
+                row[other] == selected[other]
+                for other in FACETS
+                if other != facet and selected.get(other) is not None
+            ):
+                counts[facet][row[facet]] += count
+    return counts
+
+
+def search(query='', category=None, brand=None, price_band=None, in_stock=None, limit=50):
+    bands = {value: (low, high) for value, _, low, high in PRICE_BANDS}
+    if price_band not in bands:
+        # Unknown bands are ignored for the results and the counts alike.
+        price_band = None
+    selected = {
+        'category': category,
+        'brand': brand,
+        'price_band': price_band,
+        'in_stock': in_stock,
+    }
+
+    results = text_queryset(query)
+    if category is not None:
+        results = results.filter(category=category)
+    if brand is not None:
+        results = results.filter(brand=brand)
+    if price_band is not None:
+        results = results.filter(_band_q(*bands[price_band]))
+    if in_stock is not None:
+        results = results.filter(stock__gt=0) if in_stock else results.filter(stock=0)
+
+    groups = facet_groups(query)
+    counts = facet_counts(groups, selected)
+    total = sum(
+        count for *values, count in groups
+        if all(selected[facet] is None or value == selected[facet] for facet, value in zip(FACETS, values))
+    )
+    band_labels = {value: label for value, label, _, _ in PRICE_BANDS}
+
+    return {
+        'results': list(
+            results.order_by('name').values('id', 'sku', 'barcode', 'name', 'category', 'brand', 'price', 'stock')[:limit]
+        ),
+        'total': total,
+        'facets': {
+            'category': sorted(counts['category'].items()),
+            'brand': sorted(counts['brand'].items()),
+            'price_band': [
+                (value, band_labels[value], counts['price_band'][value])
+                for value, _, _, _ in PRICE_BANDS
+                if counts['price_band'][value]
+            ],
+            'in_stock': [(True, counts['in_stock'][True]), (False, counts['in_stock'][False])],
+        },
+    }
@@ -0,0 +1,133 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from caja.models import CashRegister, Transaction
+from .lookup import bump_catalog_version
+from .models import Product, Sale, SaleLine, StockMovement
+
+
+class CheckoutError(Exception):
+    """Error de negocio al procesar una venta; el mensaje se muestra al cajero"""
+
+
+class InvalidCart(CheckoutError):
+    """Carrito mal formado; la vista responde 400"""
+
+
+class InsufficientStock(CheckoutError):
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        super().__init__(f'Stock insuficiente para {product.name}: se pidieron {requested}.')
+
+
+def decrement_stock(product_id, quantity):
+    """Descuenta stock con un UPDATE condicional; False si no alcanza"""
+    return Product.objects.filter(
+        pk=product_id,
+        stock__gte=quantity
+    ).update(stock=F('stock') - quantity, updated_at=timezone.now()) == 1
+
+
+def record_movement(product, quantity, movement_type, user, notes=''):
+    """Registra una entrada o ajuste manual de inventario"""
+    with transaction.atomic():
+        if quantity < 0:
+            if not decrement_stock(product.pk, -quantity):
+                raise InsufficientStock(product, -quantity)
+        else:
+            Product.objects.filter(pk=product.pk).update(
+                stock=F('stock') + quantity,
+                updated_at=timezone.now()
+            )
+
+        transaction.on_commit(bump_catalog_version)
+        return StockMovement.objects.create(
+            product=product,
+            movement_type=movement_type,
+            quantity=quantity,
+            user=user,
+            notes=notes,
+        )
+
+
+def checkout(user, items, payment_method='cash'):
+    """Procesa una venta de papelería (pares producto, cantidad) como una unidad atómica"""
+    quantities = Counter()
+    for product_id, quantity in items:
+        if not all(type(value) is int for value in (product_id, quantity)):
+            raise InvalidCart('Los productos y cantidades deben ser números enteros.')
+        if quantity <= 0:
+            raise InvalidCart('Las cantidades deben ser mayores que cero.')
+        quantities[product_id] += quantity
+
+    if not quantities:
+        raise CheckoutError('El carrito está vacío.')
+
+    register = CashRegister.objects.filter(opened_by=user, status='open').first()
+    if register is None:
+        raise CheckoutError('Debes abrir una caja antes de registrar ventas.')
+
+    products = Product.objects.filter(is_active=True).in_bulk(list(quantities))
+    missing = set(quantities) - set(products)
+    if missing:
+        raise CheckoutError(f'Productos no disponibles: {", ".join(map(str, sorted(missing)))}.')
+
+    with transaction.atomic():
+        # Product-id order: concurrent checkouts lock rows in the same order.
+        for product_id in sorted(quantities):
+            if not decrement_stock(product_id, quantities[product_id]):
+                raise InsufficientStock(products[product_id], quantities[product_id])
+
+        lines = [
+            SaleLine(
+                product=products[product_id],
+                quantity=quantity,
+                unit_price=products[product_id].price,
+                subtotal=products[product_id].price * quantity,
+            )
+            for product_id, quantity in sorted(quantities.items())
+        ]
+        total = sum((line.subtotal for line in lines), Decimal('0.00'))
+        if total <= 0:
+            raise CheckoutError('El total de la venta debe ser mayor que cero.')
+        item_count = sum(quantities.values())
+
+        sale_transaction = Transaction.objects.create(
+            transaction_type='income',
+            amount=total,
+            description=f'Venta de papelería ({item_count} artículos)',
+            category='papeleria_sale',
+            payment_method=payment_method,
+            cash_register=register,
+            user=user,
+            transaction_date=timezone.now(),
+        )
+        sale = Sale.objects.create(
+            user=user,
+            cash_register=register,
+            transaction=sale_transaction,
+            payment_method=payment_method,
+            total=total,
+        )
+
+        for line in lines:
+            line.sale = sale
+        SaleLine.objects.bulk_create(lines)
+        StockMovement.objects.bulk_create([
+            StockMovement(
+                product=line.product,
+                movement_type='sale',
+                quantity=-line.quantity,
+                sale=sale,
+                user=user,
+            )
+            for line in lines
+        ])
+        transaction.on_commit(bump_catalog_version)
+
+    return sale
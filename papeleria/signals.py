@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .lookup import bump_catalog_version, product_index
+from .models import Product
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    product_index.discard(instance.pk)
+    transaction.on_commit(bump_catalog_version)
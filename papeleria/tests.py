@@ -0,0 +1,123 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from caja.archive import archivable_registers
+from caja.models import CashRegister, Transaction
+from .lookup import ProductIndex
+from .models import Product, Sale
+from .search import search
+from .services import InsufficientStock, checkout
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cajero', password='secreto123', role='user')
+        self.register = CashRegister.objects.create(
+            name='Caja 1',
+            opening_balance=Decimal('100.00'),
+            current_balance=Decimal('100.00'),
+            status='open',
+            opened_by=self.user,
+            opened_at=timezone.now(),
+        )
+        self.pen = Product.objects.create(sku='BOL-1', name='Bolígrafo', price=Decimal('1.50'), stock=2)
+        self.client.force_login(self.user)
+
+    def post_cart(self, items):
+        return self.client.post(
+            reverse('papeleria:checkout'),
+            json.dumps({'items': items}),
+            content_type='application/json',
+        )
+
+    def test_checkout_decrements_stock_and_posts_income(self):
+        sale = checkout(self.user, [(self.pen.pk, 1), (self.pen.pk, 1)])
+
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock, 0)
+        self.assertEqual(sale.total, Decimal('3.00'))
+        self.assertEqual(sale.transaction.transaction_type, 'income')
+        self.assertEqual(sale.transaction.cash_register, self.register)
+
+    def test_checkout_does_not_oversell(self):
+        with self.assertRaises(InsufficientStock):
+            checkout(self.user, [(self.pen.pk, 3)])
+
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock, 2)
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_oversell_returns_conflict(self):
+        response = self.post_cart([{'product_id': self.pen.pk, 'quantity': 3}])
+        self.assertEqual(response.status_code, 409)
+
+    def test_register_with_sales_is_not_archived(self):
+        # Sale.transaction is a PROTECT foreign key: deleting the register's
+        # transactions would fail.
+        checkout(self.user, [(self.pen.pk, 1)])
+        CashRegister.objects.filter(pk=self.register.pk).update(
+            status='closed', closed_at=timezone.now() - timedelta(days=400)
+        )
+
+        self.assertFalse(archivable_registers(12).exists())
+
+    def test_bad_input_returns_bad_request(self):
+        carts = [
+            [{'product_id': self.pen.pk, 'quantity': 'x'}],
+            [{'product_id': self.pen.pk, 'quantity': 1.7}],
+            [{'product_id': str(self.pen.pk), 'quantity': 1}],
+            [{'product_id': self.pen.pk, 'quantity': True}],
+            [{'product_id': self.pen.pk, 'quantity': 0}],
+            [{'product_id': self.pen.pk}],
+            ['no es un artículo'],
+        ]
+        for items in carts:
+            with self.subTest(items=items):
+                self.assertEqual(self.post_cart(items).status_code, 400)
+
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock, 2)
+
+
+class ProductIndexTests(TestCase):
+    def setUp(self):
+        self.pen = Product.objects.create(sku='BOL-1', barcode='750100', name='Bolígrafo', price=Decimal('1.50'), stock=5)
+        self.index = ProductIndex()
+        self.index.refresh(full=True)
+
+    def test_refresh_drops_products_removed_elsewhere(self):
+        # Another worker deleted one product and bulk-deactivated the other:
+        # no signal reaches this index and no updated row is left to re-read.
+        pencil = Product.objects.create(sku='LAP-1', name='Lápiz', price=Decimal('0.50'), stock=5)
+        self.index.refresh(full=True)
+        Product.objects.filter(pk=self.pen.pk).update(is_active=False)
+        pencil.delete()
+        self.index.refresh()
+
+        for code in ('BOL-1', '750100', 'LAP-1'):
+            with self.subTest(code=code):
+                self.assertNotIn(code, self.index._entries)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        Product.objects.create(sku='CUA-1', name='Cuaderno', price=Decimal('2500'), stock=3)
+        Product.objects.create(sku='REG-1', barcode='ABC30', name='Regla', price=Decimal('9000'), stock=0)
+
+    def test_case_sensitive_matches_are_not_served_from_another_query(self):
+        self.assertEqual(search('ABC30')['total'], 1)
+        self.assertEqual(search('abc30')['total'], 0)
+
+    def test_unknown_price_band_is_ignored_everywhere(self):
+        data = search('', price_band='no-existe')
+
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(sum(count for _, _, count in data['facets']['price_band']), 2)
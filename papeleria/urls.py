@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'papeleria'
+
+urlpatterns = [
+    path('buscar/', views.search_view, name='search'),
+    path('venta/', views.checkout_view, name='checkout'),
+    path('scan/<str:code>/', views.scan_view, name='scan'),
+]
@@ -0,0 +1,83 @@
+import json
+import time
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+from caja.models import Transaction
+from .lookup import product_index
+from .search import search
+from .services import CheckoutError, InvalidCart, checkout
+
+@login_required
+@require_GET
+def scan_view(request, code):
+    """Busca un producto por código de barras o SKU para el lector del punto de venta"""
+    started = time.perf_counter()
+    entry = product_index.lookup(code)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if entry is None:
+        response = JsonResponse({'error': 'Producto no encontrado.'}, status=404)
+    else:
+        response = JsonResponse({
+            'product_id': entry.id,
+            'sku': entry.sku,
+            'barcode': entry.barcode,
+            'name': entry.name,
+            'price': str(entry.price),
+            'stock': entry.stock,
+        })
+    response['Server-Timing'] = f'lookup;dur={elapsed_ms:.3f}'
+    return response
+
+@login_required
+@require_GET
+def search_view(request):
+    """Búsqueda del catálogo con conteos por faceta en una sola consulta agrupada"""
+    params = request.GET
+    in_stock = params.get('in_stock')
+    data = search(
+        query=params.get('q', ''),
+        category=params.get('category') or None,
+        brand=params.get('brand') or None,
+        price_band=params.get('price') or None,
+        in_stock={'1': True, '0': False}.get(in_stock),
+    )
+
+    for product in data['results']:
+        product['price'] = str(product['price'])
+    facets = data['facets']
+    data['facets'] = {
+        'category': [{'value': value, 'count': count} for value, count in facets['category']],
+        'brand': [{'value': value, 'count': count} for value, count in facets['brand']],
+        'price': [{'value': value, 'label': label, 'count': count} for value, label, count in facets['price_band']],
+        'in_stock': [{'value': value, 'count': count} for value, count in facets['in_stock']],
+    }
+    return JsonResponse(data)
+
+@login_required
+@require_POST
+def checkout_view(request):
+    """Procesa el carrito del punto de venta (JSON) como una venta atómica"""
+    try:
+        payload = json.loads(request.body)
+        items = [(item['product_id'], item['quantity']) for item in payload['items']]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Formato de carrito inválido.'}, status=400)
+
+    payment_method = payload.get('payment_method', 'cash')
+    if payment_method not in dict(Transaction.PAYMENT_METHODS):
+        return JsonResponse({'error': 'Método de pago inválido.'}, status=400)
+
+    try:
+        sale = checkout(request.user, items, payment_method=payment_method)
+    except InvalidCart as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    except CheckoutError as exc:
+        return JsonResponse({'error': str(exc)}, status=409)
+
+    return JsonResponse({
+        'sale_id': sale.pk,
+        'transaction_id': sale.transaction_id,
+        'total': str(sale.total),
+    }, status=201)
@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softwareTienda.settings')
+# Always a web process, even when started from a manage.py command.
+os.environ['DJANGO_ENTRYPOINT'] = 'web'
 
 application = get_asgi_application()
+
+# Load the POS barcode index before this worker serves its first scan.
+from papeleria.lookup import product_index  # noqa: E402
+
+product_index.warm()
@@ -0,0 +1,106 @@
+"""
+Enrutamiento de lecturas a la réplica (REPLICA_ENABLED).
+
+Reads only go to the replica inside views marked with ``use_replica``
+(history listings, closing reports, exports, analytics); everything else,
+and every write, uses ``default``. A user who just wrote something is
+pinned to ``default`` for REPLICA_PIN_SECONDS through a short-lived cookie,
+so they always read their own writes despite replication lag.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA = 'replica'
+PIN_COOKIE = 'db_pin'
+
+_use_replica = ContextVar('use_replica', default=False)
+_pinned = ContextVar('replica_pinned', default=False)
+_wrote = ContextVar('replica_wrote', default=False)
+
+
+def read_database():
+    """Alias de la base de datos de la que deben leerse las consultas en el contexto actual"""
+    if (
+        REPLICA in settings.DATABASES
+        and _use_replica.get()
+        and not _pinned.get()
+        and not _wrote.get()
+        and not connections['default'].in_atomic_block
+    ):
+        return REPLICA
+    return 'default'
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_database()
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == 'default'
+
+
+def _replica_chunks(content):
+    # Streaming bodies are consumed after the view returned; enter the
+    # replica scope around each chunk so the context can change in between.
+    iterator = iter(content)
+    while True:
+        token = _use_replica.set(True)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _use_replica.reset(token)
+        yield chunk
+
+
+def use_replica(view):
+    """Decorador: las lecturas de la vista van a la réplica (solo GET/HEAD)"""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        token = _use_replica.set(True)
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+        if getattr(response, 'streaming', False):
+            response.streaming_content = _replica_chunks(response.streaming_content)
+        return response
+    return wrapped
+
+
+class ReplicaPinningMiddleware:
+    """Fija en ``default`` las lecturas de quien acaba de escribir"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = _pinned.set(PIN_COOKIE in request.COOKIES)
+        wrote = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get():
+                response.set_cookie(
+                    PIN_COOKIE, '1',
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                    samesite='Lax',
+                )
+        finally:
+            _pinned.reset(pinned)
+            _wrote.reset(wrote)
+        return response
@@ -10,9 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,6 +34,11 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='', cast=lambda v: [s.strip() fo
 
 # Application definition
 
+# Entry point of this process: manage.py sets 'manage' for the commands in
+# its MANAGE_COMMANDS, which skip the apps only needed to render forms;
+# wsgi.py/asgi.py and every other command get 'web'.
+ENTRYPOINT = os.environ.get('DJANGO_ENTRYPOINT', 'web')
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -40,25 +47,35 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     
-    # Third party apps
-    'crispy_forms',
-    'crispy_bootstrap5',
-    
     # Local apps
     'accounts',
     'main',
     'caja',
+    'papeleria',
+    'jobs',
 ]
 
+# Third party apps
+if ENTRYPOINT == 'web':
+    INSTALLED_APPS += [
+        'crispy_forms',
+        'crispy_bootstrap5',
+    ]
+
+# Development helpers (shell_plus, show_urls, ...), never in production
+if DEBUG and find_spec('django_extensions'):
+    INSTALLED_APPS += ['django_extensions']
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'softwareTienda.db_router.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'accounts.middleware.RoleBasedAccessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'accounts.middleware.RoleBasedAccessMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -103,11 +120,98 @@ else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+        }
+    }
+
+# SQLite tuning for several gunicorn workers sharing db.sqlite3 (main/sqlite.py):
+# WAL journal, synchronous=NORMAL, busy timeout, page cache and memory map on
+# every connection, and BEGIN IMMEDIATE so writers queue for the lock instead
+# of failing with "database is locked". Measure with bench_sqlite_writes.
+SQLITE_TUNING = config('SQLITE_TUNING', default=True, cast=bool)
+SQLITE_BUSY_TIMEOUT_MS = config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int)
+SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int)
+SQLITE_CACHE_SIZE_KB = config('SQLITE_CACHE_SIZE_KB', default=32 * 1024, cast=int)
+
+if DATABASE_ENGINE != 'postgresql' and SQLITE_TUNING:
+    DATABASES['default']['OPTIONS'] = {
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+    }
+
+# Read replica for history listings, closing reports, exports and analytics
+# (views decorated with db_router.use_replica). Without REPLICA_DATABASE_*
+# the replica alias points at the primary itself, which is enough to test
+# the routing locally; point REPLICA_DATABASE_NAME at a copy of db.sqlite3
+# to watch stale reads. Users are pinned to the primary for
+# REPLICA_PIN_SECONDS after each of their own writes.
+REPLICA_ENABLED = config('REPLICA_ENABLED', default=False, cast=bool)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+if REPLICA_ENABLED:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': config('REPLICA_DATABASE_NAME', default=str(DATABASES['default']['NAME'])),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DATABASE_ENGINE == 'postgresql':
+        DATABASES['replica'].update({
+            'USER': config('REPLICA_DATABASE_USER', default=DATABASES['default']['USER']),
+            'PASSWORD': config('REPLICA_DATABASE_PASSWORD', default=DATABASES['default']['PASSWORD']),
+            'HOST': config('REPLICA_DATABASE_HOST', default=DATABASES['default']['HOST']),
+            'PORT': config('REPLICA_DATABASE_PORT', default=DATABASES['default']['PORT']),
+        })
+    DATABASE_ROUTERS = ['softwareTienda.db_router.ReplicaRouter']
+
+
+# Cache
+# 'locmem' keeps a per-process cache; use 'redis' when several gunicorn
+# workers or nodes must share cached sessions, counts and catalog versions.
+
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+# Whether every worker sees the same cache; per-process state (sessions,
+# roles, login locks) must not be kept in it otherwise.
+SHARED_CACHE = CACHE_BACKEND == 'redis'
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL', default='redis://localhost:6379/1'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'softwaretienda',
         }
     }
 
 
+# Sessions
+# 'cached_db' reads sessions from the cache and only falls back to the
+# django_session table on a miss; 'signed_cookies' keeps no server-side
+# state at all, for stateless nodes behind a load balancer. 'cache' keeps
+# sessions only in the cache and needs a shared one: with locmem each worker
+# would have its own copy of every session.
+
+SESSION_TIERS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_TIER = config('SESSION_TIER', default='cached_db')
+if SESSION_TIER == 'cache' and not SHARED_CACHE:
+    raise ImproperlyConfigured("SESSION_TIER=cache requiere CACHE_BACKEND=redis; usa 'cached_db' o 'db'.")
+SESSION_ENGINE = SESSION_TIERS[SESSION_TIER]
+
+# Flash messages travel in their own cookie so adding one never forces a
+# session write.
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -164,6 +268,45 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Pagination: above this many rows list views and admin changelists show an
+# estimated total instead of running an exact COUNT(*) on every page load.
+PAGINATION_ESTIMATE_THRESHOLD = config('PAGINATION_ESTIMATE_THRESHOLD', default=10000, cast=int)
+PAGINATION_COUNT_REFRESH_SECONDS = config('PAGINATION_COUNT_REFRESH_SECONDS', default=60, cast=int)
+
+# Dashboards: serve the async views (concurrent aggregates) instead of the
+# sync ones. Only worth enabling when running under ASGI (see gunicorn.conf.py).
+ASYNC_DASHBOARDS = config('ASYNC_DASHBOARDS', default=False, cast=bool)
+
+# Idempotency keys for transaction POSTs: a replay within this window returns
+# the original result. Expired keys are removed by purge_idempotency_keys.
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)
+
+# Cash register ledger: cumulative totals are checkpointed every N entries so
+# balance verification only aggregates the rows after the latest checkpoint.
+BALANCE_CHECKPOINT_INTERVAL = config('BALANCE_CHECKPOINT_INTERVAL', default=500, cast=int)
+# Bank and entity balances are maintained per transaction; also keep one row
+# per day (rebuild with manage.py rebuild_balances after changing this).
+MATERIALIZED_DAILY_BALANCES = config('MATERIALIZED_DAILY_BALANCES', default=True, cast=bool)
+
+# Compact Transaction/report storage: amounts as BIGINT cents and choices as
+# SMALLINT codes. Convert the columns first with manage.py compact_storage,
+# then enable this; it must always match the database layout.
+COMPACT_STORAGE = config('COMPACT_STORAGE', default=False, cast=bool)
+
+# Transaction history: Transaction.objects.recent() covers the last
+# TRANSACTION_HOT_DAYS days; manage.py archive_transactions moves registers
+# closed more than TRANSACTION_ARCHIVE_MONTHS ago into TransactionArchive.
+# On PostgreSQL, manage.py partition_transactions keeps monthly partitions
+# prepared TRANSACTION_PARTITION_MONTHS_AHEAD months in advance.
+TRANSACTION_HOT_DAYS = config('TRANSACTION_HOT_DAYS', default=45, cast=int)
+TRANSACTION_ARCHIVE_MONTHS = config('TRANSACTION_ARCHIVE_MONTHS', default=12, cast=int)
+TRANSACTION_PARTITION_MONTHS_AHEAD = config('TRANSACTION_PARTITION_MONTHS_AHEAD', default=3, cast=int)
+
+# Background jobs (manage.py run_workers). With JOBS_EAGER jobs run in the
+# web process right after commit, so development needs no worker.
+JOBS_EAGER = config('JOBS_EAGER', default=DEBUG, cast=bool)
+JOBS_RETRY_BASE_SECONDS = config('JOBS_RETRY_BASE_SECONDS', default=10, cast=int)
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -172,6 +315,35 @@ LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'main:dashboard'
 LOGOUT_REDIRECT_URL = 'accounts:login'
 
+# Login throttling (accounts/throttling.py): failed logins are counted per
+# username and per client IP over a sliding window; past the limit the
+# username or IP is locked out and further attempts are rejected before any
+# password is hashed. Set LOGIN_THROTTLE_PROXY_COUNT to the number of
+# reverse proxies in front of gunicorn so the client IP is read from
+# X-Forwarded-For instead of being the proxy's address for everyone.
+# Without a shared cache failures are counted per worker and locks are read
+# from the LoginLockout table.
+AUTHENTICATION_BACKENDS = [
+    'accounts.throttling.LoginThrottleBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+LOGIN_THROTTLE_WINDOW_SECONDS = config('LOGIN_THROTTLE_WINDOW_SECONDS', default=300, cast=int)
+LOGIN_THROTTLE_USERNAME_LIMIT = config('LOGIN_THROTTLE_USERNAME_LIMIT', default=5, cast=int)
+LOGIN_THROTTLE_IP_LIMIT = config('LOGIN_THROTTLE_IP_LIMIT', default=20, cast=int)
+LOGIN_LOCKOUT_SECONDS = config('LOGIN_LOCKOUT_SECONDS', default=900, cast=int)
+LOGIN_THROTTLE_PROXY_COUNT = config('LOGIN_THROTTLE_PROXY_COUNT', default=0, cast=int)
+
+# Production template loading: compiled templates are kept in memory for
+# the lifetime of the worker.
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -23,6 +23,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('accounts.urls')),
     path('caja/', include('caja.urls')),
+    path('papeleria/', include('papeleria.urls')),
+    path('jobs/', include('jobs.urls')),
     path('', include('main.urls')),
 ]
 